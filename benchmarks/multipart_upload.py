@@ -0,0 +1,170 @@
+"""Measure the peak RSS of one multipart upload, per input type, as a multiple
+of the payload size.
+
+Each case runs in its own process against a local server that discards the
+body. The baseline is the RSS before the payload is created, so an in-memory
+payload counts as 1x on its own and a payload read from disk as ~0x. The
+`legacy` cases encode the same request the way requests and aiohttp.FormData
+do, for comparison.
+
+Usage (after `pip install -e .`):
+    python benchmarks/multipart_upload.py [--size-mb 64]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import mmap
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CASES = [
+    "sync:bytes",
+    "sync:bytearray",
+    "sync:memoryview",
+    "sync:mmap",
+    "sync:file",
+    "sync:path",
+    "async:bytes",
+    "async:mmap",
+    "async:file",
+    "async:path",
+    "legacy-sync:bytes",
+    "legacy-async:bytes",
+]
+
+
+class Discard(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1 << 20)))
+        body = json.dumps({"success": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def peak_rss() -> int:
+    # kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def make_payload(kind: str, path: Path, size: int):
+    if kind == "path":
+        return path
+    if kind == "file":
+        return open(path, "rb")
+    if kind == "mmap":
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if kind == "bytearray":
+        data = bytearray(size)
+        with open(path, "rb") as f:
+            f.readinto(data)
+        return data
+    data = path.read_bytes()
+    if kind == "memoryview":
+        return memoryview(data)
+    return data
+
+
+def run_case(case: str, url: str, path: Path, size: int) -> None:
+    import jigsawstack
+
+    mode, kind = case.split(":")
+    params = {"prompt": "total"}
+    if mode == "sync":
+        client = jigsawstack.JigsawStack(api_key="benchmark", base_url=url)
+        client.vision.vocr(b"warm up", params)
+        baseline = peak_rss()
+        client.vision.vocr(make_payload(kind, path, size), params)
+    elif mode == "async":
+
+        async def main() -> int:
+            async with jigsawstack.AsyncJigsawStack(api_key="benchmark", base_url=url) as client:
+                await client.vision.vocr(b"warm up", params)
+                baseline = peak_rss()
+                await client.vision.vocr(make_payload(kind, path, size), params)
+                return baseline
+
+        baseline = asyncio.run(main())
+    elif mode == "legacy-sync":
+        import requests
+
+        requests.post(f"{url}/v1/vocr", files={"file": b"warm up"}, data={"body": "{}"})
+        baseline = peak_rss()
+        requests.post(
+            f"{url}/v1/vocr",
+            files={"file": make_payload(kind, path, size)},
+            data={"body": json.dumps(params)},
+        )
+    else:
+        import aiohttp
+
+        async def main() -> int:
+            async with aiohttp.ClientSession() as session:
+                baseline = peak_rss()
+                form = aiohttp.FormData()
+                form.add_field(
+                    "file", io.BytesIO(make_payload(kind, path, size)), filename="upload"
+                )
+                form.add_field("body", json.dumps(params), content_type="application/json")
+                async with session.post(f"{url}/v1/vocr", data=form) as resp:
+                    await resp.read()
+                return baseline
+
+        baseline = asyncio.run(main())
+    print((peak_rss() - baseline) / size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+
+    if args.case:
+        run_case(args.case, args.url, Path(args.path), size)
+        return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Discard)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "payload.bin"
+        with open(path, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        print(f"peak RSS over the baseline, as a multiple of a {args.size_mb} MiB payload")
+        for case in CASES:
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", case, "--url", url, "--path", str(path)]
+                + ["--size-mb", str(args.size_mb)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            print(f"{case:>20}: {float(out.stdout.strip()):5.2f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
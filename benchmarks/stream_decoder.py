@@ -0,0 +1,46 @@
+"""Measure StreamDecoder throughput in MB/s.
+
+Usage (after `pip install -e .`):
+    python benchmarks/stream_decoder.py [--size-mb 32] [--chunk-size 1024]
+"""
+
+import argparse
+import json
+import time
+
+from jigsawstack._streaming import StreamDecoder
+
+
+def build_body(fmt: str, size: int) -> bytes:
+    record = json.dumps({"token": "héllo wörld 👋 " * 4, "index": 0}, ensure_ascii=False)
+    if fmt == "sse":
+        line = f"data: {record}\n\n"
+    else:
+        line = f"{record}\n"
+    line_bytes = line.encode("utf-8")
+    return line_bytes * (size // len(line_bytes) + 1)
+
+
+def run(fmt: str, body: bytes, chunk_size: int) -> float:
+    decoder = StreamDecoder(fmt)
+    started_at = time.perf_counter()
+    for i in range(0, len(body), chunk_size):
+        decoder.feed(body[i : i + chunk_size])
+    decoder.flush()
+    elapsed = time.perf_counter() - started_at
+    return len(body) / elapsed / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    for fmt in ["ndjson", "sse", "text"]:
+        body = build_body(fmt, args.size_mb * 1_000_000)
+        print(f"{fmt:>6}: {run(fmt, body, args.chunk_size):8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
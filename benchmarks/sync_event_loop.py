@@ -0,0 +1,153 @@
+"""Compare the sync client running its calls on threads with the same client
+running them on a background event loop (`JigsawStack(event_loop=True)`).
+
+Each case makes `--calls` calls, `--concurrency` at a time, against a local
+server answering after `--latency-ms`, and reports the wall time, the peak
+number of threads, the peak RSS over the baseline, the CPU time and the
+context switches of the process. The `callers` cases block in one thread per
+call in flight, like a threaded web server; the `futures` cases start the
+calls from one thread through `jigsaw.futures`.
+
+Usage (after `pip install -e .`):
+    python benchmarks/sync_event_loop.py [--concurrency 200] [--calls 4000] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+CASES = ["threads:callers", "event-loop:callers", "threads:futures", "event-loop:futures"]
+
+
+def serve(port: "multiprocessing.Queue", latency: float) -> None:
+    from aiohttp import web
+
+    async def reply(request: web.Request) -> web.Response:
+        await request.read()
+        await asyncio.sleep(latency)
+        return web.json_response({"success": True, "sentiment": {"emotion": "neutral"}})
+
+    async def main() -> None:
+        app = web.Application()
+        app.router.add_post("/{tail:.*}", reply)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, backlog=4096)
+        await site.start()
+        port.put(site._server.sockets[0].getsockname()[1])
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+def usage() -> "resource.struct_rusage":
+    return resource.getrusage(resource.RUSAGE_SELF)
+
+
+def run_case(case: str, url: str, concurrency: int, calls: int) -> None:
+    import jigsawstack
+
+    engine, mode = case.split(":")
+    if engine == "threads":
+        client = jigsawstack.JigsawStack(
+            api_key="benchmark", base_url=url, pool_maxsize=concurrency
+        )
+    else:
+        client = jigsawstack.JigsawStack(
+            api_key="benchmark",
+            base_url=url,
+            transport=jigsawstack.AsyncTransport(limit=concurrency),
+            event_loop=True,
+        )
+    client.sentiment({"text": "warm up"})
+
+    peak_threads = threading.active_count()
+    done = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak_threads
+        while not done.wait(0.005):
+            # not counting this thread
+            peak_threads = max(peak_threads, threading.active_count() - 1)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    before = usage()
+    started = time.perf_counter()
+    if mode == "callers":
+        with ThreadPoolExecutor(max_workers=concurrency) as callers:
+            futures = [callers.submit(client.sentiment, {"text": str(i)}) for i in range(calls)]
+            wait(futures)
+    else:
+        slots = threading.Semaphore(concurrency)
+        futures = []
+        for i in range(calls):
+            slots.acquire()
+            future = client.futures.sentiment({"text": str(i)})
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        wait(futures)
+    seconds = time.perf_counter() - started
+    after = usage()
+    done.set()
+    sampler.join()
+    failed = sum(f.exception() is not None for f in futures)
+    client.close()
+
+    switches = (after.ru_nvcsw + after.ru_nivcsw) - (before.ru_nvcsw + before.ru_nivcsw)
+    cpu = (after.ru_utime + after.ru_stime) - (before.ru_utime + before.ru_stime)
+    # ru_maxrss is in kilobytes on Linux
+    rss = (after.ru_maxrss - before.ru_maxrss) / 1024
+    print(f"{seconds} {calls / seconds} {peak_threads} {rss} {cpu} {switches} {failed}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--calls", type=int, default=4000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args.case, args.url, args.concurrency, args.calls)
+        return
+
+    port: multiprocessing.Queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port, args.latency_ms / 1000), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{port.get(timeout=30)}"
+    print(
+        f"{args.calls} calls, {args.concurrency} in flight, {args.latency_ms:g} ms server latency"
+    )
+    print(
+        f"{'case':>20}  {'seconds':>8}  {'calls/s':>8}  {'threads':>7}  "
+        f"{'RSS MiB':>7}  {'CPU s':>6}  {'switches':>8}  {'failed':>6}"
+    )
+    try:
+        for case in CASES:
+            out = subprocess.run(
+                [sys.executable, __file__, "--case", case, "--url", url]
+                + ["--concurrency", str(args.concurrency), "--calls", str(args.calls)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            seconds, rate, threads, rss, cpu, switches, failed = out.stdout.split()
+            print(
+                f"{case:>20}  {float(seconds):8.2f}  {float(rate):8.0f}  {int(threads):7d}  "
+                f"{float(rss):7.1f}  {float(cpu):6.2f}  {int(switches):8d}  {int(failed):6d}"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
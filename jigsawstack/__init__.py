@@ -1,11 +1,35 @@
 import os
-from typing import Dict, Union
-
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, Mapping, Union
+
+from ._blobs import BlobCache
+from ._bulk import DEFAULT_BULK_CONCURRENCY, AsyncBatch, Batch
+from ._bulkhead import SERVICES, Bulkhead
+from ._cache import CacheBackend, MemoryCacheBackend, ResponseCache
+from ._cache_sqlite import SQLiteCacheBackend
+from ._concurrency import AdaptiveConcurrencyLimiter
+from ._dedup import MemoryUploadManifest, SQLiteUploadManifest, UploadDedup, UploadManifest
+from ._futures import ClientExecutor, FuturesNamespace
+from ._hedge import HedgePolicy
+from ._loop import EventLoopThread, LoopNamespace
+from ._rate_limit import RateLimiter
+from ._retry import RetryBudget, RetryPolicy
+from ._singleflight import SingleFlight
+from ._timeout import Timeout
+from ._transport import (
+    DEFAULT_CONNECTOR_LIMIT,
+    DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    AsyncTransport,
+    Transport,
+)
 from .audio import AsyncAudio, Audio
 from .classification import AsyncClassification, Classification
 from .embedding import AsyncEmbedding, Embedding
 from .embedding_v2 import AsyncEmbeddingV2, EmbeddingV2
-from .exceptions import JigsawStackError
+from .exceptions import BulkheadFullError, IncompleteDownloadError, JigsawStackError
 from .image_generation import AsyncImageGeneration, ImageGeneration
 from .prediction import AsyncPrediction, Prediction
 from .prompt_engine import AsyncPromptEngine, PromptEngine
@@ -24,6 +48,12 @@ class JigsawStack:
     api_key: str
     base_url: str
     headers: Dict[str, str]
+    transport: Union[Transport, AsyncTransport]
+    bulkheads: Dict[str, Bulkhead]
+    upload_dedup: Union[UploadDedup, None]
+    blob_cache: Union[BlobCache, None]
+    executor: ClientExecutor
+    event_loop: Union[EventLoopThread, None]
     audio: Audio
     classification: Classification
     embedding: Embedding
@@ -45,6 +75,21 @@ class JigsawStack:
         api_key: Union[str, None] = None,
         base_url: Union[str, None] = None,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, AsyncTransport, None] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+        rate_limiter: Union[RateLimiter, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        singleflight: Union[SingleFlight, None] = None,
+        hedge: Union[HedgePolicy, None] = None,
+        bulkheads: Union[Mapping[str, Bulkhead], None] = None,
+        upload_dedup: Union[UploadDedup, None] = None,
+        blob_cache: Union[BlobCache, None] = None,
+        executor: Union[ClientExecutor, None] = None,
+        event_loop: Union[EventLoopThread, bool, None] = None,
     ) -> None:
         if api_key is None:
             api_key = os.environ.get("JIGSAWSTACK_API_KEY")
@@ -63,59 +108,310 @@ class JigsawStack:
         self.base_url = base_url
 
         self.headers = headers or {"Content-Type": "application/json"}
+        # threads of the futures API, sized to the connection pool so calls do not wait for a connection
+        self._owns_executor = executor is None
+        self.executor = executor or ClientExecutor(max_workers=pool_maxsize)
+        self._owns_event_loop = event_loop is True
+        self.event_loop = EventLoopThread() if event_loop is True else event_loop or None
+        self._engine: Union[AsyncJigsawStack, None] = None
+
+        if self.event_loop is not None:
+            # the calls run as coroutines of an async client on the loop thread,
+            # the pool_* and keep_alive options of the sync transport do not apply
+            if isinstance(transport, Transport):
+                raise ValueError("A client running on an event loop needs an AsyncTransport")
+            self._engine = AsyncJigsawStack(
+                api_key=api_key,
+                base_url=base_url,
+                headers=headers,
+                transport=transport,
+                retry=retry,
+                timeout=timeout,
+                rate_limiter=rate_limiter,
+                cache=cache,
+                singleflight=singleflight,
+                hedge=hedge,
+                bulkheads=bulkheads,
+                upload_dedup=upload_dedup,
+                blob_cache=blob_cache,
+            )
+            # closed with the async client
+            self._owns_transport = False
+            self.transport = self._engine.transport
+            self.bulkheads = self._engine.bulkheads
+            self.upload_dedup = upload_dedup
+            self.blob_cache = blob_cache
+            services = LoopNamespace(self._engine, self.event_loop)
+            for service in SERVICES:
+                setattr(self, service, getattr(services, service))
+            return
+        if isinstance(transport, AsyncTransport):
+            raise ValueError("An AsyncTransport can only be used with event_loop")
+
+        # a transport passed in by the caller is shared, not owned, so close() leaves it open
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = Transport(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                keep_alive=keep_alive,
+                retry=retry,
+                timeout=timeout,
+                rate_limiter=rate_limiter,
+                cache=cache,
+                singleflight=singleflight,
+                hedge=hedge,
+            )
+        elif (
+            retry is not None
+            or timeout is not None
+            or rate_limiter is not None
+            or cache is not None
+            or singleflight is not None
+            or hedge is not None
+        ):
+            transport = transport.with_options(
+                retry=retry,
+                timeout=timeout,
+                rate_limiter=rate_limiter,
+                cache=cache,
+                singleflight=singleflight,
+                hedge=hedge,
+            )
+        self.transport = transport
+        self.bulkheads = _check_bulkheads(bulkheads)
+        self.upload_dedup = upload_dedup
+        self.blob_cache = blob_cache
+
+        # built first, the services with a blob cache upload with it
+        self.store = Store(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("store"),
+            dedup=upload_dedup,
+        )
 
-        self.audio = Audio(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.audio = Audio(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("audio"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
 
-        self.web = Web(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.web = Web(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("web"),
+        )
 
         self.sentiment = Sentiment(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("sentiment"),
         ).analyze
 
-        self.validate = Validate(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.validate = Validate(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("validate"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
         self.summary = Summary(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("summary"),
         ).summarize
 
-        self.vision = Vision(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.vision = Vision(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("vision"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
 
         self.prediction = Prediction(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("prediction"),
         ).predict
 
         self.text_to_sql = SQL(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("text_to_sql"),
         ).text_to_sql
 
-        self.store = Store(api_key=api_key, base_url=base_url + "/v1", headers=headers)
-
-        self.translate = Translate(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.translate = Translate(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("translate"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
 
         self.embedding = Embedding(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("embedding"),
+            blobs=blob_cache,
+            blob_store=self.store,
         ).execute
 
         self.embedding_v2 = EmbeddingV2(
-            api_key=api_key, base_url=base_url + "/v2", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v2",
+            headers=headers,
+            transport=self._transport_for("embedding_v2"),
+            blobs=blob_cache,
+            blob_store=self.store,
         ).execute
 
         self.image_generation = ImageGeneration(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("image_generation"),
         ).image_generation
 
         self.classification = Classification(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("classification"),
         ).classify
 
         self.prompt_engine = PromptEngine(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("prompt_engine"),
         )
 
+    def _transport_for(self, service: str) -> Transport:
+        bulkhead = self.bulkheads.get(service)
+        return (
+            self.transport if bulkhead is None else self.transport.with_options(bulkhead=bulkhead)
+        )
+
+    @property
+    def futures(self) -> FuturesNamespace:
+        """This client with methods returning a `concurrent.futures.Future`
+        instead of blocking, run on the bounded thread pool `executor`:
+
+            ocr = jigsaw.futures.vision.vocr(params)
+            page = jigsaw.futures.web.ai_scrape(scrape_params)
+            text, prices = ocr.result(timeout=30), page.result(timeout=30)
+
+        `Future.cancel()` cancels a call that has not started yet. With
+        `event_loop`, the calls run on the loop instead and can be cancelled
+        once started too.
+        """
+        if self._engine is not None:
+            return FuturesNamespace(self._engine, self.event_loop)
+        return FuturesNamespace(self, self.executor)
+
+    def batch(
+        self,
+        method: Callable[[Any], Any],
+        params: Iterable[Any],
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+        ordered: bool = True,
+    ) -> Batch:
+        """Call a method of this client with every params of an iterable,
+        `concurrency` calls at a time over the shared connection pool:
+
+            batch = jigsaw.batch(jigsaw.summary, ({"text": t} for t in texts), concurrency=8)
+            for r in batch:
+                print(r["index"], r["result"] if r["ok"] else r["error"])
+            batch.stats()
+
+        A call failing does not stop the others, its exception is returned in
+        its result. Keep `concurrency` within `pool_maxsize`, connections past
+        it are not reused.
+
+        Args:
+            method (Callable[[Any], Any]): The method, e.g. `jigsaw.sentiment` or
+                `jigsaw.translate.text`
+            params (Iterable[Any]): The params of each call, drawn lazily
+            concurrency (int): Calls in flight at once
+            ordered (bool): Yield results in input order, or as they complete
+
+        Returns:
+            Batch: An iterator over the results, with live progress in `stats()`
+        """
+        return Batch(method, params, concurrency, ordered)
+
+    def with_options(
+        self,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+    ) -> "JigsawStack":
+        """Return a client sharing this one's connection pool with some options
+        overridden, e.g. for a single call:
+
+            jigsaw.with_options(retry=RetryPolicy(max_attempts=5)).translate.text(params)
+
+        Args:
+            retry (Union[RetryPolicy, None]): Retry policy for the new client
+            timeout (Union[Timeout, None]): Timeouts for the new client
+
+        Returns:
+            JigsawStack: The derived client
+        """
+        return JigsawStack(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            headers=dict(self.headers),
+            transport=self.transport.with_options(retry=retry, timeout=timeout),
+            bulkheads=self.bulkheads,
+            upload_dedup=self.upload_dedup,
+            blob_cache=self.blob_cache,
+            executor=self.executor,
+            event_loop=self.event_loop,
+        )
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections owned by this client, and the
+        threads of its futures, cancelling the calls not started yet, and the
+        event loop it created."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True, cancel_pending=True)
+        if self._engine is not None:
+            self.event_loop.run(self._engine.aclose)
+            if self._owns_event_loop:
+                self.event_loop.close()
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self) -> "JigsawStack":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
 
 class AsyncJigsawStack:
     api_key: str
     base_url: str
     headers: Dict[str, str]
+    transport: AsyncTransport
+    bulkheads: Dict[str, Bulkhead]
+    upload_dedup: Union[UploadDedup, None]
+    blob_cache: Union[BlobCache, None]
     audio: AsyncAudio
     classification: AsyncClassification
     embedding: AsyncEmbedding
@@ -137,6 +433,21 @@ class AsyncJigsawStack:
         api_key: Union[str, None] = None,
         base_url: Union[str, None] = None,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        limit: int = DEFAULT_CONNECTOR_LIMIT,
+        limit_per_host: int = DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+        ttl_dns_cache: Union[int, None] = DEFAULT_DNS_CACHE_TTL,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+        rate_limiter: Union[RateLimiter, None] = None,
+        concurrency_limiter: Union[AdaptiveConcurrencyLimiter, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        singleflight: Union[SingleFlight, None] = None,
+        hedge: Union[HedgePolicy, None] = None,
+        bulkheads: Union[Mapping[str, Bulkhead], None] = None,
+        upload_dedup: Union[UploadDedup, None] = None,
+        blob_cache: Union[BlobCache, None] = None,
     ) -> None:
         if api_key is None:
             api_key = os.environ.get("JIGSAWSTACK_API_KEY")
@@ -155,52 +466,277 @@ class AsyncJigsawStack:
         self.base_url = base_url
         self.headers = headers or {"Content-Type": "application/json"}
 
-        self.web = AsyncWeb(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        # a transport passed in by the caller is shared, not owned, so aclose() leaves it open
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = AsyncTransport(
+                limit=limit,
+                limit_per_host=limit_per_host,
+                ttl_dns_cache=ttl_dns_cache,
+                keepalive_timeout=keepalive_timeout,
+                retry=retry,
+                timeout=timeout,
+                rate_limiter=rate_limiter,
+                concurrency_limiter=concurrency_limiter,
+                cache=cache,
+                singleflight=singleflight,
+                hedge=hedge,
+            )
+        elif (
+            retry is not None
+            or timeout is not None
+            or rate_limiter is not None
+            or concurrency_limiter is not None
+            or cache is not None
+            or singleflight is not None
+            or hedge is not None
+        ):
+            transport = transport.with_options(
+                retry=retry,
+                timeout=timeout,
+                rate_limiter=rate_limiter,
+                concurrency_limiter=concurrency_limiter,
+                cache=cache,
+                singleflight=singleflight,
+                hedge=hedge,
+            )
+        self.transport = transport
+        self.bulkheads = _check_bulkheads(bulkheads)
+        self.upload_dedup = upload_dedup
+        self.blob_cache = blob_cache
+
+        # built first, the services with a blob cache upload with it
+        self.store = AsyncStore(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("store"),
+            dedup=upload_dedup,
+        )
 
-        self.validate = AsyncValidate(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.web = AsyncWeb(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("web"),
+        )
 
-        self.audio = AsyncAudio(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.validate = AsyncValidate(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("validate"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
 
-        self.vision = AsyncVision(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.audio = AsyncAudio(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("audio"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
 
-        self.store = AsyncStore(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.vision = AsyncVision(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("vision"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
 
         self.summary = AsyncSummary(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("summary"),
         ).summarize
 
-        self.prediction = AsyncPrediction(api_key=api_key, base_url=base_url + "/v1").predict
+        self.prediction = AsyncPrediction(
+            api_key=api_key, base_url=base_url + "/v1", transport=self._transport_for("prediction")
+        ).predict
 
         self.text_to_sql = AsyncSQL(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("text_to_sql"),
         ).text_to_sql
 
         self.sentiment = AsyncSentiment(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("sentiment"),
         ).analyze
 
-        self.translate = AsyncTranslate(api_key=api_key, base_url=base_url + "/v1", headers=headers)
+        self.translate = AsyncTranslate(
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("translate"),
+            blobs=blob_cache,
+            blob_store=self.store,
+        )
 
         self.embedding = AsyncEmbedding(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("embedding"),
+            blobs=blob_cache,
+            blob_store=self.store,
         ).execute
 
         self.embedding_v2 = AsyncEmbeddingV2(
-            api_key=api_key, base_url=base_url + "/v2", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v2",
+            headers=headers,
+            transport=self._transport_for("embedding_v2"),
+            blobs=blob_cache,
+            blob_store=self.store,
         ).execute
 
         self.image_generation = AsyncImageGeneration(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("image_generation"),
         ).image_generation
 
         self.classification = AsyncClassification(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("classification"),
         ).classify
 
         self.prompt_engine = AsyncPromptEngine(
-            api_key=api_key, base_url=base_url + "/v1", headers=headers
+            api_key=api_key,
+            base_url=base_url + "/v1",
+            headers=headers,
+            transport=self._transport_for("prompt_engine"),
+        )
+
+    def _transport_for(self, service: str) -> AsyncTransport:
+        bulkhead = self.bulkheads.get(service)
+        return (
+            self.transport if bulkhead is None else self.transport.with_options(bulkhead=bulkhead)
+        )
+
+    def map(
+        self,
+        method: Callable[[Any], Awaitable[Any]],
+        params: Union[Iterable[Any], AsyncIterable[Any]],
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+        ordered: bool = False,
+    ) -> AsyncBatch:
+        """Call a method of this client with every params of a sync or async
+        iterable, `concurrency` calls at a time, yielding results as they finish:
+
+            async with jigsaw.map(jigsaw.sentiment, rows(), concurrency=32) as results:
+                async for r in results:
+                    print(r["index"], r["result"] if r["ok"] else r["error"])
+
+        The params are drawn lazily and no call starts while `concurrency`
+        results wait to be consumed, so a large source is never held in memory.
+        A call failing does not stop the others, its exception is returned in
+        its result. Cancelling the consumer cancels the calls in flight.
+
+        Args:
+            method (Callable[[Any], Awaitable[Any]]): The method, e.g. `jigsaw.sentiment`
+                or `jigsaw.translate.text`
+            params (Union[Iterable[Any], AsyncIterable[Any]]): The params of each call
+            concurrency (int): Calls in flight at once
+            ordered (bool): Yield results in input order instead of as they complete
+
+        Returns:
+            AsyncBatch: An async iterator over the results, with live progress in `stats()`
+        """
+        return AsyncBatch(method, params, concurrency, ordered)
+
+    def with_options(
+        self,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+    ) -> "AsyncJigsawStack":
+        """Return a client sharing this one's aiohttp session with some options
+        overridden, e.g. for a single call:
+
+            await jigsaw.with_options(retry=RetryPolicy(max_attempts=5)).translate.text(params)
+
+        Args:
+            retry (Union[RetryPolicy, None]): Retry policy for the new client
+            timeout (Union[Timeout, None]): Timeouts for the new client
+
+        Returns:
+            AsyncJigsawStack: The derived client
+        """
+        return AsyncJigsawStack(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            headers=dict(self.headers),
+            transport=self.transport.with_options(retry=retry, timeout=timeout),
+            bulkheads=self.bulkheads,
+            upload_dedup=self.upload_dedup,
+            blob_cache=self.blob_cache,
+        )
+
+    async def aclose(self) -> None:
+        """Close the aiohttp session owned by this client."""
+        if self._owns_transport:
+            await self.transport.aclose()
+
+    async def __aenter__(self) -> "AsyncJigsawStack":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+
+def _check_bulkheads(bulkheads: Union[Mapping[str, Bulkhead], None]) -> Dict[str, Bulkhead]:
+    bulkheads = dict(bulkheads or {})
+    unknown = set(bulkheads) - SERVICES
+    if unknown:
+        raise ValueError(
+            f"Unknown service(s) in bulkheads: {', '.join(sorted(unknown))}. "
+            f"Expected any of: {', '.join(sorted(SERVICES))}"
         )
+    for service, bulkhead in bulkheads.items():
+        bulkhead.name = bulkhead.name or service
+    return bulkheads
 
 
 # Create a global instance of the Web class
-__all__ = ["JigsawStack", "Search", "JigsawStackError", "AsyncJigsawStack"]
+__all__ = [
+    "JigsawStack",
+    "Search",
+    "JigsawStackError",
+    "AsyncJigsawStack",
+    "Transport",
+    "AsyncTransport",
+    "RetryPolicy",
+    "RetryBudget",
+    "Timeout",
+    "RateLimiter",
+    "AdaptiveConcurrencyLimiter",
+    "Bulkhead",
+    "BulkheadFullError",
+    "ResponseCache",
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "SQLiteCacheBackend",
+    "SingleFlight",
+    "HedgePolicy",
+    "IncompleteDownloadError",
+    "UploadDedup",
+    "UploadManifest",
+    "MemoryUploadManifest",
+    "SQLiteUploadManifest",
+    "BlobCache",
+    "ClientExecutor",
+    "EventLoopThread",
+]
@@ -0,0 +1,314 @@
+import asyncio
+import hashlib
+import mmap
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+from typing import Any, Awaitable, Callable, Dict, Tuple, Union
+
+from typing_extensions import TypedDict
+
+from ._upload import UploadBody, blob_source
+from .store import AsyncStore, Store
+
+# seconds a blob uploaded to the store is referenced by key before it is sent again
+DEFAULT_BLOB_TTL = 3600.0
+# blobs remembered at once, the least recently used are forgotten first
+DEFAULT_BLOB_ENTRIES = 1024
+
+
+class BlobCacheStats(TypedDict):
+    hits: int
+    uploads: int
+    bytes_saved: int
+
+
+class BlobCache:
+    """Upload-once references for the blobs sent to multipart endpoints
+    (`vision.vocr`, `vision.object_detection`, `validate.nsfw`, `translate.image`,
+    `audio.speech_to_text`, `embedding` and `embedding_v2`).
+
+    The first call with a blob uploads it to the file store under a key derived
+    from its content. That call and every later call with the same bytes then
+    send the `file_store_key` instead of the bytes, so sending an image to N
+    endpoints costs one upload. Concurrent calls with the same blob wait for a
+    single upload. A key is reused for `ttl` seconds, after which the blob is
+    uploaded again, overwriting the same key.
+
+    Blobs are not deleted from the store when their key expires or is evicted:
+    another client with the same API key may still send that key. The store
+    grows by every distinct blob, delete the `jigsawstack-blob-` keys once they
+    are no longer needed.
+
+    Args:
+        ttl (float): Seconds a key is reused
+        max_entries (int): Blobs remembered at once
+    """
+
+    def __init__(self, ttl: float = DEFAULT_BLOB_TTL, max_entries: int = DEFAULT_BLOB_ENTRIES):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._uploads: Dict[str, Future] = {}
+        self._async_uploads: Dict[Tuple[int, str], asyncio.Future[str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._uploaded = 0
+        self._bytes_saved = 0
+
+    def digest(self, api_key: str, blob: Any) -> Tuple[str, int]:
+        """
+        Hash a blob without copying it.
+
+        Args:
+            api_key (str): The API key the blob is sent with
+            blob (Any): A buffer, a path or a seekable binary file, left at its position
+
+        Returns:
+            Tuple[str, int]: The cache key of the blob, and its size
+        """
+        # a key in another account's store is of no use
+        scope = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        if isinstance(blob, (bytes, bytearray, memoryview, mmap.mmap)):
+            view = memoryview(blob)
+            return f"{scope}:{hashlib.sha256(view).hexdigest()}", view.nbytes
+        h = hashlib.sha256()
+        body = UploadBody(blob)
+        try:
+            for chunk in body:
+                h.update(chunk)
+            body.rewind()
+        finally:
+            body.close()
+        return f"{scope}:{h.hexdigest()}", body.size
+
+    def store_key(self, digest: str) -> str:
+        """The file store key a blob is uploaded under."""
+        return f"jigsawstack-blob-{digest.rsplit(':', 1)[-1]}"
+
+    def get(self, digest: str) -> Union[str, None]:
+        """Return the file store key of a blob uploaded less than `ttl` seconds ago."""
+        with self._lock:
+            return self.__get(digest)
+
+    def set(self, digest: str, key: str) -> None:
+        """Record the file store key of an uploaded blob."""
+        with self._lock:
+            self.__set(digest, key)
+
+    def discard(self, digest: str) -> None:
+        """Forget a blob, its next call uploads it again."""
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self) -> None:
+        """Forget every blob."""
+        with self._lock:
+            self._entries.clear()
+
+    def key_for(self, digest: str, size: int, upload: Callable[[], str]) -> str:
+        """
+        Return the file store key of a blob, calling `upload` if it has none.
+        Threads asking for a blob being uploaded wait for that upload, and
+        share its error. If it is interrupted (e.g. KeyboardInterrupt), one of
+        them uploads the blob again.
+
+        Args:
+            digest (str): The key from `digest`
+            size (int): Bytes of the blob, counted as saved when no upload is needed
+            upload (Callable[[], str]): Uploads the blob, returns its key
+
+        Returns:
+            str: The file store key
+        """
+        while True:
+            with self._lock:
+                key = self.__get(digest)
+                pending = self._uploads.get(digest)
+                if key is None and pending is None:
+                    self._uploads[digest] = Future()
+            if key is not None:
+                self.__count_hit(size)
+                return key
+            if pending is None:
+                return self.__upload(digest, upload)
+            try:
+                key = pending.result()
+            except CancelledError:
+                # the upload was interrupted, not failed: start it again
+                continue
+            self.__count_hit(size)
+            return key
+
+    async def key_for_async(
+        self, digest: str, size: int, upload: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Like `key_for`, tasks asking for a blob being uploaded await that upload.
+        If the task uploading it is cancelled, one of them uploads it again."""
+        loop = asyncio.get_running_loop()
+        # futures belong to a loop, uploads are shared within one
+        flight = (id(loop), digest)
+        while True:
+            with self._lock:
+                key = self.__get(digest)
+                pending = self._async_uploads.get(flight)
+                if key is None and pending is None:
+                    self._async_uploads[flight] = loop.create_future()
+            if key is not None:
+                self.__count_hit(size)
+                return key
+            if pending is None:
+                break
+            try:
+                key = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    # this task was cancelled, not the upload
+                    raise
+                continue
+            self.__count_hit(size)
+            return key
+
+        future = self._async_uploads[flight]
+        try:
+            key = await upload()
+        except Exception as e:
+            future.set_exception(e)
+            # nobody else may be waiting, mark the exception retrieved
+            future.exception()
+            raise
+        except BaseException:
+            # the call that uploads was cancelled, not the calls waiting for it
+            future.cancel()
+            raise
+        else:
+            self.set(digest, key)
+            future.set_result(key)
+            with self._lock:
+                self._uploaded += 1
+            return key
+        finally:
+            with self._lock:
+                self._async_uploads.pop(flight, None)
+
+    def stats(self) -> BlobCacheStats:
+        """
+        Snapshot of the cache metrics.
+
+        Returns:
+            BlobCacheStats: Calls served by a key, blobs uploaded, and bytes not sent
+        """
+        with self._lock:
+            return BlobCacheStats(
+                hits=self._hits, uploads=self._uploaded, bytes_saved=self._bytes_saved
+            )
+
+    def __upload(self, digest: str, upload: Callable[[], str]) -> str:
+        future = self._uploads[digest]
+        try:
+            key = upload()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            self.set(digest, key)
+            future.set_result(key)
+            with self._lock:
+                self._uploaded += 1
+            return key
+        finally:
+            with self._lock:
+                self._uploads.pop(digest, None)
+
+    def __count_hit(self, size: int) -> None:
+        with self._lock:
+            self._hits += 1
+            self._bytes_saved += size
+
+    def __get(self, digest: str) -> Union[str, None]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        key, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return key
+
+    def __set(self, digest: str, key: str) -> None:
+        self._entries[digest] = (key, time.monotonic() + self.ttl)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def blob_request(
+    client: Any, blob: Any, options: Union[Dict[str, Any], None]
+) -> Tuple[Dict[str, Any], Union[Dict[str, Any], None]]:
+    """
+    The params and files of a call to a multipart endpoint of `client`. With a
+    `BlobCache` on the client, the blob is referenced by its file store key.
+
+    Args:
+        client (Any): The endpoint class, with `api_key`, `blobs` and `blob_store`,
+            the `Store` of the client blobs are uploaded with
+        blob (Any): The file sent to the endpoint, see `blob_source`
+        options (Union[Dict[str, Any], None]): The params of the call
+
+    Raises:
+        ValueError: If the client has a `BlobCache` but no `Store`
+
+    Returns:
+        Tuple[Dict[str, Any], Union[Dict[str, Any], None]]: The params, and the files
+        if the blob is still sent as multipart
+    """
+    options = dict(options or {})
+    blobs = client.blobs
+    if blobs is None:
+        return options, {"file": blob}
+
+    store: Union[Store, None] = client.blob_store
+    if store is None:
+        raise ValueError("A BlobCache needs the Store of the client to upload blobs with")
+    source = blob_source(blob)
+    digest, size = blobs.digest(client.api_key, source)
+
+    def upload() -> str:
+        return store.upload(source, {"key": blobs.store_key(digest), "overwrite": True})["key"]
+
+    options["file_store_key"] = blobs.key_for(digest, size, upload)
+    return options, None
+
+
+async def blob_request_async(
+    client: Any, blob: Any, options: Union[Dict[str, Any], None]
+) -> Tuple[Dict[str, Any], Union[Dict[str, Any], None]]:
+    """Like `blob_request`, for the async endpoint classes."""
+    options = dict(options or {})
+    blobs = client.blobs
+    if blobs is None:
+        return options, {"file": blob}
+
+    store: Union[AsyncStore, None] = client.blob_store
+    if store is None:
+        raise ValueError("A BlobCache needs the Store of the client to upload blobs with")
+    # reading a file and hashing it block, hashlib releases the GIL so it runs off the event loop
+    loop = asyncio.get_running_loop()
+    source = await loop.run_in_executor(None, blob_source, blob)
+    digest, size = await loop.run_in_executor(None, blobs.digest, client.api_key, source)
+
+    async def upload() -> str:
+        resp = await store.upload(source, {"key": blobs.store_key(digest), "overwrite": True})
+        return resp["key"]
+
+    options["file_store_key"] = await blobs.key_for_async(digest, size, upload)
+    return options, None
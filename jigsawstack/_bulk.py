@@ -0,0 +1,395 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    TypeVar,
+    Union,
+)
+
+from typing_extensions import TypedDict
+
+# operations in flight at once, below the default connection pool size of the sync client
+DEFAULT_BULK_CONCURRENCY = 8
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BulkItemResult(TypedDict):
+    key: str
+    ok: bool
+    result: Any
+    error: Union[Exception, None]
+
+
+class BulkStats(TypedDict):
+    items: int
+    succeeded: int
+    failed: int
+    seconds: float
+    items_per_second: float
+    bytes: int
+    bytes_per_second: float
+
+
+class BulkResponse(TypedDict):
+    results: List[BulkItemResult]
+    stats: BulkStats
+
+
+class BatchItemResult(TypedDict):
+    index: int
+    ok: bool
+    result: Any
+    error: Union[Exception, None]
+
+
+class BatchStats(TypedDict):
+    submitted: int
+    completed: int
+    succeeded: int
+    failed: int
+    in_flight: int
+    seconds: float
+    items_per_second: float
+
+
+class _BatchBase:
+    # what the sync and async batches share: arguments, progress counters and the window
+    def __init__(
+        self,
+        fn: Callable[[T], Any],
+        items: Any,
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+        ordered: bool = True,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.fn = fn
+        self.items = items
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self._lock = threading.Lock()
+        self._started_at: Union[float, None] = None
+        self._submitted = 0
+        self._succeeded = 0
+        self._failed = 0
+        self._in_flight = 0
+
+    def stats(self) -> BatchStats:
+        """
+        Snapshot of the progress of the batch.
+
+        Returns:
+            BatchStats: Items submitted, completed, succeeded, failed and in flight,
+            and the throughput so far
+        """
+        with self._lock:
+            started_at = self._started_at
+            seconds = 0.0 if started_at is None else time.perf_counter() - started_at
+            completed = self._succeeded + self._failed
+            return BatchStats(
+                submitted=self._submitted,
+                completed=completed,
+                succeeded=self._succeeded,
+                failed=self._failed,
+                in_flight=self._in_flight,
+                seconds=seconds,
+                items_per_second=completed / seconds if seconds else 0.0,
+            )
+
+    def _start(self) -> None:
+        if self._started_at is not None:
+            raise RuntimeError("a batch can only be iterated once")
+        self._started_at = time.perf_counter()
+
+    def _has_slot(self, in_flight: int, ready: int) -> bool:
+        # results held back for a slow item count against the window, in flight ones too
+        return in_flight < self.concurrency and in_flight + ready < 2 * self.concurrency
+
+    def _submit(self) -> int:
+        with self._lock:
+            self._submitted += 1
+            self._in_flight += 1
+            return self._submitted - 1
+
+    def _collect(self, index: int, future: Any) -> BatchItemResult:
+        try:
+            result = BatchItemResult(index=index, ok=True, result=future.result(), error=None)
+        except (Exception, asyncio.CancelledError) as e:
+            # the future is done, so a cancelled item (e.g. by a timeout inside the call)
+            # is that item's failure. Cancelling the batch interrupts its wait instead
+            result = BatchItemResult(index=index, ok=False, result=None, error=e)
+        with self._lock:
+            self._in_flight -= 1
+            if result["ok"]:
+                self._succeeded += 1
+            else:
+                self._failed += 1
+        return result
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._in_flight = 0
+
+
+class Batch(_BatchBase):
+    """Calls of `fn` on every item, `concurrency` at a time on a thread pool,
+    iterated as their results are ready. An item failing does not stop the
+    others, its exception is returned in its result.
+
+    The calls start when iteration does. Items are drawn from `items` only as
+    slots free up, so a lazy source is never read far ahead. In input order, a
+    slow item holds back the results after it, at most `2 * concurrency` are
+    kept waiting for it before drawing more items pauses. Leaving the iteration
+    early cancels the calls not started yet and waits for those running.
+
+    `stats()` can be read from any thread while the batch runs.
+
+    Args:
+        fn (Callable[[T], R]): The operation
+        items (Iterable[T]): The items
+        concurrency (int): Calls in flight at once
+        ordered (bool): Yield results in input order, or as they complete
+    """
+
+    def __iter__(self) -> Iterator[BatchItemResult]:
+        self._start()
+        source = iter(self.items)
+        exhausted = False
+        positions: Dict[Future, int] = {}
+        ready: Dict[int, BatchItemResult] = {}
+        next_index = 0
+        pool = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="jigsawstack-batch"
+        )
+        try:
+            while True:
+                while not exhausted and self._has_slot(len(positions), len(ready)):
+                    try:
+                        item = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    positions[pool.submit(self.fn, item)] = self._submit()
+
+                if self.ordered and next_index in ready:
+                    yield ready.pop(next_index)
+                    next_index += 1
+                    continue
+                if not positions:
+                    return
+
+                done, _ = wait(positions, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=positions.__getitem__):
+                    result = self._collect(positions.pop(future), future)
+                    if self.ordered:
+                        ready[result["index"]] = result
+                    else:
+                        yield result
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self._finish()
+
+
+class AsyncBatch(_BatchBase):
+    """Like `Batch`, with the calls run as tasks on the event loop and the
+    results yielded by an async iterator. `items` can be a sync or an async
+    iterable, it is drawn lazily either way. A sync iterable is read on the
+    event loop, wrap a source that blocks in an async iterable.
+
+    A consumer that is slow holds back the calls: no call starts while
+    `concurrency` results wait to be consumed. Leaving the iteration early,
+    cancelling the consumer, or the source raising, cancels the calls in
+    flight and waits for them before going on, like an `asyncio.TaskGroup`.
+    Use the batch as an async context manager to cancel them on the spot when
+    the loop is left with `break`:
+
+        async with jigsaw.map(jigsaw.sentiment, rows) as results:
+            async for r in results:
+                ...
+
+    Args:
+        fn (Callable[[T], Awaitable[R]]): The operation
+        items (Union[Iterable[T], AsyncIterable[T]]): The items
+        concurrency (int): Calls in flight at once
+        ordered (bool): Yield results in input order, or as they complete
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[T], Awaitable[R]],
+        items: Union[Iterable[T], AsyncIterable[T]],
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+        ordered: bool = False,
+    ):
+        super().__init__(fn, items, concurrency, ordered)
+        self._results: Union[AsyncGenerator[BatchItemResult, None], None] = None
+
+    def __aiter__(self) -> AsyncIterator[BatchItemResult]:
+        if self._results is None:
+            self._start()
+            self._results = self.__run()
+        return self._results
+
+    async def aclose(self) -> None:
+        """Cancel the calls in flight and stop drawing items."""
+        if self._results is not None:
+            await self._results.aclose()
+
+    async def __aenter__(self) -> "AsyncBatch":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def __run(self) -> AsyncGenerator[BatchItemResult, None]:
+        source = _async_iter(self.items)
+        exhausted = False
+        positions: Dict[asyncio.Future, int] = {}
+        ready: Dict[int, BatchItemResult] = {}
+        next_index = 0
+        try:
+            while True:
+                while not exhausted and self._has_slot(len(positions), len(ready)):
+                    try:
+                        item = await source.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    positions[asyncio.ensure_future(self.fn(item))] = self._submit()
+
+                if self.ordered and next_index in ready:
+                    yield ready.pop(next_index)
+                    next_index += 1
+                    continue
+                if not positions:
+                    return
+
+                done, _ = await asyncio.wait(positions, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=positions.__getitem__):
+                    result = self._collect(positions.pop(task), task)
+                    if self.ordered:
+                        ready[result["index"]] = result
+                    else:
+                        yield result
+        finally:
+            for task in positions:
+                task.cancel()
+            await asyncio.gather(*positions, return_exceptions=True)
+            self._finish()
+
+
+async def _async_iter(items: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+def _size_of(result: Any) -> int:
+    # bytes read, or the size the store reports for a file written
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get("size"), int):
+        return result["size"]
+    return 0
+
+
+def _response(results: List[Any], started_at: float) -> BulkResponse:
+    seconds = time.perf_counter() - started_at
+    succeeded = sum(1 for r in results if r["ok"])
+    size = sum(_size_of(r["result"]) for r in results if r["ok"])
+    return BulkResponse(
+        results=results,
+        stats=BulkStats(
+            items=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            seconds=seconds,
+            items_per_second=len(results) / seconds if seconds else 0.0,
+            bytes=size,
+            bytes_per_second=size / seconds if seconds else 0.0,
+        ),
+    )
+
+
+def _keyed(keys: List[str], r: BatchItemResult) -> BulkItemResult:
+    return BulkItemResult(key=keys[r["index"]], ok=r["ok"], result=r["result"], error=r["error"])
+
+
+def run_bulk(
+    items: Iterable[T],
+    key_of: Callable[[T], str],
+    fn: Callable[[T], R],
+    concurrency: int = DEFAULT_BULK_CONCURRENCY,
+) -> BulkResponse:
+    """
+    Run `fn` on every item, `concurrency` at a time on a thread pool. An item
+    failing does not stop the others, its exception is returned in its result.
+
+    Items are drawn from `items` only as slots free up, so a lazy iterable
+    opening files is not read far ahead of the uploads.
+
+    Args:
+        items (Iterable[T]): The items
+        key_of (Callable[[T], str]): The key identifying an item in its result
+        fn (Callable[[T], R]): The operation
+        concurrency (int): Operations in flight at once
+
+    Returns:
+        BulkResponse: A result per item, in input order, and the throughput
+    """
+    started_at = time.perf_counter()
+    keys: List[str] = []
+
+    def keyed() -> Iterator[T]:
+        for item in items:
+            keys.append(key_of(item))
+            yield item
+
+    results: List[Union[BulkItemResult, None]] = []
+    # as completed, input order would hold items back and read further ahead
+    for r in Batch(fn, keyed(), concurrency, ordered=False):
+        results.extend([None] * (r["index"] + 1 - len(results)))
+        results[r["index"]] = _keyed(keys, r)
+    return _response(results, started_at)
+
+
+async def run_bulk_async(
+    items: Iterable[T],
+    key_of: Callable[[T], str],
+    fn: Callable[[T], Awaitable[R]],
+    concurrency: int = DEFAULT_BULK_CONCURRENCY,
+) -> BulkResponse:
+    """
+    Like `run_bulk`, with the operations run as tasks on the event loop.
+    Cancelling the call cancels the operations in flight.
+    """
+    started_at = time.perf_counter()
+    keys: List[str] = []
+
+    def keyed() -> Iterator[T]:
+        for item in items:
+            keys.append(key_of(item))
+            yield item
+
+    results: List[Union[BulkItemResult, None]] = []
+    async with AsyncBatch(fn, keyed(), concurrency) as batch:
+        async for r in batch:
+            results.extend([None] * (r["index"] + 1 - len(results)))
+            results[r["index"]] = _keyed(keys, r)
+    return _response(results, started_at)
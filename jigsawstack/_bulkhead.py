@@ -0,0 +1,183 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Union
+
+from typing_extensions import TypedDict
+
+from .exceptions import BulkheadFullError
+
+
+class BulkheadStats(TypedDict):
+    max_concurrent: int
+    in_flight: int
+    waiting: int
+    rejected: int
+
+
+class _Waiter:
+    def __init__(self, loop: Union[asyncio.AbstractEventLoop, None] = None):
+        self.granted = False
+        self.loop = loop
+        self.future: Union[asyncio.Future, None] = loop.create_future() if loop else None
+        self.event: Union[threading.Event, None] = None if loop else threading.Event()
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.__resolve)
+
+    def __resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class Bulkhead:
+    """Caps the calls in flight to one service so it cannot take every
+    connection and worker from the others.
+
+    Give long-running services (`web.deep_research`, `audio.speech_to_text`) a
+    small bulkhead and latency-sensitive ones (`validate`) their own, and slow
+    calls queue behind each other instead of in front of fast ones. A slot is
+    held for each attempt until its response arrives. On the async client the
+    slot is taken before a pooled connection, so the limits also partition the
+    connector between services.
+
+    Args:
+        max_concurrent (int): Calls allowed in flight at once.
+        max_queue (Union[int, None]): Calls allowed to wait for a slot. Calls past
+            it raise `BulkheadFullError`. None queues without limit.
+        queue_timeout (Union[float, None]): Seconds a call may wait for a slot before
+            raising `BulkheadFullError`. None waits forever.
+        name (str): Shown in errors. Set to the service name by the client.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: Union[int, None] = None,
+        queue_timeout: Union[float, None] = None,
+        name: str = "",
+    ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.name = name
+        self._in_flight = 0
+        self._rejected = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a slot is free. Every acquire must be paired with `release`.
+
+        Raises:
+            BulkheadFullError: If the queue is full or the wait timed out
+        """
+        waiter = self.__try_acquire(None)
+        if waiter is None:
+            return
+        if waiter.event.wait(self.queue_timeout):
+            return
+        self.__abandon(waiter)
+        if not waiter.granted:
+            raise self.__reject("timed out waiting for a slot")
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a slot is free.
+        Every acquire must be paired with `release`.
+
+        Raises:
+            BulkheadFullError: If the queue is full or the wait timed out
+        """
+        waiter = self.__try_acquire(asyncio.get_running_loop())
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.__abandon(waiter)
+            if not waiter.granted:
+                raise self.__reject("timed out waiting for a slot") from None
+        except asyncio.CancelledError:
+            self.__abandon(waiter)
+            if waiter.granted:
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Free a slot, handing it to the longest waiting call if any."""
+        with self._lock:
+            self._in_flight -= 1
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self._in_flight += 1
+                waiter.wake()
+
+    def stats(self) -> BulkheadStats:
+        """
+        Snapshot of the bulkhead metrics.
+
+        Returns:
+            BulkheadStats: The limit, calls in flight, calls waiting for a slot and
+            calls rejected so far
+        """
+        with self._lock:
+            return BulkheadStats(
+                max_concurrent=self.max_concurrent,
+                in_flight=self._in_flight,
+                waiting=len(self._waiters),
+                rejected=self._rejected,
+            )
+
+    def __try_acquire(self, loop: Union[asyncio.AbstractEventLoop, None]) -> Union[_Waiter, None]:
+        with self._lock:
+            if not self._waiters and self._in_flight < self.max_concurrent:
+                self._in_flight += 1
+                return None
+            if self.max_queue is not None and len(self._waiters) >= self.max_queue:
+                self._rejected += 1
+                raise BulkheadFullError(self.name, "queue is full")
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            return waiter
+
+    def __abandon(self, waiter: _Waiter) -> None:
+        # a slot may have been granted while the wait was timing out, the caller keeps it then
+        with self._lock:
+            if not waiter.granted:
+                self._waiters.remove(waiter)
+
+    def __reject(self, reason: str) -> BulkheadFullError:
+        with self._lock:
+            self._rejected += 1
+        return BulkheadFullError(self.name, reason)
+
+    def __repr__(self) -> str:
+        return f"Bulkhead(max_concurrent={self.max_concurrent}, max_queue={self.max_queue}, name={self.name!r})"
+
+
+# services of the clients, the keys accepted by their `bulkheads` option
+SERVICES = frozenset(
+    [
+        "audio",
+        "classification",
+        "embedding",
+        "embedding_v2",
+        "image_generation",
+        "prediction",
+        "prompt_engine",
+        "sentiment",
+        "store",
+        "summary",
+        "text_to_sql",
+        "translate",
+        "validate",
+        "vision",
+        "web",
+    ]
+)
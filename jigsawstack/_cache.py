@@ -0,0 +1,305 @@
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple, Union
+
+import requests
+from multidict import CIMultiDict, CIMultiDictProxy
+from requests.structures import CaseInsensitiveDict
+from typing_extensions import TypedDict
+
+from .helpers import endpoint_of, request_fingerprint
+
+SKIP_CACHE_HEADER = "x-jigsaw-skip-cache"
+
+# endpoints whose response only depends on the request, cached unless configured otherwise
+DEFAULT_CACHED_ENDPOINTS = frozenset(
+    [
+        "/ai/translate",
+        "/validate/spell_check",
+        "/ai/sql",
+        "/ai/sentiment",
+        "/embedding",
+    ]
+)
+CACHEABLE_VERBS = frozenset(["get", "post"])
+
+
+class CacheStats(TypedDict):
+    hits: int
+    misses: int
+    bypassed: int
+    evictions: int
+    size: int
+
+
+class CachedResponse:
+    """The parts of a successful response kept in the cache.
+
+    Args:
+        status (int): The response status code
+        headers (Dict[str, str]): The response headers
+        body (bytes): The response body
+    """
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def to_response(self, url: str) -> requests.Response:
+        """Rebuild a `requests.Response` for the sync client."""
+        resp = requests.Response()
+        resp.status_code = self.status
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp._content = self.body
+        resp.url = url
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        return resp
+
+    def to_async_response(self) -> "CachedClientResponse":
+        """Rebuild a response for the async client."""
+        return CachedClientResponse(self)
+
+
+class CachedClientResponse:
+    """Stands in for the `aiohttp.ClientResponse` of a cache hit, exposing the
+    subset the async client reads."""
+
+    def __init__(self, cached: CachedResponse):
+        self.status = cached.status
+        self.headers = CIMultiDictProxy(CIMultiDict(cached.headers))
+        self.content_length = len(cached.body)
+        self._body = cached.body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self._body.decode(encoding)
+
+    async def json(self, **kwargs: Any) -> Any:
+        return json.loads(self._body)
+
+    def release(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "CachedClientResponse":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+
+class CacheBackend(ABC):
+    """Storage behind a `ResponseCache`. Implementations must be thread safe.
+
+    Attributes:
+        blocking (bool): Whether operations do I/O. The async client then runs them
+            in a worker thread instead of on the event loop.
+        evictions (int): Entries dropped to stay within the size bound.
+    """
+
+    blocking = False
+    evictions = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Union[CachedResponse, None]:
+        """Return the fresh response stored under `key`, or None."""
+
+    @abstractmethod
+    def set(self, key: str, response: CachedResponse, ttl: Union[float, None]) -> None:
+        """Store a response for `ttl` seconds, or until evicted when `ttl` is None."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every stored response."""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Number of stored responses."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process backend evicting the least recently used entry past `max_entries`.
+
+    Args:
+        max_entries (int): Responses kept at most.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: OrderedDict[str, Tuple[Union[float, None], CachedResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Union[CachedResponse, None]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, response: CachedResponse, ttl: Union[float, None]) -> None:
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._entries[key] = (expires_at, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class ResponseCache:
+    """Opt-in cache of successful responses from deterministic endpoints.
+
+    Calls are keyed by verb, URL, API key and their canonicalized params and JSON
+    body, so the same inputs hit the cache whatever order their keys were
+    written in. Only GET and POST calls to enabled endpoints are cached, never
+    streams or file uploads. Calls sending `x-jigsaw-skip-cache: true` bypass it.
+
+    Responses are kept in memory by default. Pass a `SQLiteCacheBackend` to
+    persist them across restarts and share them between processes.
+
+    Args:
+        max_entries (int): Responses kept at most by the default in-memory backend.
+        ttl (Union[float, None]): Seconds a response stays fresh. None keeps it until evicted.
+        endpoints (Iterable[str]): Endpoints to cache, e.g. "/ai/translate" or "/embedding".
+            Defaults to `DEFAULT_CACHED_ENDPOINTS`.
+        backend (Union[CacheBackend, None]): Where responses are stored.
+            Defaults to `MemoryCacheBackend(max_entries)`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Union[float, None] = 300.0,
+        endpoints: Iterable[str] = DEFAULT_CACHED_ENDPOINTS,
+        backend: Union[CacheBackend, None] = None,
+    ):
+        self.ttl = ttl
+        self.endpoints = set(endpoints)
+        self.backend = backend or MemoryCacheBackend(max_entries)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+
+    def enable(self, endpoint: str) -> None:
+        """Start caching an endpoint."""
+        self.endpoints.add(endpoint)
+
+    def disable(self, endpoint: str) -> None:
+        """Stop caching an endpoint. Entries already cached for it are no longer read."""
+        self.endpoints.discard(endpoint)
+
+    def key_for(
+        self, verb: str, url: str, path: Union[str, None], kwargs: Dict[str, Any]
+    ) -> Union[str, None]:
+        """
+        Build the cache key of a call.
+
+        Args:
+            verb (str): The HTTP method
+            url (str): The URL of the call
+            path (Union[str, None]): The API path
+            kwargs (Dict[str, Any]): The keyword arguments the transport sends
+
+        Returns:
+            Union[str, None]: The key, or None if the call must not be cached
+        """
+        if verb.lower() not in CACHEABLE_VERBS or endpoint_of(path) not in self.endpoints:
+            return None
+        if kwargs.get("stream") or kwargs.get("files") or kwargs.get("data"):
+            return None
+
+        headers = kwargs.get("headers") or {}
+        if any(
+            k.lower() == SKIP_CACHE_HEADER and str(v).lower() == "true" for k, v in headers.items()
+        ):
+            with self._lock:
+                self._bypassed += 1
+            return None
+
+        return request_fingerprint(
+            verb, url, headers.get("x-api-key", ""), kwargs.get("params"), kwargs.get("json")
+        )
+
+    def get(self, key: str) -> Union[CachedResponse, None]:
+        """
+        Look up a fresh response, counting a hit or a miss.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            Union[CachedResponse, None]: The cached response, or None on a miss
+        """
+        response = self.backend.get(key)
+        with self._lock:
+            if response is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return response
+
+    def set(self, key: str, response: CachedResponse) -> None:
+        """
+        Store a response for `ttl` seconds.
+
+        Args:
+            key (str): The cache key
+            response (CachedResponse): The response to keep
+        """
+        self.backend.set(key, response, self.ttl)
+
+    async def get_async(self, key: str) -> Union[CachedResponse, None]:
+        """Like `get`, off the event loop when the backend does I/O."""
+        if not self.backend.blocking:
+            return self.get(key)
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, key)
+
+    async def set_async(self, key: str, response: CachedResponse) -> None:
+        """Like `set`, off the event loop when the backend does I/O."""
+        if not self.backend.blocking:
+            return self.set(key, response)
+        await asyncio.get_running_loop().run_in_executor(None, self.set, key, response)
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self.backend.clear()
+
+    def stats(self) -> CacheStats:
+        """
+        Snapshot of the cache metrics.
+
+        Returns:
+            CacheStats: Hits, misses, calls that bypassed the cache, entries evicted
+            by the backend to stay within its size bound, and entries currently held
+        """
+        with self._lock:
+            hits, misses, bypassed = self._hits, self._misses, self._bypassed
+        return CacheStats(
+            hits=hits,
+            misses=misses,
+            bypassed=bypassed,
+            evictions=self.backend.evictions,
+            size=self.backend.size(),
+        )
@@ -0,0 +1,247 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from array import array
+from typing import Any, List, Tuple, Union
+
+from typing_extensions import Literal
+
+from ._cache import CacheBackend, CachedResponse
+
+# response fields holding one vector per row, stored as packed floats instead of JSON text
+VECTOR_FIELDS = ("embeddings", "speaker_embeddings")
+# seconds a read time may lag behind, so most cache hits do not take the write lock
+ACCESS_TIME_RESOLUTION = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    vectors BLOB,
+    layout TEXT,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+-- running total of the stored bytes, kept in the transaction of every change
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (name, value)
+    SELECT 'bytes', COALESCE(SUM(size), 0) FROM responses;
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE meta SET value = value + NEW.size WHERE name = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE meta SET value = value - OLD.size WHERE name = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS responses_update AFTER UPDATE OF size ON responses BEGIN
+    UPDATE meta SET value = value + NEW.size - OLD.size WHERE name = 'bytes';
+END;
+"""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache backend persisted in a SQLite database, shared by every process
+    (and thread) that opens the same file.
+
+    The database runs in WAL mode so readers never block the writer. When the
+    stored bytes exceed `max_bytes` the least recently read responses are
+    deleted. Read times are recorded to `ACCESS_TIME_RESOLUTION` seconds, so
+    a hit only writes when its entry was not read for that long. Embedding vectors in a JSON body are packed as binary floats,
+    a fraction of the size of their JSON text.
+
+    Args:
+        path (str): The database file, created if missing.
+        max_bytes (Union[int, None]): Upper bound on the stored bytes. None means unbounded.
+        vector_dtype (Literal["float64", "float32"]): How vectors are packed. "float64"
+            round-trips exactly, "float32" halves the size at the cost of precision.
+        timeout (float): Seconds to wait for another process holding the write lock.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Union[int, None] = 256 * 1024 * 1024,
+        vector_dtype: Literal["float64", "float32"] = "float64",
+        timeout: float = 30.0,
+    ):
+        if vector_dtype not in ("float64", "float32"):
+            raise ValueError("vector_dtype must be 'float64' or 'float32'")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.vector_dtype = vector_dtype
+        self.timeout = timeout
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        conn = self.__connect()
+        # one process creates the schema and counts the bytes of an existing database
+        conn.executescript(f"BEGIN IMMEDIATE; {_SCHEMA} COMMIT;")
+
+    def get(self, key: str) -> Union[CachedResponse, None]:
+        conn = self.__connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT status, headers, body, vectors, layout, expires_at, accessed_at"
+            " FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, vectors, layout, expires_at, accessed_at = row
+        if expires_at is not None and expires_at <= now:
+            with conn:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+        if now - accessed_at >= ACCESS_TIME_RESOLUTION:
+            with conn:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        if layout is not None:
+            body = _unpack_vectors(body, vectors, json.loads(layout))
+        return CachedResponse(status, json.loads(headers), body)
+
+    def set(self, key: str, response: CachedResponse, ttl: Union[float, None]) -> None:
+        body, vectors, layout = _pack_vectors(response.body, self.vector_dtype)
+        headers = json.dumps(response.headers)
+        size = len(key) + len(headers) + len(body) + len(vectors or b"")
+        now = time.time()
+        conn = self.__connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, status, headers, body, vectors, layout, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    response.status,
+                    headers,
+                    body,
+                    vectors,
+                    None if layout is None else json.dumps(layout),
+                    size,
+                    None if ttl is None else now + ttl,
+                    now,
+                ),
+            )
+        if self.max_bytes is not None:
+            self.__evict(conn, now)
+
+    def clear(self) -> None:
+        conn = self.__connect()
+        with conn:
+            conn.execute("DELETE FROM responses")
+
+    def size(self) -> int:
+        return self.__connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stored_bytes(self) -> int:
+        """Bytes of the responses stored, as counted against `max_bytes`."""
+        return self.__stored_bytes(self.__connect())
+
+    def __stored_bytes(self, conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def __evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.__stored_bytes(conn) <= self.max_bytes:
+            return
+        with conn:
+            # expired entries go first, then the least recently read until under the bound
+            evicted = conn.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            ).rowcount
+            excess = self.__stored_bytes(conn) - self.max_bytes
+            if excess > 0:
+                keys: List[Tuple[str]] = []
+                for key, size in conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at"
+                ):
+                    keys.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+                evicted += len(keys)
+        with self._lock:
+            self.evictions += evicted
+
+    def __connect(self) -> sqlite3.Connection:
+        # sqlite connections must not cross threads or a fork, keep one per thread and process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # the rows an INSERT OR REPLACE deletes must leave the byte count too
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+def _pack_vectors(
+    body: bytes, dtype: str
+) -> Tuple[bytes, Union[bytes, None], Union[List[List[Any]], None]]:
+    """Split the vector fields out of a JSON body into packed little-endian floats.
+
+    Returns:
+        Tuple: The remaining body, the packed vectors and the layout needed to
+        restore them, or the body untouched and None when it holds no vectors
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body, None, None
+    if not isinstance(data, dict):
+        return body, None, None
+
+    typecode = "d" if dtype == "float64" else "f"
+    packed = array(typecode)
+    layout: List[List[Any]] = []
+    for field in VECTOR_FIELDS:
+        rows = data.get(field)
+        if not _is_matrix(rows):
+            continue
+        for row in rows:
+            packed.extend(row)
+        layout.append([field, len(rows), len(rows[0])])
+        del data[field]
+
+    if not layout:
+        return body, None, None
+    if sys.byteorder == "big":
+        packed.byteswap()
+    remaining = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return remaining, packed.tobytes(), [[typecode]] + layout
+
+
+def _unpack_vectors(body: bytes, vectors: bytes, layout: List[List[Any]]) -> bytes:
+    (typecode,), fields = layout[0], layout[1:]
+    packed = array(typecode)
+    packed.frombytes(vectors)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    values = packed.tolist()
+
+    data = json.loads(body)
+    offset = 0
+    for field, rows, dims in fields:
+        data[field] = [values[offset + r * dims : offset + (r + 1) * dims] for r in range(rows)]
+        offset += rows * dims
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _is_matrix(rows: Any) -> bool:
+    # only equal-length rows of floats round-trip through a flat float array
+    if not isinstance(rows, list) or not all(isinstance(r, list) for r in rows):
+        return False
+    if not rows:
+        return False
+    dims = len(rows[0])
+    return all(len(r) == dims and all(type(v) is float for v in r) for r in rows)
@@ -0,0 +1,211 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Union
+
+from typing_extensions import TypedDict
+
+DEFAULT_INITIAL_LIMIT = 8
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 256
+# share of `smoothing` given to samples slow enough to count as congestion, so a
+# lasting shift in latency moves the baseline, more slowly than a healthy sample
+SLOW_SAMPLE_WEIGHT = 0.25
+
+
+class ConcurrencyStats(TypedDict):
+    limit: int
+    in_flight: int
+    waiting: int
+    latency: Union[float, None]
+
+
+class _EndpointLimit:
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        # smoothed latency of successful calls, the reference "rising latency" is measured against
+        self.latency: Union[float, None] = None
+        self.decreased_at = 0.0
+
+
+class AdaptiveConcurrencyLimiter:
+    """Per-endpoint concurrency limit tuned with AIMD from observed responses.
+
+    Every endpoint starts at `initial_limit` calls in flight. Each healthy
+    response raises its limit by about one per round trip (additive increase),
+    a 429, 5xx, connection error, timeout or a latency well above the recent
+    average cuts it by `backoff_ratio` (multiplicative decrease), at most once
+    per round trip so a burst of failures is treated as one congestion signal.
+    Slow responses still move the latency baseline, more slowly than healthy
+    ones, so a lasting shift in latency is eventually accepted as normal and
+    the limit grows again.
+    Calls over the limit wait in FIFO order for a slot instead of piling onto
+    an endpoint that is already struggling.
+
+    Slots and waiters belong to the event loop that took them. When the
+    limiter is used from a new loop (e.g. one `asyncio.run` per call), those
+    of the previous loop are dropped, like the session of `AsyncTransport`,
+    while the learned limits and latencies carry over.
+
+    Args:
+        initial_limit (int): Calls allowed in flight per endpoint before any feedback.
+        min_limit (int): The limit never drops below this.
+        max_limit (int): The limit never grows above this.
+        backoff_ratio (float): Factor applied to the limit on a congestion signal.
+        latency_tolerance (float): A healthy call slower than this multiple of the
+            smoothed latency counts as a congestion signal.
+        smoothing (float): Weight of each new sample in the smoothed latency.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.1,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self._endpoints: Dict[str, _EndpointLimit] = {}
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+
+    async def acquire(self, endpoint: str) -> None:
+        """
+        Wait for a slot on `endpoint`. Every acquire must be paired with `release`.
+
+        Args:
+            endpoint (str): The endpoint, as returned by `endpoint_of`
+        """
+        loop = asyncio.get_running_loop()
+        self.__bind(loop)
+        state = self.__state(endpoint)
+        if not state.waiters and state.in_flight < int(state.limit):
+            state.in_flight += 1
+            return
+
+        waiter = loop.create_future()
+        state.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as we were cancelled, pass it on
+                state.in_flight -= 1
+                self.__wake(state)
+            else:
+                state.waiters.remove(waiter)
+            raise
+
+    def release(
+        self, endpoint: str, latency: Union[float, None] = None, overloaded: bool = False
+    ) -> None:
+        """
+        Give back a slot and feed the outcome of the call into the limit.
+
+        Args:
+            endpoint (str): The endpoint the slot was acquired for
+            latency (Union[float, None]): Seconds until the response arrived.
+                None when the call produced no response.
+            overloaded (bool): The server signalled overload (429, 5xx) or the call
+                failed with a connection error or timeout
+        """
+        state = self.__state(endpoint)
+        # a slot taken on a previous loop was dropped when the limiter was rebound
+        current = _running_loop() is self._loop
+        if current:
+            state.in_flight -= 1
+
+        slow = (
+            latency is not None
+            and state.latency is not None
+            and latency > state.latency * self.latency_tolerance
+        )
+        now = time.monotonic()
+        if overloaded or slow:
+            if now - state.decreased_at >= (state.latency or 0.0):
+                state.limit = max(float(self.min_limit), state.limit * self.backoff_ratio)
+                state.decreased_at = now
+        elif latency is not None:
+            state.limit = min(float(self.max_limit), state.limit + 1 / state.limit)
+        if latency is not None and not overloaded:
+            if state.latency is None:
+                state.latency = latency
+            else:
+                weight = self.smoothing * (SLOW_SAMPLE_WEIGHT if slow else 1.0)
+                state.latency += weight * (latency - state.latency)
+
+        if current:
+            self.__wake(state)
+
+    def limit(self, endpoint: str) -> int:
+        """
+        The current concurrency limit of an endpoint.
+
+        Args:
+            endpoint (str): The endpoint, as returned by `endpoint_of`
+
+        Returns:
+            int: Calls currently allowed in flight
+        """
+        return int(self.__state(endpoint).limit)
+
+    def stats(self) -> Dict[str, ConcurrencyStats]:
+        """
+        Snapshot of every endpoint seen so far.
+
+        Returns:
+            Dict[str, ConcurrencyStats]: Per endpoint, the current limit, calls in
+            flight, calls waiting for a slot and the smoothed latency in seconds
+        """
+        return {
+            endpoint: ConcurrencyStats(
+                limit=int(state.limit),
+                in_flight=state.in_flight,
+                waiting=len(state.waiters),
+                latency=state.latency,
+            )
+            for endpoint, state in self._endpoints.items()
+        }
+
+    def __bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        if loop is self._loop:
+            return
+        # the calls of the previous loop may never release their slots, or wake
+        # their waiters, if it was closed with them pending
+        for state in self._endpoints.values():
+            state.in_flight = 0
+            state.waiters.clear()
+        self._loop = loop
+
+    def __state(self, endpoint: str) -> _EndpointLimit:
+        state = self._endpoints.get(endpoint)
+        if state is None:
+            state = self._endpoints[endpoint] = _EndpointLimit(float(self.initial_limit))
+        return state
+
+    @staticmethod
+    def __wake(state: _EndpointLimit) -> None:
+        while state.waiters and state.in_flight < int(state.limit):
+            waiter = state.waiters.popleft()
+            if not waiter.done():
+                state.in_flight += 1
+                waiter.set_result(None)
+
+
+def _running_loop() -> Union[asyncio.AbstractEventLoop, None]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
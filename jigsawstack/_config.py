@@ -1,17 +1,22 @@
 from typing import Dict, Union
 
+from ._transport import AsyncTransport, Transport
+
 
 class ClientConfig:
     base_url: str
     api_key: str
     headers: Union[Dict[str, str], None]
+    transport: Union[Transport, AsyncTransport, None]
 
     def __init__(
         self,
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, AsyncTransport, None] = None,
     ):
         self.api_key = api_key
         self.base_url = base_url
         self.headers = headers
+        self.transport = transport
@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Tuple, Union
+
+from typing_extensions import TypedDict
+
+from ._upload import UploadBody, open_upload
+
+# bytes of an unsized stream kept in memory while it is hashed, past that it spills to a temp file
+SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class UploadDedupStats(TypedDict):
+    hits: int
+    misses: int
+    bytes_saved: int
+
+
+class UploadManifest(ABC):
+    """Index of the content already uploaded, from the digest of the bytes to
+    the `FileUploadResponse` the store returned for them. Implementations must
+    be thread safe.
+
+    Attributes:
+        blocking (bool): Whether operations do I/O. The async client then runs them
+            in a worker thread instead of on the event loop.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def get(self, digest: str) -> Union[Dict[str, Any], None]:
+        """Return the response recorded for `digest`, or None."""
+
+    @abstractmethod
+    def set(self, digest: str, response: Dict[str, Any]) -> None:
+        """Record the response of an upload."""
+
+    @abstractmethod
+    def discard_key(self, key: str) -> None:
+        """Forget the content stored under `key`, e.g. once it was deleted."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forget every upload."""
+
+
+class MemoryUploadManifest(UploadManifest):
+    """In-process manifest, forgotten when the process exits."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, digest: str) -> Union[Dict[str, Any], None]:
+        with self._lock:
+            return self._entries.get(digest)
+
+    def set(self, digest: str, response: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[digest] = response
+
+    def discard_key(self, key: str) -> None:
+        with self._lock:
+            for digest in [d for d, r in self._entries.items() if r.get("key") == key]:
+                del self._entries[digest]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteUploadManifest(UploadManifest):
+    """Manifest persisted in a SQLite database, shared by every process that
+    opens the same file, so content uploaded by one job is not sent again by
+    the next.
+
+    Args:
+        path (str): The database file, created if missing.
+        timeout (float): Seconds to wait for another process holding the write lock.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self.__connect() as conn:
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                " digest TEXT PRIMARY KEY, key TEXT, response TEXT NOT NULL, created_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS uploads_key ON uploads (key);"
+            )
+
+    def get(self, digest: str) -> Union[Dict[str, Any], None]:
+        row = (
+            self.__connect()
+            .execute("SELECT response FROM uploads WHERE digest = ?", (digest,))
+            .fetchone()
+        )
+        return None if row is None else json.loads(row[0])
+
+    def set(self, digest: str, response: Dict[str, Any]) -> None:
+        with self.__connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO uploads (digest, key, response, created_at) VALUES (?, ?, ?, ?)",
+                (digest, response.get("key"), json.dumps(response), time.time()),
+            )
+
+    def discard_key(self, key: str) -> None:
+        with self.__connect() as conn:
+            conn.execute("DELETE FROM uploads WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self.__connect() as conn:
+            conn.execute("DELETE FROM uploads")
+
+    def __connect(self) -> sqlite3.Connection:
+        # sqlite connections must not cross threads or a fork, keep one per thread and process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+class UploadDedup:
+    """Opt-in content-addressed uploads.
+
+    Before a file is uploaded its bytes are hashed as a stream. If the manifest
+    already holds a file with the same content, uploaded with the same API key,
+    the upload is skipped and the `FileUploadResponse` of that file is returned.
+    Its key may differ from the key requested. Uploads asking for a temporary
+    public URL always go to the store, their URL expires.
+
+    Paths, buffers and seekable files are read twice, once to hash and once to
+    upload. Iterators are spooled while they are hashed, in memory up to
+    `SPOOL_SIZE` bytes and to a temp file past that.
+
+    Args:
+        manifest (Union[UploadManifest, None]): Where uploads are recorded.
+            Defaults to a `MemoryUploadManifest`.
+        algorithm (str): The `hashlib` algorithm content is identified by.
+    """
+
+    def __init__(self, manifest: Union[UploadManifest, None] = None, algorithm: str = "sha256"):
+        hashlib.new(algorithm)
+        self.manifest = manifest or MemoryUploadManifest()
+        self.algorithm = algorithm
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bytes_saved = 0
+
+    def applies(self, options: Dict[str, Any]) -> bool:
+        """Whether an upload with these options may be deduplicated."""
+        return not options.get("temp_public_url")
+
+    def digest_key(self, api_key: str, digest: str) -> str:
+        """The manifest key of content uploaded with an API key."""
+        # content uploaded with another API key lives in another account
+        scope = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return f"{scope}:{self.algorithm}:{digest}"
+
+    def lookup(self, digest_key: str, size: int) -> Union[Dict[str, Any], None]:
+        """
+        Find the upload of the same content, counting a hit or a miss.
+
+        Args:
+            digest_key (str): The key from `digest_key`
+            size (int): Bytes of the content, counted as saved on a hit
+
+        Returns:
+            Union[Dict[str, Any], None]: The `FileUploadResponse` of the earlier upload
+        """
+        response = self.manifest.get(digest_key)
+        with self._lock:
+            if response is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._bytes_saved += size
+        return response
+
+    def record(self, digest_key: str, response: Dict[str, Any]) -> None:
+        """Record a completed upload."""
+        key = response.get("key")
+        if key is not None:
+            # an overwrite replaced what the key held, other content recorded for it is gone
+            self.manifest.discard_key(key)
+        self.manifest.set(digest_key, response)
+
+    def forget(self, key: str) -> None:
+        """Forget the content stored under a deleted key."""
+        self.manifest.discard_key(key)
+
+    async def lookup_async(self, digest_key: str, size: int) -> Union[Dict[str, Any], None]:
+        """Like `lookup`, off the event loop when the manifest does I/O."""
+        if not self.manifest.blocking:
+            return self.lookup(digest_key, size)
+        return await asyncio.get_running_loop().run_in_executor(None, self.lookup, digest_key, size)
+
+    async def record_async(self, digest_key: str, response: Dict[str, Any]) -> None:
+        """Like `record`, off the event loop when the manifest does I/O."""
+        if not self.manifest.blocking:
+            return self.record(digest_key, response)
+        await asyncio.get_running_loop().run_in_executor(None, self.record, digest_key, response)
+
+    async def forget_async(self, key: str) -> None:
+        """Like `forget`, off the event loop when the manifest does I/O."""
+        if not self.manifest.blocking:
+            return self.forget(key)
+        await asyncio.get_running_loop().run_in_executor(None, self.forget, key)
+
+    @contextmanager
+    def hashed(self, file: Any) -> Iterator[Tuple[str, int, Any]]:
+        """
+        Hash an upload source without holding it in memory.
+
+        Args:
+            file (Any): Anything `Store.upload` accepts
+
+        Returns:
+            Iterator[Tuple[str, int, Any]]: The hex digest, the size, and a body
+            to upload from the start
+        """
+        with open_upload(file) as body:
+            h = hashlib.new(self.algorithm)
+            if isinstance(body, bytes):
+                h.update(body)
+                yield h.hexdigest(), len(body), body
+            elif isinstance(body, UploadBody):
+                for chunk in body:
+                    h.update(chunk)
+                body.rewind()
+                yield h.hexdigest(), body.size, body
+            else:
+                with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+                    for chunk in body:
+                        h.update(chunk)
+                        spool.write(chunk)
+                    spooled = UploadBody(spool, offset=0)
+                    yield h.hexdigest(), spooled.size, spooled
+
+    @asynccontextmanager
+    async def hashed_async(self, file: Any) -> AsyncIterator[Tuple[str, int, Any]]:
+        """Like `hashed`, with file reads run in the default executor and async
+        iterables accepted."""
+        loop = asyncio.get_running_loop()
+        if not hasattr(file, "__aiter__"):
+            hashed = self.hashed(file)
+            # hashing a file reads it whole, keep it off the event loop
+            result = await loop.run_in_executor(None, hashed.__enter__)
+            try:
+                yield result
+            finally:
+                hashed.__exit__(None, None, None)
+            return
+
+        h = hashlib.new(self.algorithm)
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+            async for chunk in file:
+                h.update(chunk)
+                # past SPOOL_SIZE the write goes to disk
+                await loop.run_in_executor(None, spool.write, chunk)
+            spooled = UploadBody(spool, offset=0)
+            yield h.hexdigest(), spooled.size, spooled
+
+    def stats(self) -> UploadDedupStats:
+        """
+        Snapshot of the dedup metrics.
+
+        Returns:
+            UploadDedupStats: Uploads skipped, uploads sent, and bytes not sent
+        """
+        with self._lock:
+            return UploadDedupStats(
+                hits=self._hits, misses=self._misses, bytes_saved=self._bytes_saved
+            )
@@ -0,0 +1,531 @@
+import asyncio
+import json
+import os
+import re
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Iterator,
+    List,
+    Mapping,
+    Tuple,
+    Union,
+)
+
+import aiohttp
+import requests
+
+from ._upload import CHUNK_SIZE
+from .exceptions import IncompleteDownloadError, raise_for_code_and_type
+
+# where a download is written: a path, or a binary file open for writing
+Destination = Union[str, "os.PathLike[str]", BinaryIO]
+
+# bytes fetched per range by a parallel download
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+# ranges fetched at once, below the default connection pool size of the sync client
+DEFAULT_PARALLELISM = 8
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+def range_header(start: int = 0, end: Union[int, None] = None) -> Union[str, None]:
+    """
+    Build the HTTP Range header value selecting bytes `start` to `end`.
+
+    Args:
+        start (int): First byte to read. A negative value reads the last `-start` bytes.
+        end (Union[int, None]): Last byte to read, inclusive. None reads to the end.
+
+    Returns:
+        Union[str, None]: The header value, or None when the whole object is read
+    """
+    if start < 0:
+        if end is not None:
+            raise ValueError("end cannot be set when start is negative")
+        return f"bytes={start}"
+    if end is not None and end < start:
+        raise ValueError("end must not be before start")
+    if start == 0 and end is None:
+        return None
+    return f"bytes={start}-{'' if end is None else end}"
+
+
+class _Window:
+    """Tracks which bytes of the body to keep and which part of the object they are.
+
+    A server may ignore the Range header and send the whole object with a 200,
+    the bytes outside the range are then dropped here."""
+
+    def __init__(self, status: int, headers: Mapping[str, str], start: int, end: Union[int, None]):
+        length = headers.get("content-length")
+        # a compressed body is longer once decoded than its Content-Length says
+        encoded = headers.get("content-encoding", "identity") != "identity"
+        length = int(length) if length is not None and not encoded else None
+        match = _CONTENT_RANGE.match(headers.get("content-range") or "")
+
+        self.skip = 0
+        self.remaining: Union[int, None] = None
+        if status == 206 and match:
+            self.start = int(match.group(1))
+            self.size: Union[int, None] = int(match.group(2)) - self.start + 1
+            self.total_size = None if match.group(3) == "*" else int(match.group(3))
+        else:
+            # the whole object, cut down to the range requested if one was
+            self.total_size = length
+            if start < 0:
+                if length is None:
+                    raise ValueError("A suffix range needs the size of the object")
+                start = max(0, length + start)
+            self.start = start
+            self.skip = start
+            last = length - 1 if length is not None else None
+            if end is not None:
+                last = end if last is None else min(end, last)
+            self.size = None if last is None else max(0, last - start + 1)
+            self.remaining = self.size if (start or end is not None) else None
+
+    def cut(self, chunk: bytes) -> bytes:
+        if self.skip:
+            dropped = min(self.skip, len(chunk))
+            chunk = chunk[dropped:]
+            self.skip -= dropped
+        if self.remaining is not None:
+            chunk = chunk[: self.remaining]
+            self.remaining -= len(chunk)
+        return chunk
+
+    @property
+    def done(self) -> bool:
+        return self.remaining == 0
+
+
+def part_ranges(start: int, end: int, part_size: int) -> List[Tuple[int, int]]:
+    """
+    Split bytes `start` to `end`, inclusive, into ranges of at most `part_size` bytes.
+
+    Returns:
+        List[Tuple[int, int]]: The first and last byte of each range
+    """
+    if part_size < 1:
+        raise ValueError("part_size must be at least 1")
+    return [(s, min(s + part_size, end + 1) - 1) for s in range(start, end + 1, part_size)]
+
+
+class PositionedFile:
+    """A file preallocated to its final size and written at given offsets, so
+    ranges arriving in any order from several threads land in place.
+
+    Args:
+        path (Union[str, os.PathLike]): The file, created or truncated
+        size (int): The final size of the file
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"], size: int):
+        self.path = path
+        self.size = size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+        # without pwrite, seek and write must not interleave between threads
+        self._lock = None if hasattr(os, "pwrite") else threading.Lock()
+        try:
+            if size and hasattr(os, "posix_fallocate"):
+                # reserve the blocks now, a full disk fails here instead of mid-download
+                os.posix_fallocate(self._fd, 0, size)
+            else:
+                os.ftruncate(self._fd, size)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def write_at(self, data: bytes, offset: int) -> None:
+        """Write `data` at `offset` without moving a shared file position."""
+        view = memoryview(data)
+        while view:
+            if self._lock is None:
+                written = os.pwrite(self._fd, view, offset)
+            else:
+                with self._lock:
+                    os.lseek(self._fd, offset, os.SEEK_SET)
+                    written = os.write(self._fd, view)
+            view = view[written:]
+            offset += written
+
+    def verify(self, received: int) -> None:
+        """
+        Check the file holds every byte of the object.
+
+        Args:
+            received (int): Bytes written by all the ranges
+
+        Raises:
+            IncompleteDownloadError: If bytes are missing
+        """
+        on_disk = os.fstat(self._fd).st_size
+        if received != self.size or on_disk != self.size:
+            raise IncompleteDownloadError(self.size, min(received, on_disk))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+    def discard(self) -> None:
+        """Close and delete a file whose download failed."""
+        self.close()
+        _remove(self.path)
+
+
+def raise_for_download(status: int, content_type: str, body: bytes) -> None:
+    """Raise the error of a failed download from its response body."""
+    error: Any = None
+    if "application/json" in content_type:
+        try:
+            error = json.loads(body)
+        except ValueError:
+            pass
+    if not isinstance(error, dict):
+        raise_for_code_and_type(
+            code=status,
+            message=body.decode("utf-8", "replace") or f"Download failed with status {status}",
+        )
+    raise_for_code_and_type(code=status, message=error.get("message"), err=error.get("error"))
+
+
+class DownloadResponse:
+    """Binary body of a stored file, read from the socket in chunks.
+
+    Iterating yields the bytes as they arrive, nothing is decoded or buffered
+    ahead of the consumer. Use it as a context manager, or read it to the end,
+    so the connection goes back to the pool. `IncompleteDownloadError` is
+    raised if the body ends before the announced size.
+
+    Attributes:
+        response (requests.Response): The underlying streaming response
+        content_type (str): The content type of the file
+        partial (bool): The server answered the Range request with part of the file
+        start (int): Offset in the file of the first byte of the body
+        size (Union[int, None]): Bytes the body holds, None if not announced
+        total_size (Union[int, None]): Size of the whole file, None if not announced
+        received (int): Bytes read so far
+    """
+
+    def __init__(
+        self,
+        response: requests.Response,
+        start: int = 0,
+        end: Union[int, None] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.response = response
+        self.content_type = response.headers.get("content-type", "application/octet-stream")
+        self.chunk_size = chunk_size
+        self.received = 0
+        self._window = _Window(response.status_code, response.headers, start, end)
+        self.partial = response.status_code == 206
+        self.start = self._window.start
+        self.size = self._window.size
+        self.total_size = self._window.total_size
+        self._chunks = self.__iter_chunks()
+
+    def __iter_chunks(self) -> Iterator[bytes]:
+        try:
+            try:
+                for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                    chunk = self._window.cut(chunk)
+                    if chunk:
+                        self.received += len(chunk)
+                        yield chunk
+                    if self._window.done:
+                        break
+            except (requests.exceptions.ChunkedEncodingError, requests.ConnectionError) as e:
+                if self.size is None:
+                    raise
+                raise IncompleteDownloadError(self.size, self.received) from e
+            if self.size is not None and self.received != self.size:
+                raise IncompleteDownloadError(self.size, self.received)
+        finally:
+            self.response.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._chunks)
+
+    def read(self) -> bytes:
+        """Read the rest of the body into memory."""
+        return b"".join(self)
+
+    def write_to(self, destination: Destination) -> int:
+        """
+        Write the rest of the body to a path or a binary file.
+
+        A file created from a path is deleted if the download fails.
+
+        Args:
+            destination (Destination): The path, or a binary file open for writing
+
+        Returns:
+            int: Bytes written
+        """
+        if not isinstance(destination, (str, os.PathLike)):
+            written = 0
+            for chunk in self:
+                destination.write(chunk)
+                written += len(chunk)
+            return written
+
+        try:
+            with open(destination, "wb") as f:
+                return self.write_to(f)
+        except BaseException:
+            self.close()
+            _remove(destination)
+            raise
+
+    def close(self) -> None:
+        """Stop reading and release the connection back to the pool."""
+        self._chunks.close()
+        self.response.close()
+
+    def __enter__(self) -> "DownloadResponse":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AsyncDownloadResponse:
+    """Binary body of a stored file, read from the socket in chunks by the
+    async client. See `DownloadResponse`.
+
+    Attributes:
+        response (aiohttp.ClientResponse): The underlying streaming response
+        content_type (str): The content type of the file
+        partial (bool): The server answered the Range request with part of the file
+        start (int): Offset in the file of the first byte of the body
+        size (Union[int, None]): Bytes the body holds, None if not announced
+        total_size (Union[int, None]): Size of the whole file, None if not announced
+        received (int): Bytes read so far
+    """
+
+    def __init__(
+        self,
+        response: aiohttp.ClientResponse,
+        start: int = 0,
+        end: Union[int, None] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self.response = response
+        self.content_type = response.headers.get("content-type", "application/octet-stream")
+        self.chunk_size = chunk_size
+        self.received = 0
+        self._window = _Window(response.status, response.headers, start, end)
+        self.partial = response.status == 206
+        self.start = self._window.start
+        self.size = self._window.size
+        self.total_size = self._window.total_size
+        self._chunks = self.__iter_chunks()
+
+    async def __iter_chunks(self) -> AsyncIterator[bytes]:
+        try:
+            try:
+                async for chunk in self.response.content.iter_chunked(self.chunk_size):
+                    chunk = self._window.cut(chunk)
+                    if chunk:
+                        self.received += len(chunk)
+                        yield chunk
+                    if self._window.done:
+                        break
+            except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError) as e:
+                if self.size is None:
+                    raise
+                raise IncompleteDownloadError(self.size, self.received) from e
+            if self.size is not None and self.received != self.size:
+                raise IncompleteDownloadError(self.size, self.received)
+        finally:
+            self.response.release()
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self
+
+    async def __anext__(self) -> bytes:
+        return await self._chunks.__anext__()
+
+    async def read(self) -> bytes:
+        """Read the rest of the body into memory."""
+        return b"".join([chunk async for chunk in self])
+
+    async def write_to(self, destination: Destination) -> int:
+        """
+        Write the rest of the body to a path or a binary file. Writes to a path
+        run in the default executor so they do not block the event loop.
+
+        A file created from a path is deleted if the download fails.
+
+        Args:
+            destination (Destination): The path, or a binary file open for writing
+
+        Returns:
+            int: Bytes written
+        """
+        if not isinstance(destination, (str, os.PathLike)):
+            written = 0
+            async for chunk in self:
+                destination.write(chunk)
+                written += len(chunk)
+            return written
+
+        loop = asyncio.get_running_loop()
+        f = await loop.run_in_executor(None, open, destination, "wb")
+        try:
+            written = 0
+            async for chunk in self:
+                await loop.run_in_executor(None, f.write, chunk)
+                written += len(chunk)
+            return written
+        except BaseException:
+            await self.aclose()
+            f.close()
+            _remove(destination)
+            raise
+        finally:
+            f.close()
+
+    async def aclose(self) -> None:
+        """Stop reading and release the connection back to the pool."""
+        await self._chunks.aclose()
+        self.response.release()
+
+    async def __aenter__(self) -> "AsyncDownloadResponse":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+
+def download_parts(
+    open_part: Callable[[int, int], DownloadResponse],
+    first: DownloadResponse,
+    destination: Union[str, "os.PathLike[str]"],
+    part_size: int,
+    parallelism: int,
+) -> int:
+    """
+    Fetch the ranges following `first` on `parallelism` threads and write every
+    range in place into a file preallocated to the size of the object.
+
+    Args:
+        open_part (Callable[[int, int], DownloadResponse]): Opens the range from a first to a last byte
+        first (DownloadResponse): The first range, whose Content-Range gave the size of the object
+        destination (Union[str, os.PathLike]): The file to write, deleted if the download fails
+        part_size (int): Bytes per range
+        parallelism (int): Ranges fetched at once
+
+    Returns:
+        int: Bytes written
+    """
+    try:
+        target = PositionedFile(destination, first.total_size)
+    except BaseException:
+        first.close()
+        raise
+    stop = threading.Event()
+
+    def write(body: DownloadResponse) -> int:
+        with body:
+            offset = body.start
+            for chunk in body:
+                if stop.is_set():
+                    return 0
+                target.write_at(chunk, offset)
+                offset += len(chunk)
+            return offset - body.start
+
+    def fetch(start: int, end: int) -> int:
+        return 0 if stop.is_set() else write(open_part(start, end))
+
+    pool = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="jigsawstack-download")
+    try:
+        futures = [pool.submit(write, first)]
+        futures += [
+            pool.submit(fetch, start, end)
+            for start, end in part_ranges(first.start + first.size, first.total_size - 1, part_size)
+        ]
+        wait(futures, return_when=FIRST_EXCEPTION)
+        received = sum(f.result() for f in futures)
+        target.verify(received)
+    except BaseException:
+        # let running ranges see the flag and stop before the file is deleted under them
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        first.close()
+        target.discard()
+        raise
+    pool.shutdown()
+    target.close()
+    return received
+
+
+async def download_parts_async(
+    open_part: Callable[[int, int], Awaitable[AsyncDownloadResponse]],
+    first: AsyncDownloadResponse,
+    destination: Union[str, "os.PathLike[str]"],
+    part_size: int,
+    parallelism: int,
+) -> int:
+    """
+    Like `download_parts`, with the ranges fetched by tasks and the writes run
+    in the default executor.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        target = await loop.run_in_executor(None, PositionedFile, destination, first.total_size)
+    except BaseException:
+        await first.aclose()
+        raise
+    slots = asyncio.Semaphore(parallelism)
+
+    async def write(body: AsyncDownloadResponse) -> int:
+        async with body:
+            offset = body.start
+            async for chunk in body:
+                await loop.run_in_executor(None, target.write_at, chunk, offset)
+                offset += len(chunk)
+            return offset - body.start
+
+    async def fetch(start: int, end: int) -> int:
+        async with slots:
+            return await write(await open_part(start, end))
+
+    async def fetch_first() -> int:
+        async with slots:
+            return await write(first)
+
+    tasks = [loop.create_task(fetch_first())]
+    tasks += [
+        loop.create_task(fetch(start, end))
+        for start, end in part_ranges(first.start + first.size, first.total_size - 1, part_size)
+    ]
+    try:
+        received = sum(await asyncio.gather(*tasks))
+        target.verify(received)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await first.aclose()
+        target.discard()
+        raise
+    target.close()
+    return received
+
+
+def _remove(path: Union[str, "os.PathLike[str]"]) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
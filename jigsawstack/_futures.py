@@ -0,0 +1,172 @@
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from typing_extensions import TypedDict
+
+from ._config import ClientConfig
+
+if TYPE_CHECKING:
+    from ._loop import EventLoopThread
+
+
+class ClientExecutorStats(TypedDict):
+    max_workers: int
+    running: int
+    queued: int
+    expired: int
+
+
+class ClientExecutor:
+    """Bounded thread pool running calls of a sync client in the background,
+    so a handler can start several calls and wait for all of them. The calls
+    share the connection pool of the client, keep `max_workers` within its
+    `pool_maxsize`.
+
+    Queued calls can be cancelled with `Future.cancel()` until a thread picks
+    them up. A call that waited longer than `queue_timeout` for a thread fails
+    with `concurrent.futures.TimeoutError` without calling the API, the caller
+    has likely given up on it. To bound a call once it runs, derive the client
+    with `with_options(timeout=Timeout(total=...))`, which shares this executor.
+
+    Args:
+        max_workers (int): Calls running at once
+        queue_timeout (Union[float, None]): Seconds a call may wait for a thread.
+            None waits forever.
+    """
+
+    def __init__(self, max_workers: int, queue_timeout: Union[float, None] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self._pool: Union[ThreadPoolExecutor, None] = None
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queued = 0
+        self._expired = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """
+        Schedule a call.
+
+        Args:
+            fn (Callable[..., Any]): The method to call, e.g. `jigsaw.vision.vocr`
+            *args (Any): Its arguments
+            **kwargs (Any): Its keyword arguments
+
+        Returns:
+            Future: Resolved with the result of the call, or its exception
+        """
+        queued_at = time.monotonic()
+
+        def run() -> Any:
+            with self._lock:
+                self._queued -= 1
+                expired = (
+                    self.queue_timeout is not None
+                    and time.monotonic() - queued_at > self.queue_timeout
+                )
+                if expired:
+                    self._expired += 1
+                else:
+                    self._running += 1
+            if expired:
+                raise FutureTimeoutError(f"call waited over {self.queue_timeout}s for a thread")
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        with self._lock:
+            if self._pool is None:
+                # threads are only started once the client is used this way
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="jigsawstack-futures"
+                )
+            future = self._pool.submit(run)
+            self._queued += 1
+        future.add_done_callback(self.__forget_cancelled)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        Stop the threads. The executor starts new ones if it is used again.
+
+        Args:
+            wait (bool): Wait for the running calls to finish
+            cancel_pending (bool): Cancel the calls that have not started
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=cancel_pending)
+
+    def stats(self) -> ClientExecutorStats:
+        """
+        Snapshot of the executor metrics.
+
+        Returns:
+            ClientExecutorStats: Threads, calls running and queued, and calls that
+            expired in the queue
+        """
+        with self._lock:
+            return ClientExecutorStats(
+                max_workers=self.max_workers,
+                running=self._running,
+                queued=self._queued,
+                expired=self._expired,
+            )
+
+    def __forget_cancelled(self, future: Future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+
+class FuturesNamespace:
+    """Mirror of a client, or one of its services, whose methods return a
+    `concurrent.futures.Future` instead of blocking. The calls run on a
+    `ClientExecutor`, or on an `EventLoopThread` for the coroutines of an async
+    client:
+
+        ocr = jigsaw.futures.vision.vocr(params)
+        page = jigsaw.futures.web.ai_scrape(params)
+        ocr.result(timeout=30), page.result(timeout=30)
+    """
+
+    def __init__(self, target: Any, executor: "Union[ClientExecutor, EventLoopThread]"):
+        self._target = target
+        self._executor = executor
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._target, name)
+        if isinstance(attr, ClientConfig):
+            return type(self)(attr, self._executor)
+        # only API calls, not client helpers like close() or with_options()
+        if not isinstance(getattr(attr, "__self__", None), ClientConfig):
+            raise AttributeError(f"{name} is not an API call and cannot be run in the background")
+        return self._wrap(attr)
+
+    def _wrap(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def submit(*args: Any, **kwargs: Any) -> Future:
+            return self._executor.submit(method, *args, **kwargs)
+
+        return submit
+
+    def __dir__(self) -> Any:
+        names = []
+        for name in dir(self._target):
+            attr = None if name.startswith("_") else getattr(self._target, name, None)
+            if isinstance(attr, ClientConfig) or isinstance(
+                getattr(attr, "__self__", None), ClientConfig
+            ):
+                names.append(name)
+        return names
@@ -0,0 +1,138 @@
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, Union
+
+from typing_extensions import TypedDict
+
+from ._retry import RetryBudget
+
+
+class HedgeStats(TypedDict):
+    requests: int
+    hedged: int
+    hedge_wins: int
+
+
+class HedgePolicy:
+    """Hedged requests for idempotent reads.
+
+    If the first attempt has not answered after the `percentile` latency of
+    recent calls to the same endpoint, a second identical attempt is sent. The
+    first response to arrive is kept and the other attempt is cancelled. Hedges
+    are capped to `max_hedge_ratio` of recent calls so a slow backend is not
+    hit with twice the traffic.
+
+    Only GET calls and paths listed in `idempotent_paths` are hedged, never
+    calls uploading a body other than JSON.
+
+    Args:
+        percentile (float): Latency percentile, 0-100, after which to hedge.
+        initial_delay (float): Seconds to wait before hedging until `min_samples`
+            latencies of the endpoint have been seen.
+        min_delay (float): Lower bound in seconds for the hedge delay.
+        max_hedge_ratio (float): Hedges allowed per call within `window`.
+        window (float): Seconds of history the hedge rate considers.
+        idempotent_paths (Iterable[str]): Path prefixes safe to hedge whatever their verb.
+        min_samples (int): Latencies needed before the percentile is trusted.
+        sample_size (int): Latencies kept per endpoint.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.01,
+        max_hedge_ratio: float = 0.1,
+        window: float = 10.0,
+        idempotent_paths: Iterable[str] = (),
+        min_samples: int = 20,
+        sample_size: int = 256,
+    ):
+        if not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.idempotent_paths = tuple(idempotent_paths)
+        self.min_samples = min_samples
+        self.sample_size = sample_size
+        self._budget = RetryBudget(ratio=max_hedge_ratio, min_retries_per_second=0.0, window=window)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    def applies(self, verb: str, path: Union[str, None]) -> bool:
+        """Whether a call may be hedged."""
+        if verb.lower() == "get":
+            return True
+        if path is None:
+            return False
+        path = path.split("?", 1)[0]
+        return any(path.startswith(p) for p in self.idempotent_paths)
+
+    def delay(self, endpoint: str) -> float:
+        """
+        Seconds to wait for the first attempt before hedging.
+
+        Args:
+            endpoint (str): The endpoint, as returned by `endpoint_of`
+
+        Returns:
+            float: The delay in seconds
+        """
+        with self._lock:
+            self._requests += 1
+            samples = sorted(self._latencies.get(endpoint, ()))
+        self._budget.record_request()
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return max(self.min_delay, samples[index])
+
+    def try_hedge(self) -> bool:
+        """
+        Take one hedge from the rate cap.
+
+        Returns:
+            bool: True if the hedge may be sent
+        """
+        if not self._budget.try_acquire():
+            return False
+        with self._lock:
+            self._hedged += 1
+        return True
+
+    def record(self, endpoint: str, latency: float, hedge_won: bool = False) -> None:
+        """
+        Record the latency of the attempt that answered a call.
+
+        Args:
+            endpoint (str): The endpoint of the call
+            latency (float): Seconds the winning attempt took
+            hedge_won (bool): The hedge answered before the first attempt
+        """
+        with self._lock:
+            samples = self._latencies.get(endpoint)
+            if samples is None:
+                samples = self._latencies[endpoint] = deque(maxlen=self.sample_size)
+            samples.append(latency)
+            if hedge_won:
+                self._hedge_wins += 1
+
+    def stats(self) -> HedgeStats:
+        """
+        Snapshot of the hedging metrics.
+
+        Returns:
+            HedgeStats: Calls eligible for hedging, hedges sent, and hedges that
+            answered before the first attempt
+        """
+        with self._lock:
+            return HedgeStats(
+                requests=self._requests,
+                hedged=self._hedged,
+                hedge_wins=self._hedge_wins,
+            )
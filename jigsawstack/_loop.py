@@ -0,0 +1,186 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Iterator, Union
+
+from ._download import AsyncDownloadResponse, Destination
+from ._futures import FuturesNamespace
+from .async_request import AsyncStreamResponse
+
+
+class EventLoopThread:
+    """Event loop running on a daemon thread, for sync clients created with
+    `JigsawStack(event_loop=True)`. Their calls run on this loop with the async
+    transport while the callers block on a future, so hundreds of calls in
+    flight cost one thread rather than one each.
+
+    The thread is started on first use. A loop passed to several clients is
+    shared, close it once they are closed.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+        self._thread: Union[threading.Thread, None] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Future:
+        """
+        Schedule a call on the loop.
+
+        Args:
+            fn (Callable[..., Awaitable[Any]]): The coroutine function to call, e.g. a
+                method of an async service
+            *args (Any): Its arguments
+            **kwargs (Any): Its keyword arguments
+
+        Returns:
+            Future: Resolved with the result of the call, or its exception.
+            Cancelling it cancels the call, even once started.
+        """
+        return asyncio.run_coroutine_threadsafe(self.__call(fn, args, kwargs), self.__get_loop())
+
+    def run(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a coroutine function on the loop and wait for its result.
+
+        Args:
+            fn (Callable[..., Awaitable[Any]]): The coroutine function to call
+            *args (Any): Its arguments
+            **kwargs (Any): Its keyword arguments
+
+        Raises:
+            RuntimeError: If called from the loop thread, which would wait on itself
+
+        Returns:
+            Any: The result of the call
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError(
+                "A sync client running on an event loop cannot be called from that loop, "
+                "use AsyncJigsawStack in coroutines"
+            )
+        future = self.submit(fn, *args, **kwargs)
+        try:
+            return future.result()
+        except BaseException:
+            # e.g. KeyboardInterrupt, the call would go on without a caller
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Cancel the calls still running and stop the thread. The loop starts
+        again if it is used after."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(_cancel_tasks(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    def __get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=_run_forever, args=(loop,), name="jigsawstack-event-loop", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def __call(self, fn: Callable[..., Awaitable[Any]], args: Any, kwargs: Any) -> Any:
+        result = await fn(*args, **kwargs)
+        # streamed bodies are read by the caller, through this loop
+        if isinstance(result, AsyncDownloadResponse):
+            return LoopDownloadResponse(result, self)
+        if isinstance(result, AsyncStreamResponse):
+            return LoopStreamResponse(result, self)
+        return result
+
+
+class LoopNamespace(FuturesNamespace):
+    """Mirror of an async client, or one of its services, whose methods run on
+    an `EventLoopThread` and block until they return, like the sync client."""
+
+    def _wrap(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return self._executor.run(method, *args, **kwargs)
+
+        return call
+
+
+class _LoopIterator:
+    # sync iterator over an async response, every read runs on the loop thread
+
+    def __init__(self, response: Any, loop: EventLoopThread):
+        self._response = response
+        self._loop = loop
+
+    def __getattr__(self, name: str) -> Any:
+        # timings, sizes and the other attributes of the response
+        return getattr(self._response, name)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return self._loop.run(self._response.__anext__)
+        except StopAsyncIteration:
+            raise StopIteration from None
+
+    def close(self) -> None:
+        """Stop reading and release the connection back to the pool."""
+        self._loop.run(self._response.aclose)
+
+    def __enter__(self) -> Any:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class LoopStreamResponse(_LoopIterator):
+    """`AsyncStreamResponse` read by a sync client running on an
+    `EventLoopThread`, with the interface of `StreamResponse`."""
+
+
+class LoopDownloadResponse(_LoopIterator):
+    """`AsyncDownloadResponse` read by a sync client running on an
+    `EventLoopThread`, with the interface of `DownloadResponse`."""
+
+    def read(self) -> bytes:
+        """Read the rest of the body into memory."""
+        return self._loop.run(self._response.read)
+
+    def write_to(self, destination: Destination) -> int:
+        """
+        Write the rest of the body to a path or a binary file.
+
+        Args:
+            destination (Destination): The path, or a binary file open for writing
+
+        Returns:
+            int: Bytes written
+        """
+        return self._loop.run(self._response.write_to, destination)
+
+
+def _run_forever(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+async def _cancel_tasks() -> None:
+    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import math
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Union
+
+from typing_extensions import TypedDict
+
+from ._upload import UploadBody
+from .exceptions import JigsawStackError
+
+# bytes sent per part of a resumable upload
+DEFAULT_UPLOAD_PART_SIZE = 8 * 1024 * 1024
+# parts sent at once
+DEFAULT_UPLOAD_CONCURRENCY = 4
+
+_JOURNAL_VERSION = 1
+
+
+class UploadedPart(TypedDict):
+    part_number: int
+    etag: str
+
+
+class JournalState(TypedDict):
+    version: int
+    key: str
+    path: str
+    size: int
+    mtime_ns: int
+    part_size: int
+    upload_id: str
+    parts: Dict[str, str]
+
+
+class MultipartProtocol(ABC):
+    """How a file store starts, receives and assembles the parts of an upload.
+    The JigsawStack file store has no multipart endpoints yet, a resumable
+    upload needs an implementation for the store it talks to."""
+
+    @abstractmethod
+    def create(self, size: int, part_size: int) -> str:
+        """Start an upload of `size` bytes in parts of `part_size`, return its id."""
+
+    @abstractmethod
+    def put_part(self, upload_id: str, number: int, body: UploadBody) -> str:
+        """Send the 1-based part `number`, return its ETag."""
+
+    @abstractmethod
+    def complete(self, upload_id: str, parts: List[UploadedPart]) -> Any:
+        """Assemble the parts, return the response of the store."""
+
+
+class AsyncMultipartProtocol(ABC):
+    """Like `MultipartProtocol`, with coroutine methods."""
+
+    @abstractmethod
+    async def create(self, size: int, part_size: int) -> str:
+        """Start an upload of `size` bytes in parts of `part_size`, return its id."""
+
+    @abstractmethod
+    async def put_part(self, upload_id: str, number: int, body: UploadBody) -> str:
+        """Send the 1-based part `number`, return its ETag."""
+
+    @abstractmethod
+    async def complete(self, upload_id: str, parts: List[UploadedPart]) -> Any:
+        """Assemble the parts, return the response of the store."""
+
+
+class UploadJournal:
+    """Progress of a resumable upload, saved to a local JSON file after every
+    part the server acknowledges. The file is replaced atomically, so a crash
+    mid-write leaves the previous progress intact.
+
+    Args:
+        path (Union[str, os.PathLike]): The journal file
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]):
+        self.path = os.fspath(path)
+
+    def load(self) -> Union[JournalState, None]:
+        """Read the saved progress, None if there is none or it cannot be read."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get("version") != _JOURNAL_VERSION:
+            return None
+        return state
+
+    def save(self, state: JournalState) -> None:
+        """Replace the saved progress."""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def delete(self) -> None:
+        """Forget the progress once the upload is complete."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def part_count(size: int, part_size: int) -> int:
+    """Parts a file of `size` bytes is split into, an empty file still takes one."""
+    if part_size < 1:
+        raise ValueError("part_size must be at least 1")
+    return max(1, math.ceil(size / part_size))
+
+
+def _new_state(key: str, path: str, stat: os.stat_result, part_size: int) -> JournalState:
+    return JournalState(
+        version=_JOURNAL_VERSION,
+        key=key,
+        path=path,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        part_size=part_size,
+        upload_id="",
+        parts={},
+    )
+
+
+def _resumable(state: Union[JournalState, None], expected: JournalState) -> bool:
+    # the file, its key or the part layout changed since: the parts sent are worthless
+    if state is None or not state.get("upload_id"):
+        return False
+    fields = ("key", "path", "size", "mtime_ns", "part_size")
+    return all(state.get(f) == expected[f] for f in fields)
+
+
+def _completed(state: JournalState, count: int) -> List[UploadedPart]:
+    return [UploadedPart(part_number=n, etag=state["parts"][str(n)]) for n in range(1, count + 1)]
+
+
+def _is_stale(e: JigsawStackError) -> bool:
+    # the server forgot the upload, e.g. it expired while the upload was interrupted
+    return str(e.code) == "404"
+
+
+def upload_parts(
+    path: Union[str, "os.PathLike[str]"],
+    key: str,
+    journal: UploadJournal,
+    protocol: MultipartProtocol,
+    part_size: int = DEFAULT_UPLOAD_PART_SIZE,
+    concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+) -> Any:
+    """
+    Upload a file in parts on `concurrency` threads, resuming from `journal`
+    when it records an earlier attempt at the same file.
+
+    Args:
+        path (Union[str, os.PathLike]): The file to upload
+        key (str): The key the file is stored under, part of what identifies the upload
+        journal (UploadJournal): Where progress is saved
+        protocol (MultipartProtocol): The multipart endpoints of the store
+        part_size (int): Bytes per part
+        concurrency (int): Parts sent at once
+
+    Raises:
+        ValueError: If `concurrency` is below 1
+
+    Returns:
+        Any: The response of `protocol.complete`
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    expected = _new_state(key, path, stat, part_size)
+    count = part_count(stat.st_size, part_size)
+
+    state = journal.load()
+    resumed = _resumable(state, expected)
+    while True:
+        if not resumed:
+            state = expected
+            state["upload_id"] = protocol.create(stat.st_size, part_size)
+            journal.save(state)
+        try:
+            _send_parts(path, state, count, journal, concurrency, protocol)
+            response = protocol.complete(state["upload_id"], _completed(state, count))
+        except JigsawStackError as e:
+            if not (resumed and _is_stale(e)):
+                raise
+            resumed = False
+            expected = _new_state(key, path, stat, part_size)
+            continue
+        journal.delete()
+        return response
+
+
+def _send_parts(
+    path: str,
+    state: JournalState,
+    count: int,
+    journal: UploadJournal,
+    concurrency: int,
+    protocol: MultipartProtocol,
+) -> None:
+    part_size = state["part_size"]
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def send(number: int) -> None:
+        if stop.is_set():
+            return
+        body = UploadBody(path, (number - 1) * part_size, part_size)
+        try:
+            etag = protocol.put_part(state["upload_id"], number, body)
+        except BaseException:
+            # parts not started yet are dropped, the journal keeps those already sent
+            stop.set()
+            raise
+        finally:
+            body.close()
+        with lock:
+            state["parts"][str(number)] = etag
+            journal.save(state)
+
+    pending = [n for n in range(1, count + 1) if str(n) not in state["parts"]]
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="jigsawstack-upload"
+    ) as pool:
+        futures = [pool.submit(send, n) for n in pending]
+        wait(futures, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            future.result()
+
+
+async def upload_parts_async(
+    path: Union[str, "os.PathLike[str]"],
+    key: str,
+    journal: UploadJournal,
+    protocol: AsyncMultipartProtocol,
+    part_size: int = DEFAULT_UPLOAD_PART_SIZE,
+    concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+) -> Any:
+    """
+    Like `upload_parts`, with the parts sent by tasks and the journal written
+    in the default executor.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    loop = asyncio.get_running_loop()
+    path = os.path.abspath(path)
+    stat = await loop.run_in_executor(None, os.stat, path)
+    expected = _new_state(key, path, stat, part_size)
+    count = part_count(stat.st_size, part_size)
+    saving = asyncio.Lock()
+
+    async def save(state: JournalState) -> None:
+        # one write at a time, a late write of an older snapshot would lose parts
+        async with saving:
+            snapshot = json.loads(json.dumps(state))
+            await loop.run_in_executor(None, journal.save, snapshot)
+
+    async def send(state: JournalState, number: int, slots: asyncio.Semaphore) -> None:
+        async with slots:
+            body = UploadBody(path, (number - 1) * part_size, part_size)
+            try:
+                etag = await protocol.put_part(state["upload_id"], number, body)
+            finally:
+                body.close()
+        state["parts"][str(number)] = etag
+        await save(state)
+
+    state = await loop.run_in_executor(None, journal.load)
+    resumed = _resumable(state, expected)
+    while True:
+        if not resumed:
+            state = expected
+            state["upload_id"] = await protocol.create(stat.st_size, part_size)
+            await save(state)
+        slots = asyncio.Semaphore(concurrency)
+        pending = [n for n in range(1, count + 1) if str(n) not in state["parts"]]
+        tasks = [loop.create_task(send(state, n, slots)) for n in pending]
+        try:
+            await asyncio.gather(*tasks)
+            response = await protocol.complete(state["upload_id"], _completed(state, count))
+        except BaseException as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # saves of acknowledged parts may have been cancelled with their task
+            await save(state)
+            if not (resumed and isinstance(e, JigsawStackError) and _is_stale(e)):
+                raise
+            resumed = False
+            expected = _new_state(key, path, stat, part_size)
+            continue
+        await loop.run_in_executor(None, journal.delete)
+        return response
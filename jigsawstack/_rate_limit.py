@@ -0,0 +1,214 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Mapping, Tuple, Union
+
+from typing_extensions import TypedDict
+
+# requests per second, or (requests per second, burst)
+RateSpec = Union[float, Tuple[float, float]]
+
+
+class RateLimiterStats(TypedDict):
+    requests: int
+    delayed: int
+    queue_depth: int
+    total_wait: float
+    max_wait: float
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst`.
+
+    Callers reserve a token and are told how long to wait for it. The balance
+    may go negative, so waiters are served in reservation order and the rate
+    holds even when many callers arrive at once.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (Union[float, None]): Bucket capacity. Defaults to `rate` (one second of traffic).
+    """
+
+    def __init__(self, rate: float, burst: Union[float, None] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token.
+
+        Returns:
+            float: Seconds to wait before the token may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """Give back a token reserved but not used."""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1)
+
+
+class RateLimiter:
+    """Client-side rate limiter smoothing bursts before they leave the process.
+
+    A global bucket applies to every call and per-path buckets apply to calls
+    whose path starts with the given prefix (the longest prefix wins). Buckets
+    are kept per API key (the `x-api-key` header), so clients for different keys
+    can share one limiter without sharing their quota.
+
+    Args:
+        rate (Union[RateSpec, None]): Global requests per second, or (rate, burst).
+            None leaves only the per-path buckets.
+        per_path (Union[Mapping[str, RateSpec], None]): Path prefix, e.g. "/embedding",
+            "/vocr" or "/ai/translate", to requests per second or (rate, burst).
+    """
+
+    def __init__(
+        self,
+        rate: Union[RateSpec, None] = None,
+        per_path: Union[Mapping[str, RateSpec], None] = None,
+    ):
+        self.rate = rate
+        # longest prefixes first so the most specific bucket matches
+        self.per_path = dict(sorted((per_path or {}).items(), key=lambda i: -len(i[0])))
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._delayed = 0
+        self._queue_depth = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def acquire(
+        self, path: Union[str, None] = None, api_key: str = "", max_wait: Union[float, None] = None
+    ) -> float:
+        """
+        Block until a call to `path` may be sent.
+
+        Args:
+            path (Union[str, None]): The API path
+            api_key (str): The API key the call is made with
+            max_wait (Union[float, None]): Seconds the caller can wait at most, e.g. until
+                its deadline. None waits as long as needed.
+
+        Raises:
+            TimeoutError: Without waiting, if the call could not be sent within `max_wait`
+
+        Returns:
+            float: Seconds waited
+        """
+        wait = self.__reserve(path, api_key, max_wait)
+        if wait > 0:
+            self.__enter_queue()
+            try:
+                time.sleep(wait)
+            finally:
+                self.__leave_queue()
+        return wait
+
+    async def acquire_async(
+        self, path: Union[str, None] = None, api_key: str = "", max_wait: Union[float, None] = None
+    ) -> float:
+        """
+        Wait, without blocking the event loop, until a call to `path` may be sent.
+
+        Args:
+            path (Union[str, None]): The API path
+            api_key (str): The API key the call is made with
+            max_wait (Union[float, None]): Seconds the caller can wait at most, e.g. until
+                its deadline. None waits as long as needed.
+
+        Raises:
+            TimeoutError: Without waiting, if the call could not be sent within `max_wait`
+
+        Returns:
+            float: Seconds waited
+        """
+        wait = self.__reserve(path, api_key, max_wait)
+        if wait > 0:
+            self.__enter_queue()
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.__leave_queue()
+        return wait
+
+    def stats(self) -> RateLimiterStats:
+        """
+        Snapshot of the limiter metrics.
+
+        Returns:
+            RateLimiterStats: Calls seen, calls delayed, callers currently waiting,
+            and the total and max time spent waiting in seconds
+        """
+        with self._lock:
+            return RateLimiterStats(
+                requests=self._requests,
+                delayed=self._delayed,
+                queue_depth=self._queue_depth,
+                total_wait=self._total_wait,
+                max_wait=self._max_wait,
+            )
+
+    def __reserve(
+        self, path: Union[str, None], api_key: str, max_wait: Union[float, None]
+    ) -> float:
+        buckets = []
+        if self.rate is not None:
+            buckets.append(self.__bucket(api_key, "", self.rate))
+        prefix = self.__match(path)
+        if prefix is not None:
+            buckets.append(self.__bucket(api_key, prefix, self.per_path[prefix]))
+        wait = max([bucket.reserve() for bucket in buckets], default=0.0)
+
+        if max_wait is not None and wait > max_wait:
+            # the call is not sent, its tokens go to the next callers
+            for bucket in buckets:
+                bucket.refund()
+            raise TimeoutError(f"Rate limit allows the call in {wait:.3f}s, past its deadline")
+
+        with self._lock:
+            self._requests += 1
+            if wait > 0:
+                self._delayed += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+        return wait
+
+    def __match(self, path: Union[str, None]) -> Union[str, None]:
+        if not path:
+            return None
+        path = path.split("?", 1)[0]
+        for prefix in self.per_path:
+            if path.startswith(prefix):
+                return prefix
+        return None
+
+    def __bucket(self, api_key: str, name: str, spec: RateSpec) -> TokenBucket:
+        key = (api_key, name)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, burst = spec if isinstance(spec, tuple) else (spec, None)
+                bucket = self._buckets[key] = TokenBucket(rate, burst)
+            return bucket
+
+    def __enter_queue(self) -> None:
+        with self._lock:
+            self._queue_depth += 1
+
+    def __leave_queue(self) -> None:
+        with self._lock:
+            self._queue_depth -= 1
@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Deque, Iterable, Union
+
+IDEMPOTENT_VERBS = frozenset(["get", "head", "options", "put", "delete"])
+RETRYABLE_STATUS_CODES = frozenset([408, 429, 500, 502, 503, 504])
+DEFAULT_MAX_RETRY_AFTER = 60.0
+# the server refused these before doing any work, so they are safe to retry for any verb.
+# A 503 may come from a gateway after the origin did the work, it needs a safe call
+REJECTED_STATUS_CODES = frozenset([429])
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the recent request volume.
+
+    A budget can be shared by several policies (and clients) to bound the total
+    extra load retries add during an outage, which is what turns a brief blip
+    into a retry storm.
+
+    Args:
+        ratio (float): Retries allowed per request sent within the window.
+        min_retries_per_second (float): Retries always allowed, even at low volume.
+        window (float): Seconds of history the budget considers.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        window: float = 10.0,
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window = window
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Record a first attempt."""
+        with self._lock:
+            now = time.monotonic()
+            self._requests.append(now)
+            self.__evict(now)
+
+    def try_acquire(self) -> bool:
+        """
+        Take one retry from the budget.
+
+        Returns:
+            bool: True if the retry may be sent, False if the budget is exhausted
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.__evict(now)
+            allowed = self.min_retries_per_second * self.window + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def __evict(self, now: float) -> None:
+        cutoff = now - self.window
+        for d in (self._requests, self._retries):
+            while d and d[0] < cutoff:
+                d.popleft()
+
+
+class RetryPolicy:
+    """Automatic retries with capped exponential backoff and full jitter.
+
+    Only calls that are safe to repeat are retried: idempotent verbs, paths
+    listed in `safe_paths`, or any call when `retry_non_idempotent` is set.
+    429 responses are retried for every verb since the server rejected the
+    request without processing it. `Retry-After` is honored.
+
+    Args:
+        max_attempts (int): Total attempts including the first. 1 disables retries.
+        backoff_base (float): Seconds of the first backoff step.
+        backoff_cap (float): Upper bound in seconds for a single backoff.
+        retry_on_status (Iterable[int]): Status codes that trigger a retry.
+        retry_non_idempotent (bool): Also retry non-idempotent calls on 5xx and
+            connection errors.
+        safe_paths (Iterable[str]): Path prefixes (e.g. "/ai/translate") that are
+            safe to retry whatever their verb.
+        respect_retry_after (bool): Wait for the server's `Retry-After` when present.
+        max_retry_after (float): Upper bound in seconds for a wait asked by `Retry-After`,
+            so a server or proxy cannot park the client for hours. Transports also
+            never wait past the `total` deadline of the call: the last response is
+            returned instead.
+        budget (Union[RetryBudget, None]): Shared retry budget. None means unlimited.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 8.0,
+        retry_on_status: Iterable[int] = RETRYABLE_STATUS_CODES,
+        retry_non_idempotent: bool = False,
+        safe_paths: Iterable[str] = (),
+        respect_retry_after: bool = True,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER,
+        budget: Union[RetryBudget, None] = None,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_on_status = frozenset(retry_on_status)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.safe_paths = tuple(safe_paths)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.budget = budget
+
+    def is_safe(self, verb: str, path: Union[str, None] = None) -> bool:
+        """Whether a call may be repeated without side effects."""
+        if self.retry_non_idempotent or verb.lower() in IDEMPOTENT_VERBS:
+            return True
+        if path is None:
+            return False
+        path = path.split("?", 1)[0]
+        return any(path.startswith(p) for p in self.safe_paths)
+
+    def should_retry_status(
+        self, attempt: int, verb: str, path: Union[str, None], status: int
+    ) -> bool:
+        """
+        Whether a response status should be retried.
+
+        Args:
+            attempt (int): The 1-based attempt that produced the response
+            verb (str): The HTTP method
+            path (Union[str, None]): The request path
+            status (int): The response status code
+
+        Returns:
+            bool: True if another attempt should be made
+        """
+        if attempt >= self.max_attempts or status not in self.retry_on_status:
+            return False
+        if status not in REJECTED_STATUS_CODES and not self.is_safe(verb, path):
+            return False
+        return self.__acquire_budget()
+
+    def should_retry_error(self, attempt: int, verb: str, path: Union[str, None]) -> bool:
+        """
+        Whether a connection error or timeout should be retried.
+
+        Args:
+            attempt (int): The 1-based attempt that failed
+            verb (str): The HTTP method
+            path (Union[str, None]): The request path
+
+        Returns:
+            bool: True if another attempt should be made
+        """
+        if attempt >= self.max_attempts or not self.is_safe(verb, path):
+            return False
+        return self.__acquire_budget()
+
+    def backoff(self, attempt: int, retry_after: Union[str, None] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        Args:
+            attempt (int): The 1-based attempt that just failed
+            retry_after (Union[str, None]): The `Retry-After` header of the response
+
+        Returns:
+            float: The delay in seconds
+        """
+        if self.respect_retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return min(delay, self.max_retry_after)
+        # full jitter: uniform over [0, min(cap, base * 2^n)]
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1)))
+
+    def record_request(self) -> None:
+        if self.budget is not None:
+            self.budget.record_request()
+
+    def __acquire_budget(self) -> bool:
+        return self.budget is None or self.budget.try_acquire()
+
+
+def parse_retry_after(value: Union[str, None]) -> Union[float, None]:
+    """
+    Parse a `Retry-After` header given either in seconds or as an HTTP date.
+
+    Args:
+        value (Union[str, None]): The header value
+
+    Returns:
+        Union[float, None]: Seconds to wait, or None if absent or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
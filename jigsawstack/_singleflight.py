@@ -0,0 +1,177 @@
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple, TypeVar, Union
+
+from typing_extensions import TypedDict
+
+from .helpers import endpoint_of, request_fingerprint
+
+T = TypeVar("T")
+
+
+class SingleFlightStats(TypedDict):
+    calls: int
+    coalesced: int
+    in_flight: int
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Union[BaseException, None] = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one HTTP call.
+
+    While a call is in flight, calls with the same verb, URL, API key, params
+    and body to an enabled endpoint wait for it instead of sending their own,
+    then all get its result or exception. Followers get a copy of the result,
+    so one caller mutating it does not affect the others.
+
+    Args:
+        endpoints (Iterable[str]): Endpoints to coalesce, e.g. "/web/search" or "/ai/scrape".
+    """
+
+    def __init__(self, endpoints: Iterable[str] = ()):
+        self.endpoints = set(endpoints)
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._coalesced = 0
+
+    def enable(self, endpoint: str) -> None:
+        """Start coalescing calls to an endpoint."""
+        self.endpoints.add(endpoint)
+
+    def disable(self, endpoint: str) -> None:
+        """Stop coalescing calls to an endpoint."""
+        self.endpoints.discard(endpoint)
+
+    def key_for(
+        self,
+        verb: str,
+        url: str,
+        path: Union[str, None],
+        api_key: str,
+        params: Any,
+        data: Any = None,
+        files: Any = None,
+    ) -> Union[str, None]:
+        """
+        Identify a call.
+
+        Args:
+            verb (str): The HTTP method
+            url (str): The URL of the call
+            path (Union[str, None]): The API path
+            api_key (str): The API key the call is made with
+            params (Any): The params or JSON body
+            data (Any): A raw request body
+            files (Any): Files of a multipart request
+
+        Returns:
+            Union[str, None]: The key, or None if the call must not be coalesced
+        """
+        if data or files or endpoint_of(path) not in self.endpoints:
+            return None
+        return request_fingerprint(verb, url, api_key, body=params)
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """
+        Run `fn`, or wait for the identical call already running it.
+
+        Args:
+            key (str): The key of the call
+            fn (Callable[[], T]): Performs the call
+
+        Returns:
+            T: The result of the call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await `fn`, or wait for the identical call already awaiting it.
+
+        The call runs in its own task, so cancelling one caller does not cancel
+        it for the others.
+
+        Args:
+            key (str): The key of the call
+            fn (Callable[[], Awaitable[T]]): Performs the call
+
+        Returns:
+            T: The result of the call
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._tasks.get(key)
+            # tasks belong to their loop, calls made from another loop run on their own
+            leader = entry is None or entry[0] is not loop
+            if leader:
+                task = loop.create_task(_run(fn))
+                task.add_done_callback(lambda t: self.__forget(key, t))
+                self._tasks[key] = (loop, task)
+                self._executed += 1
+            else:
+                task = entry[1]
+                self._coalesced += 1
+
+        result = await asyncio.shield(task)
+        return result if leader else copy.deepcopy(result)
+
+    def stats(self) -> SingleFlightStats:
+        """
+        Snapshot of the coalescing metrics.
+
+        Returns:
+            SingleFlightStats: HTTP calls made, calls that joined one already in
+            flight instead, and calls in flight now
+        """
+        with self._lock:
+            return SingleFlightStats(
+                calls=self._executed,
+                coalesced=self._coalesced,
+                in_flight=len(self._calls) + len(self._tasks),
+            )
+
+    def __forget(self, key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            entry = self._tasks.get(key)
+            if entry is not None and entry[1] is task:
+                del self._tasks[key]
+        # mark the exception retrieved, every waiter may have been cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+async def _run(fn: Callable[[], Awaitable[T]]) -> T:
+    return await fn()
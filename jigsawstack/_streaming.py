@@ -0,0 +1,149 @@
+import codecs
+import json
+from typing import Any, List, Union
+
+from typing_extensions import Literal
+
+StreamFormat = Literal["sse", "ndjson", "json", "text"]
+
+
+def detect_stream_format(content_type: Union[str, None]) -> StreamFormat:
+    """
+    Pick the framing of a streaming response from its content type.
+
+    Args:
+        content_type (Union[str, None]): The response `Content-Type` header
+
+    Returns:
+        StreamFormat: "sse", "ndjson", "json" or "text"
+    """
+    content_type = (content_type or "").lower()
+    if "text/event-stream" in content_type:
+        return "sse"
+    if any(t in content_type for t in ["ndjson", "jsonl", "json-seq", "jsonlines"]):
+        return "ndjson"
+    if "json" in content_type:
+        return "json"
+    return "text"
+
+
+class StreamDecoder:
+    """Incremental decoder for streaming response bodies.
+
+    Raw chunks can be split anywhere on the wire: in the middle of a multi-byte
+    character, a JSON record or an SSE event. The decoder keeps a UTF-8
+    incremental codec and a line buffer, and only returns complete items.
+
+    - sse: one item per event, the joined `data:` lines parsed as JSON when possible
+    - ndjson: one parsed JSON value per line (the raw line if it is not valid JSON)
+    - json: a single JSON document, returned once the body is complete
+    - text: decoded text as it arrives
+
+    Args:
+        format (StreamFormat): The framing of the stream
+    """
+
+    def __init__(self, format: StreamFormat = "text"):
+        self.format = format
+        self.last_event_id: Union[str, None] = None
+        self._codec = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial: List[str] = []
+        self._data: List[str] = []
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Decode a raw chunk and return every item it completes.
+
+        Args:
+            chunk (bytes): Bytes as read from the socket
+
+        Returns:
+            List[Any]: Completed items, possibly empty
+        """
+        return self.__decode(self._codec.decode(chunk), final=False)
+
+    def flush(self) -> List[Any]:
+        """
+        Signal the end of the stream and return any remaining items.
+
+        Returns:
+            List[Any]: Items completed by the end of the stream
+        """
+        return self.__decode(self._codec.decode(b"", final=True), final=True)
+
+    def __decode(self, text: str, final: bool) -> List[Any]:
+        if self.format == "text":
+            return [text] if text else []
+
+        if self.format == "json":
+            self._partial.append(text)
+            if not final:
+                return []
+            body = "".join(self._partial)
+            self._partial = []
+            return [self.__parse(body)] if body.strip() else []
+
+        items: List[Any] = []
+        for line in self.__split_lines(text, final):
+            if self.format == "ndjson":
+                if line.strip():
+                    items.append(self.__parse(line))
+            else:
+                self.__handle_sse_line(line, items)
+
+        if final and self.format == "sse":
+            self.__dispatch_event(items)
+        return items
+
+    def __split_lines(self, text: str, final: bool) -> List[str]:
+        # the last piece of a split has no terminator yet, keep it for the next chunk
+        if "\n" not in text:
+            if text:
+                self._partial.append(text)
+            if not final or not self._partial:
+                return []
+            lines = ["".join(self._partial)]
+            self._partial = []
+        else:
+            lines = text.split("\n")
+            if self._partial:
+                self._partial.append(lines[0])
+                lines[0] = "".join(self._partial)
+            tail = lines.pop()
+            self._partial = [tail] if tail else []
+            if final and self._partial:
+                lines.append(tail)
+                self._partial = []
+
+        return [line[:-1] if line.endswith("\r") else line for line in lines]
+
+    def __handle_sse_line(self, line: str, items: List[Any]) -> None:
+        if not line:
+            self.__dispatch_event(items)
+            return
+
+        if line.startswith(":"):  # comment / keep-alive
+            return
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "id":
+            self.last_event_id = value
+
+    def __dispatch_event(self, items: List[Any]) -> None:
+        if not self._data:
+            return
+        data = "\n".join(self._data)
+        self._data = []
+        items.append(self.__parse(data))
+
+    @staticmethod
+    def __parse(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
@@ -0,0 +1,76 @@
+import time
+from typing import Union
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 300.0
+MIN_ATTEMPT_TIMEOUT = 0.001
+
+
+class Timeout:
+    """Connect, read and total timeouts for a call.
+
+    `connect` bounds establishing a connection and `read` bounds the wait for
+    each piece of the response. `total` is a deadline for the whole call: it
+    starts when the call is made and spans every retry and backoff, so a call
+    never takes longer than `total` seconds to return its response. The sync
+    transport checks it after each read of the body, a single read that stalls
+    waits at most the time left when the attempt started. There, streamed
+    responses (`StreamResponse`, downloads) are bounded by `total` until their
+    headers arrive, their body is read by the caller.
+
+    Args:
+        connect (Union[float, None]): Seconds to establish a connection. None waits forever.
+        read (Union[float, None]): Seconds to wait for data from the server. None waits forever.
+        total (Union[float, None]): Deadline in seconds for the call including retries.
+            None means no deadline.
+    """
+
+    def __init__(
+        self,
+        connect: Union[float, None] = DEFAULT_CONNECT_TIMEOUT,
+        read: Union[float, None] = DEFAULT_READ_TIMEOUT,
+        total: Union[float, None] = None,
+    ):
+        self.connect = connect
+        self.read = read
+        self.total = total
+
+    def deadline(self) -> "Deadline":
+        """Start the clock for a call."""
+        return Deadline(self.total)
+
+    def __repr__(self) -> str:
+        return f"Timeout(connect={self.connect}, read={self.read}, total={self.total})"
+
+
+class Deadline:
+    """The point in time by which a call must have finished.
+
+    Args:
+        seconds (Union[float, None]): Seconds from now. None means no deadline.
+    """
+
+    def __init__(self, seconds: Union[float, None]):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Union[float, None]:
+        """Seconds left, never negative, or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, delay: float) -> bool:
+        """Whether waiting `delay` seconds still leaves time for another attempt."""
+        remaining = self.remaining()
+        return remaining is None or delay < remaining
+
+    def clamp(self, timeout: Union[float, None]) -> Union[float, None]:
+        """Shorten a timeout so it does not outlive the deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        # a zero timeout is rejected by requests, let the attempt fail fast instead
+        remaining = max(remaining, MIN_ATTEMPT_TIMEOUT)
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
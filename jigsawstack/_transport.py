@@ -0,0 +1,699 @@
+import asyncio
+import copy
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Union
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from ._bulkhead import Bulkhead
+from ._cache import CachedResponse, ResponseCache
+from ._concurrency import AdaptiveConcurrencyLimiter
+from ._hedge import HedgePolicy
+from ._rate_limit import RateLimiter
+from ._retry import RetryPolicy
+from ._singleflight import SingleFlight
+from ._timeout import Deadline, Timeout
+from ._upload import rewind_body
+from .helpers import endpoint_of
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+DEFAULT_CONNECTOR_LIMIT = 100
+DEFAULT_CONNECTOR_LIMIT_PER_HOST = 0
+DEFAULT_DNS_CACHE_TTL = 10
+DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+# bytes read at a time by the sync transport when a call has a deadline, checked after each read
+DEADLINE_READ_SIZE = 16 * 1024
+
+
+class Transport:
+    """Pooled, keep-alive HTTP transport shared by every sync service client.
+
+    Wraps a single `requests.Session` so that consecutive calls reuse open
+    TCP/TLS connections instead of paying a fresh handshake per request.
+
+    Args:
+        pool_connections (int): Number of per-host connection pools to cache.
+        pool_maxsize (int): Maximum number of connections kept alive per host.
+        pool_block (bool): Block when the per-host pool is exhausted instead of
+            opening a throwaway connection.
+        keep_alive (bool): Reuse connections between requests. When False every
+            request is sent with `Connection: close`.
+        retry (Union[RetryPolicy, None]): Retry policy applied to every request.
+            Defaults to `RetryPolicy()`.
+        timeout (Union[Timeout, None]): Connect, read and total timeouts applied to
+            every request. Defaults to `Timeout()`.
+        rate_limiter (Union[RateLimiter, None]): Opt-in client-side rate limiter
+            every attempt, retries included, has to pass.
+        bulkhead (Union[Bulkhead, None]): Caps the attempts in flight through this
+            transport. Clients give each service a derived transport with its own.
+        cache (Union[ResponseCache, None]): Opt-in cache of successful responses
+            from deterministic endpoints.
+        singleflight (Union[SingleFlight, None]): Opt-in coalescing of identical
+            concurrent calls, applied by the requests built on this transport.
+        hedge (Union[HedgePolicy, None]): Opt-in hedging of slow idempotent reads.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+        rate_limiter: Union[RateLimiter, None] = None,
+        bulkhead: Union[Bulkhead, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        singleflight: Union[SingleFlight, None] = None,
+        hedge: Union[HedgePolicy, None] = None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.retry = retry or RetryPolicy()
+        self.timeout = timeout or Timeout()
+        self.rate_limiter = rate_limiter
+        self.bulkhead = bulkhead
+        self.cache = cache
+        self.singleflight = singleflight
+        self.hedge = hedge
+        self._parent: Union[Transport, None] = None
+        self._hedge_executor: Union[ThreadPoolExecutor, None] = None
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+        self.closed = False
+
+    def with_options(
+        self,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+        rate_limiter: Union[RateLimiter, None] = None,
+        bulkhead: Union[Bulkhead, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        singleflight: Union[SingleFlight, None] = None,
+        hedge: Union[HedgePolicy, None] = None,
+    ) -> "Transport":
+        """Return a transport sharing this connection pool with some options overridden.
+        The pool stays owned by this transport, closing the derived one is a no-op.
+
+        Args:
+            retry (Union[RetryPolicy, None]): Retry policy for the new transport
+            timeout (Union[Timeout, None]): Timeouts for the new transport
+            rate_limiter (Union[RateLimiter, None]): Rate limiter for the new transport
+            bulkhead (Union[Bulkhead, None]): Bulkhead for the new transport
+            cache (Union[ResponseCache, None]): Response cache for the new transport
+            singleflight (Union[SingleFlight, None]): Call coalescing for the new transport
+            hedge (Union[HedgePolicy, None]): Hedging policy for the new transport
+
+        Returns:
+            Transport: A transport backed by the same session
+        """
+        transport = copy.copy(self)
+        transport._parent = self._parent or self
+        if retry is not None:
+            transport.retry = retry
+        if timeout is not None:
+            transport.timeout = timeout
+        if rate_limiter is not None:
+            transport.rate_limiter = rate_limiter
+        if bulkhead is not None:
+            transport.bulkhead = bulkhead
+        if cache is not None:
+            transport.cache = cache
+        if singleflight is not None:
+            transport.singleflight = singleflight
+        if hedge is not None:
+            transport.hedge = hedge
+        return transport
+
+    def request(
+        self, verb: str, url: str, path: Union[str, None] = None, **kwargs: Any
+    ) -> requests.Response:
+        """Send a request over the pooled session, retrying it according to the retry policy.
+
+        Args:
+            verb (str): The HTTP method
+            url (str): The URL to make the request to
+            path (Union[str, None]): The API path, used to match per-path options
+            **kwargs: Forwarded to `requests.Session.request`
+
+        Returns:
+            requests.Response: The response object from the last attempt,
+            or a cached response
+        """
+        key = self.cache.key_for(verb, url, path, kwargs) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached.to_response(url)
+
+        resp = self.__request_with_retry(verb, url, path, kwargs)
+        if key is not None and resp.status_code == 200:
+            self.cache.set(key, CachedResponse(resp.status_code, dict(resp.headers), resp.content))
+        return resp
+
+    def __request_with_retry(
+        self, verb: str, url: str, path: Union[str, None], kwargs: Dict[str, Any]
+    ) -> requests.Response:
+        retry = self.retry
+        retry.record_request()
+        deadline = self.timeout.deadline()
+        hedge = (
+            self.hedge
+            if self.hedge is not None and _can_hedge(self.hedge, verb, path, kwargs)
+            else None
+        )
+        attempt = 1
+        while True:
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire(
+                        path, api_key=_api_key(kwargs), max_wait=deadline.remaining()
+                    )
+                except TimeoutError as e:
+                    raise requests.Timeout(str(e)) from e
+            try:
+                if hedge is not None:
+                    resp = self.__send_hedged(hedge, verb, url, endpoint_of(path), deadline, kwargs)
+                else:
+                    resp = self.__send(verb, url, deadline, kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not retry.should_retry_error(attempt, verb, path):
+                    raise
+                delay = retry.backoff(attempt)
+                if not deadline.allows(delay) or not rewind_body(kwargs.get("data")):
+                    raise
+                time.sleep(delay)
+            else:
+                if not retry.should_retry_status(attempt, verb, path, resp.status_code):
+                    return resp
+                delay = retry.backoff(attempt, resp.headers.get("retry-after"))
+                if not deadline.allows(delay) or not rewind_body(kwargs.get("data")):
+                    return resp
+                resp.close()
+                time.sleep(delay)
+            attempt += 1
+
+    def __send(
+        self, verb: str, url: str, deadline: Deadline, kwargs: Dict[str, Any]
+    ) -> requests.Response:
+        if self.bulkhead is not None:
+            self.bulkhead.acquire()
+        try:
+            # computed once a slot is granted, the wait for it counts against the deadline
+            timeout = (deadline.clamp(self.timeout.connect), deadline.clamp(self.timeout.read))
+            if deadline.expires_at is None or kwargs.get("stream"):
+                # streamed bodies are read by the caller, past the call
+                return self.session.request(verb, url, timeout=timeout, **kwargs)
+            resp = self.session.request(verb, url, timeout=timeout, **{**kwargs, "stream": True})
+            _read_within(resp, deadline)
+            return resp
+        finally:
+            if self.bulkhead is not None:
+                self.bulkhead.release()
+
+    def __send_hedged(
+        self,
+        hedge: HedgePolicy,
+        verb: str,
+        url: str,
+        endpoint: str,
+        deadline: Deadline,
+        kwargs: Dict[str, Any],
+    ) -> requests.Response:
+        # a blocked call cannot be raced from its own thread, both attempts run in workers
+        executor = self.__hedge_executor()
+        started_at = time.monotonic()
+        primary = executor.submit(self.__send, verb, url, deadline, kwargs)
+        done, _ = wait([primary], timeout=hedge.delay(endpoint))
+        if done or not hedge.try_hedge():
+            resp = primary.result()
+            hedge.record(endpoint, time.monotonic() - started_at)
+            return resp
+
+        hedge_started_at = time.monotonic()
+        backup = executor.submit(self.__send, verb, url, deadline, kwargs)
+        pending = {primary, backup}
+        winner: Union[Future, None] = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # on a tie the first attempt wins, an attempt that raised waits for the other
+            winner = next((f for f in (primary, backup) if f in done and not f.exception()), None)
+
+        # a requests call cannot be interrupted, close the loser's response once it arrives
+        for f in pending:
+            f.add_done_callback(_close_response)
+        if winner is None:
+            return primary.result()
+        if winner is backup:
+            hedge.record(endpoint, time.monotonic() - hedge_started_at, hedge_won=True)
+        else:
+            hedge.record(endpoint, time.monotonic() - started_at)
+        for f in (primary, backup):
+            if f is not winner and f.done():
+                _close_response(f)
+        return winner.result()
+
+    def __hedge_executor(self) -> ThreadPoolExecutor:
+        root = self._parent or self
+        if root._hedge_executor is None:
+            # room for both attempts of as many calls as the pool has connections,
+            # the default size would queue hedged calls past min(32, cpus + 4)
+            root._hedge_executor = ThreadPoolExecutor(
+                max_workers=2 * root.pool_maxsize, thread_name_prefix="jigsawstack-hedge"
+            )
+        return root._hedge_executor
+
+    def close(self) -> None:
+        """Close every pooled connection. The transport cannot be reused afterwards."""
+        if self._parent is None and not self.closed:
+            if self._hedge_executor is not None:
+                self._hedge_executor.shutdown(wait=False)
+            self.session.close()
+            self.closed = True
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AsyncTransport:
+    """Long-lived aiohttp session shared by every async service client.
+
+    The session and its `TCPConnector` are created lazily on first use, inside
+    the running event loop. If the client is later used from a different loop
+    (e.g. one `asyncio.run` per call) a fresh session is bound to that loop.
+
+    Args:
+        limit (int): Total number of simultaneous connections. 0 means no limit.
+        limit_per_host (int): Simultaneous connections to the same endpoint.
+            0 means no limit.
+        ttl_dns_cache (Union[int, None]): Seconds to cache DNS lookups.
+            None caches them forever.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        retry (Union[RetryPolicy, None]): Retry policy applied to every request.
+            Defaults to `RetryPolicy()`.
+        timeout (Union[Timeout, None]): Connect, read and total timeouts applied to
+            every request. Defaults to `Timeout()`.
+        rate_limiter (Union[RateLimiter, None]): Opt-in client-side rate limiter
+            every attempt, retries included, has to pass.
+        bulkhead (Union[Bulkhead, None]): Caps the attempts in flight through this
+            transport. Clients give each service a derived transport with its own.
+        cache (Union[ResponseCache, None]): Opt-in cache of successful responses
+            from deterministic endpoints.
+        singleflight (Union[SingleFlight, None]): Opt-in coalescing of identical
+            concurrent calls, applied by the requests built on this transport.
+        hedge (Union[HedgePolicy, None]): Opt-in hedging of slow idempotent reads.
+        concurrency_limiter (Union[AdaptiveConcurrencyLimiter, None]): Opt-in
+            per-endpoint concurrency limit adapted to the responses of every attempt.
+    """
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_CONNECTOR_LIMIT,
+        limit_per_host: int = DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+        ttl_dns_cache: Union[int, None] = DEFAULT_DNS_CACHE_TTL,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+        rate_limiter: Union[RateLimiter, None] = None,
+        concurrency_limiter: Union[AdaptiveConcurrencyLimiter, None] = None,
+        bulkhead: Union[Bulkhead, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        singleflight: Union[SingleFlight, None] = None,
+        hedge: Union[HedgePolicy, None] = None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.retry = retry or RetryPolicy()
+        self.timeout = timeout or Timeout()
+        self.rate_limiter = rate_limiter
+        self.bulkhead = bulkhead
+        self.cache = cache
+        self.singleflight = singleflight
+        self.hedge = hedge
+        self.concurrency_limiter = concurrency_limiter
+        self._parent: Union[AsyncTransport, None] = None
+        self._session: Union[aiohttp.ClientSession, None] = None
+        self._loop: Union[asyncio.AbstractEventLoop, None] = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it in the running loop if needed.
+
+        Returns:
+            aiohttp.ClientSession: The shared client session
+        """
+        if self._parent is not None:
+            return await self._parent.get_session()
+
+        loop = asyncio.get_running_loop()
+
+        if self._session is not None and self._loop is not loop:
+            # sessions are bound to the loop that created them and are closed on it.
+            # detach first so concurrent callers don't race on the stale session
+            stale, stale_loop = self._session, self._loop
+            self._session = None
+            if stale_loop is not None:
+                await _close_session(stale, stale_loop)
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+
+        return self._session
+
+    def with_options(
+        self,
+        retry: Union[RetryPolicy, None] = None,
+        timeout: Union[Timeout, None] = None,
+        rate_limiter: Union[RateLimiter, None] = None,
+        concurrency_limiter: Union[AdaptiveConcurrencyLimiter, None] = None,
+        bulkhead: Union[Bulkhead, None] = None,
+        cache: Union[ResponseCache, None] = None,
+        singleflight: Union[SingleFlight, None] = None,
+        hedge: Union[HedgePolicy, None] = None,
+    ) -> "AsyncTransport":
+        """Return a transport sharing this session with some options overridden.
+        The session stays owned by this transport, closing the derived one is a no-op.
+
+        Args:
+            retry (Union[RetryPolicy, None]): Retry policy for the new transport
+            timeout (Union[Timeout, None]): Timeouts for the new transport
+            rate_limiter (Union[RateLimiter, None]): Rate limiter for the new transport
+            concurrency_limiter (Union[AdaptiveConcurrencyLimiter, None]): Concurrency
+                limiter for the new transport
+            bulkhead (Union[Bulkhead, None]): Bulkhead for the new transport
+            cache (Union[ResponseCache, None]): Response cache for the new transport
+            singleflight (Union[SingleFlight, None]): Call coalescing for the new transport
+            hedge (Union[HedgePolicy, None]): Hedging policy for the new transport
+
+        Returns:
+            AsyncTransport: A transport backed by the same session
+        """
+        transport = copy.copy(self)
+        transport._parent = self._parent or self
+        if retry is not None:
+            transport.retry = retry
+        if timeout is not None:
+            transport.timeout = timeout
+        if rate_limiter is not None:
+            transport.rate_limiter = rate_limiter
+        if concurrency_limiter is not None:
+            transport.concurrency_limiter = concurrency_limiter
+        if bulkhead is not None:
+            transport.bulkhead = bulkhead
+        if cache is not None:
+            transport.cache = cache
+        if singleflight is not None:
+            transport.singleflight = singleflight
+        if hedge is not None:
+            transport.hedge = hedge
+        return transport
+
+    async def request(
+        self, verb: str, url: str, path: Union[str, None] = None, **kwargs: Any
+    ) -> aiohttp.ClientResponse:
+        """Send a request over the shared session, retrying it according to the retry policy.
+
+        Args:
+            verb (str): The HTTP method
+            url (str): The URL to make the request to
+            path (Union[str, None]): The API path, used to match per-path options
+            **kwargs: Forwarded to `aiohttp.ClientSession.request`
+
+        Returns:
+            aiohttp.ClientResponse: The response object from the last attempt,
+            or a stand-in for a cached response
+        """
+        key = self.cache.key_for(verb, url, path, kwargs) if self.cache is not None else None
+        # streaming is decided by how the caller reads the body, aiohttp has no such option
+        kwargs.pop("stream", None)
+        if key is not None:
+            cached = await self.cache.get_async(key)
+            if cached is not None:
+                return cached.to_async_response()
+
+        resp = await self.__request_with_retry(verb, url, path, kwargs)
+        if key is not None and resp.status == 200:
+            body = await resp.read()
+            await self.cache.set_async(key, CachedResponse(resp.status, dict(resp.headers), body))
+        return resp
+
+    async def __request_with_retry(
+        self, verb: str, url: str, path: Union[str, None], kwargs: Dict[str, Any]
+    ) -> aiohttp.ClientResponse:
+        session = await self.get_session()
+        retry = self.retry
+        retry.record_request()
+        deadline = self.timeout.deadline()
+        endpoint = endpoint_of(path)
+        hedge = (
+            self.hedge
+            if self.hedge is not None and _can_hedge(self.hedge, verb, path, kwargs)
+            else None
+        )
+        attempt = 1
+        while True:
+            if self.rate_limiter is not None:
+                try:
+                    await self.rate_limiter.acquire_async(
+                        path, api_key=_api_key(kwargs), max_wait=deadline.remaining()
+                    )
+                except TimeoutError as e:
+                    raise asyncio.TimeoutError(str(e)) from e
+            try:
+                if hedge is not None:
+                    resp = await self.__send_hedged(
+                        hedge, session, verb, url, endpoint, deadline, kwargs
+                    )
+                else:
+                    resp = await self.__send(session, verb, url, endpoint, deadline, kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if not retry.should_retry_error(attempt, verb, path):
+                    raise
+                delay = retry.backoff(attempt)
+                if not deadline.allows(delay) or not rewind_body(kwargs.get("data")):
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                if not retry.should_retry_status(attempt, verb, path, resp.status):
+                    return resp
+                delay = retry.backoff(attempt, resp.headers.get("retry-after"))
+                if not deadline.allows(delay) or not rewind_body(kwargs.get("data")):
+                    return resp
+                resp.release()
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def __send(
+        self,
+        session: aiohttp.ClientSession,
+        verb: str,
+        url: str,
+        endpoint: str,
+        deadline: Deadline,
+        kwargs: Dict[str, Any],
+    ) -> aiohttp.ClientResponse:
+        bulkhead, limiter = self.bulkhead, self.concurrency_limiter
+        if bulkhead is not None:
+            await bulkhead.acquire_async()
+        try:
+            if limiter is not None:
+                await limiter.acquire(endpoint)
+            # computed once slots are granted, the wait for them counts against the deadline.
+            # total also bounds reading the body, which happens after request() returns
+            timeout = aiohttp.ClientTimeout(
+                total=deadline.clamp(None),
+                sock_connect=deadline.clamp(self.timeout.connect),
+                sock_read=deadline.clamp(self.timeout.read),
+            )
+            started_at = time.monotonic()
+            try:
+                resp = await session.request(verb, url, timeout=timeout, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if limiter is not None:
+                    limiter.release(endpoint, overloaded=True)
+                raise
+            except BaseException:
+                if limiter is not None:
+                    limiter.release(endpoint)
+                raise
+            if limiter is not None:
+                limiter.release(
+                    endpoint,
+                    latency=time.monotonic() - started_at,
+                    overloaded=resp.status == 429 or resp.status >= 500,
+                )
+            return resp
+        finally:
+            if bulkhead is not None:
+                bulkhead.release()
+
+    async def __send_hedged(
+        self,
+        hedge: HedgePolicy,
+        session: aiohttp.ClientSession,
+        verb: str,
+        url: str,
+        endpoint: str,
+        deadline: Deadline,
+        kwargs: Dict[str, Any],
+    ) -> aiohttp.ClientResponse:
+        started_at = time.monotonic()
+        primary = asyncio.ensure_future(self.__send(session, verb, url, endpoint, deadline, kwargs))
+        attempts = [primary]
+        winner: Union[asyncio.Future, None] = None
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=hedge.delay(endpoint))
+            if done or not hedge.try_hedge():
+                winner = primary
+                resp = await primary
+                hedge.record(endpoint, time.monotonic() - started_at)
+                return resp
+
+            hedge_started_at = time.monotonic()
+            backup = asyncio.ensure_future(
+                self.__send(session, verb, url, endpoint, deadline, kwargs)
+            )
+            attempts.append(backup)
+            pending = set(attempts)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # on a tie the first attempt wins, an attempt that raised waits for the other
+                winner = next((t for t in attempts if t in done and not t.exception()), None)
+
+            if winner is None:
+                # both failed, surface the error of the first attempt
+                winner = primary
+                return primary.result()
+            if winner is backup:
+                hedge.record(endpoint, time.monotonic() - hedge_started_at, hedge_won=True)
+            else:
+                hedge.record(endpoint, time.monotonic() - started_at)
+            return winner.result()
+        finally:
+            # cancel the loser, or release its connection if it answered too. When the
+            # caller itself is cancelled there is no winner and both attempts go
+            for t in attempts:
+                if t is not winner:
+                    t.cancel()
+                    t.add_done_callback(_release_response)
+
+    async def aclose(self) -> None:
+        """Close the shared session and every pooled connection."""
+        if self._parent is None and self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._loop = None
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+
+async def _close_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop) -> None:
+    if loop.is_closed():
+        # its sockets went with the loop, this only marks the session closed
+        await session.close()
+        return
+    if not loop.is_running():
+
+        def close() -> None:
+            loop.run_until_complete(session.close())
+
+        try:
+            # an idle loop, e.g. left by run_until_complete, runs the close on a worker thread
+            await asyncio.get_running_loop().run_in_executor(None, close)
+            return
+        except RuntimeError:
+            # it was started again meanwhile
+            pass
+    # the loop serves other calls on its own thread, the close is not waited for
+    asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+
+def _can_hedge(
+    hedge: HedgePolicy, verb: str, path: Union[str, None], kwargs: Dict[str, Any]
+) -> bool:
+    # a form or file body can only be sent once, JSON and query params can be resent
+    return hedge.applies(verb, path) and not kwargs.get("data") and not kwargs.get("files")
+
+
+def _read_within(resp: requests.Response, deadline: Deadline) -> None:
+    # requests applies the read timeout to each socket read, a body trickling in
+    # would outlive the deadline, so it is checked as every chunk arrives
+    chunks = []
+    try:
+        for chunk in resp.iter_content(DEADLINE_READ_SIZE):
+            chunks.append(chunk)
+            if not deadline.remaining():
+                raise requests.ReadTimeout(
+                    f"Deadline exceeded while reading the response of {resp.url}", response=resp
+                )
+    except BaseException:
+        resp.close()
+        raise
+    resp._content = b"".join(chunks)
+
+
+def _close_response(future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _release_response(task: asyncio.Future) -> None:
+    if not task.cancelled() and task.exception() is None:
+        task.result().release()
+
+
+def _api_key(kwargs: Dict[str, Any]) -> str:
+    return (kwargs.get("headers") or {}).get("x-api-key", "")
+
+
+_default_transport: Union[Transport, None] = None
+_default_async_transport: Union[AsyncTransport, None] = None
+
+
+def get_default_transport() -> Transport:
+    """Return the process-wide transport used by requests built without one."""
+    global _default_transport
+    if _default_transport is None or _default_transport.closed:
+        _default_transport = Transport()
+    return _default_transport
+
+
+def get_default_async_transport() -> AsyncTransport:
+    """Return the process-wide transport used by async requests built without one."""
+    global _default_async_transport
+    if _default_async_transport is None:
+        _default_async_transport = AsyncTransport()
+    return _default_async_transport
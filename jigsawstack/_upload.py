@@ -0,0 +1,337 @@
+import asyncio
+import io
+import mmap
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Any, AsyncIterable, AsyncIterator, BinaryIO, Iterable, Iterator, Union
+
+from aiohttp import payload
+from aiohttp.abc import AbstractStreamWriter
+
+# bytes handed to the socket per write, small enough to keep memory flat
+CHUNK_SIZE = 256 * 1024
+
+FileInput = Union[
+    bytes, bytearray, memoryview, mmap.mmap, str, "os.PathLike[str]", BinaryIO, Iterable[bytes]
+]
+AsyncFileInput = Union[FileInput, AsyncIterable[bytes]]
+# what multipart endpoints take as their file
+BlobInput = Union[bytes, bytearray, memoryview, mmap.mmap, "os.PathLike[str]", BinaryIO]
+
+
+class UploadBody:
+    """A sized upload source read in chunks: a buffer, a path or a seekable
+    binary file. Buffers are sliced through a `memoryview`, never copied whole.
+
+    The body can be rewound to be sent again, so calls that are retried resend
+    the same bytes.
+
+    Args:
+        source (Union[bytes, bytearray, memoryview, mmap.mmap, str, os.PathLike, BinaryIO]):
+            The data, or the path of the file holding it
+        offset (Union[int, None]): Where the body starts in the source. Defaults to the
+            start of a buffer or path, and the current position of a file object.
+        length (Union[int, None]): Bytes the body holds at most. None reads to the end.
+    """
+
+    def __init__(
+        self, source: Any, offset: Union[int, None] = None, length: Union[int, None] = None
+    ):
+        self._buffer: Union[memoryview, None] = None
+        self._file: Union[BinaryIO, None] = None
+        self._owns_file = isinstance(source, (str, os.PathLike))
+        self._pos = 0
+        if self._owns_file:
+            self._file = open(source, "rb")
+        elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._view = memoryview(source)
+            self._buffer = self._view.cast("B")
+        else:
+            self._file = source
+
+        if self._buffer is not None:
+            self._start = offset or 0
+            available = self._buffer.nbytes - self._start
+        else:
+            # upload from the current position, like requests does with a file object
+            self._start = self._file.tell() if offset is None else offset
+            available = _file_size(self._file) - self._start
+            self._file.seek(self._start)
+        self.size = max(0, available if length is None else min(length, available))
+
+    @property
+    def blocking(self) -> bool:
+        """Whether reading does file I/O."""
+        return self._file is not None
+
+    def read(self, size: int = -1) -> bytes:
+        end = self.size if size is None or size < 0 else min(self.size, self._pos + size)
+        if self._file is not None:
+            chunk = self._file.read(end - self._pos)
+        else:
+            chunk = bytes(self._buffer[self._start + self._pos : self._start + end])
+        self._pos += len(chunk)
+        return chunk
+
+    def rewind(self) -> bool:
+        """Go back to the start of the body. Returns True once done."""
+        if self._file is not None:
+            self._file.seek(self._start)
+        self._pos = 0
+        return True
+
+    def close(self) -> None:
+        """Close the file opened from a path, files passed in are left open."""
+        if self._owns_file and self._file is not None:
+            self._file.close()
+        if self._buffer is not None:
+            # an mmap cannot be closed while a view of it is alive
+            self._buffer.release()
+            self._view.release()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __bool__(self) -> bool:
+        # an empty upload is still a body, not a missing one
+        return True
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+class MultipartBody:
+    """A multipart/form-data body holding a file and, optionally, the JSON
+    params of the call in a `body` field. The file is streamed from its source
+    like an `UploadBody`, so the body is never assembled in memory, and its
+    Content-Length is known up front.
+
+    Args:
+        file (BlobInput): The file, see `blob_source`
+        body (Union[str, None]): The JSON encoded params
+    """
+
+    def __init__(self, file: Any, body: Union[str, None] = None):
+        source = blob_source(file)
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = ""
+        if body is not None:
+            head += (
+                f"--{boundary}\r\n"
+                'Content-Disposition: form-data; name="body"\r\n'
+                "Content-Type: application/json\r\n\r\n"
+                f"{body}\r\n"
+            )
+        head += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{_filename(source)}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        )
+        self._parts = [
+            UploadBody(head.encode("utf-8")),
+            UploadBody(source),
+            UploadBody(f"\r\n--{boundary}--\r\n".encode("ascii")),
+        ]
+        self._index = 0
+        self.size = sum(part.size for part in self._parts)
+
+    @property
+    def blocking(self) -> bool:
+        """Whether reading does file I/O."""
+        return any(part.blocking for part in self._parts)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(CHUNK_SIZE), b""))
+        # reads stop at the end of a part, a short read is not the end of the body
+        while self._index < len(self._parts):
+            chunk = self._parts[self._index].read(size)
+            if chunk or size == 0:
+                return chunk
+            self._index += 1
+        return b""
+
+    def rewind(self) -> bool:
+        """Go back to the start of the body. Returns True once done."""
+        for part in self._parts:
+            part.rewind()
+        self._index = 0
+        return True
+
+    def close(self) -> None:
+        """Close the file opened from a path, files passed in are left open."""
+        for part in self._parts:
+            part.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+class UploadPayload(payload.Payload):
+    """aiohttp payload streaming an `UploadBody` or `MultipartBody` with its
+    Content-Length. File reads run in the default executor so they do not block
+    the event loop."""
+
+    def __init__(self, body: Union[UploadBody, MultipartBody], **kwargs: Any):
+        kwargs.setdefault("content_type", "application/octet-stream")
+        super().__init__(body, **kwargs)
+        self._size = body.size
+
+    def rewind(self) -> bool:
+        return self._value.rewind()
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        raise TypeError("Upload payloads are streamed and cannot be decoded")
+
+    async def write(self, writer: AbstractStreamWriter) -> None:
+        body: Union[UploadBody, MultipartBody] = self._value
+        loop = asyncio.get_running_loop()
+        while True:
+            if body.blocking:
+                chunk = await loop.run_in_executor(None, body.read, CHUNK_SIZE)
+            else:
+                chunk = body.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            await writer.write(chunk)
+
+
+@contextmanager
+def open_upload(file: AsyncFileInput) -> Iterator[Any]:
+    """
+    Turn an upload source into a request body sent in chunks, closing any file
+    opened from a path on exit.
+
+    Args:
+        file (AsyncFileInput): Bytes, a buffer (bytearray, memoryview, mmap), a path,
+            a binary file object, or an iterable of bytes chunks
+
+    Returns:
+        Iterator[Any]: bytes as given, an `UploadBody` for sized sources, or an
+        iterator of chunks (sent with chunked transfer encoding) for the rest
+    """
+    if isinstance(file, bytes) or hasattr(file, "__aiter__"):
+        yield file
+    elif isinstance(file, (str, os.PathLike, bytearray, memoryview, mmap.mmap)) or _seekable(file):
+        body = UploadBody(file)
+        try:
+            yield body
+        finally:
+            body.close()
+    elif hasattr(file, "read"):
+        yield iter(lambda: file.read(CHUNK_SIZE), b"")
+    else:
+        yield iter(file)
+
+
+def blob_source(file: Any) -> Any:
+    """
+    Turn the file given to a multipart endpoint into a source `UploadBody`
+    reads without copying it: buffers are used in place, paths and seekable
+    files are read in chunks. Text is encoded, and streams that cannot seek are
+    read whole since their size must be known.
+
+    Args:
+        file (Any): Bytes, a buffer (bytearray, memoryview, mmap), a path, or a
+            binary file object
+
+    Returns:
+        Any: The source
+    """
+    if isinstance(file, (bytes, bytearray, memoryview, mmap.mmap, os.PathLike)):
+        return file
+    if isinstance(file, str):
+        # text was always sent as the content of the file, not read as a path
+        return file.encode("utf-8")
+    if _seekable(file):
+        return file
+    if hasattr(file, "read"):
+        return file.read()
+    raise TypeError(f"Cannot send a {type(file).__name__} as a file")
+
+
+def to_async_body(body: Any) -> Any:
+    """
+    Adapt a body from `open_upload` for aiohttp.
+
+    Args:
+        body (Any): The body from `open_upload`
+
+    Returns:
+        Any: A payload streaming the body in chunks
+    """
+    if isinstance(body, bytes):
+        # a large bytes body written at once would be copied into the transport buffer
+        body = UploadBody(body)
+    if isinstance(body, UploadBody):
+        return UploadPayload(body)
+    if hasattr(body, "__aiter__"):
+        return body
+    return _iterate_in_executor(body)
+
+
+def rewind_body(data: Any) -> bool:
+    """
+    Prepare a request body to be sent again.
+
+    Args:
+        data (Any): The body of the request
+
+    Returns:
+        bool: False if the body is a stream that was consumed and cannot be resent
+    """
+    rewind = getattr(data, "rewind", None)
+    if rewind is not None:
+        return rewind()
+    return not (hasattr(data, "__next__") or hasattr(data, "__anext__"))
+
+
+async def _iterate_in_executor(chunks: Iterable[bytes]) -> AsyncIterator[bytes]:
+    # the iterator may read a file or a socket, keep it off the event loop
+    loop = asyncio.get_running_loop()
+    iterator = iter(chunks)
+    done = object()
+    while True:
+        chunk = await loop.run_in_executor(None, next, iterator, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+def _seekable(file: Any) -> bool:
+    try:
+        return bool(file.seekable())
+    except (AttributeError, ValueError):
+        return False
+
+
+def _filename(source: Any) -> str:
+    name = source if isinstance(source, os.PathLike) else getattr(source, "name", None)
+    if isinstance(name, (str, os.PathLike)):
+        # quotes and line breaks would end the header
+        return os.path.basename(name).replace('"', "").replace("\r", "").replace("\n", "")
+    return "upload"
+
+
+def _file_size(file: BinaryIO) -> int:
+    # seek rather than fstat, fileno() would force a SpooledTemporaryFile to disk
+    position = file.tell()
+    size = file.seek(0, io.SEEK_END)
+    file.seek(position)
+    return size
@@ -1,10 +1,14 @@
 import json
-from io import BytesIO
-from typing import Any, AsyncGenerator, Dict, Generic, List, TypedDict, Union, cast
+import time
+from typing import Any, AsyncIterator, Dict, Generic, List, Union, cast
 
 import aiohttp
-from typing_extensions import Literal, TypeVar
+from typing_extensions import Literal, NotRequired, TypedDict, TypeVar
 
+from ._download import AsyncDownloadResponse, raise_for_download
+from ._streaming import StreamDecoder, detect_stream_format
+from ._transport import AsyncTransport, get_default_async_transport
+from ._upload import CHUNK_SIZE, MultipartBody, UploadPayload
 from .exceptions import NoContentError, raise_for_code_and_type
 
 RequestVerb = Literal["get", "post", "put", "patch", "delete"]
@@ -16,6 +20,7 @@ class AsyncRequestConfig(TypedDict):
     base_url: str
     api_key: str
     headers: Union[Dict[str, str], None]
+    transport: NotRequired[Union[AsyncTransport, None]]
 
 
 class AsyncRequest(Generic[T]):
@@ -25,7 +30,7 @@ class AsyncRequest(Generic[T]):
         path: str,
         params: Union[Dict[Any, Any], List[Dict[Any, Any]]],
         verb: RequestVerb,
-        data: Union[bytes, None] = None,
+        data: Any = None,
         stream: Union[bool, None] = False,
         files: Union[Dict[str, Any], None] = None,  # Add files parameter
     ):
@@ -38,6 +43,7 @@ class AsyncRequest(Generic[T]):
         self.headers = config.get("headers", None) or {"Content-Type": "application/json"}
         self.stream = stream
         self.files = files  # Store files for multipart requests
+        self.transport = config.get("transport") or get_default_async_transport()
 
     def __convert_params(
         self, params: Union[Dict[Any, Any], List[Dict[Any, Any]]]
@@ -66,9 +72,24 @@ class AsyncRequest(Generic[T]):
         """
         Async method to make an HTTP request to the JigsawStack API.
         """
-        async with self.__get_session() as session:
-            resp = await self.make_request(session, url=f"{self.base_url}{self.path}")
-
+        flight = self.transport.singleflight
+        key = None
+        if flight is not None:
+            key = flight.key_for(
+                self.verb,
+                f"{self.base_url}{self.path}",
+                self.path,
+                self.api_key,
+                self.params,
+                data=self.data,
+                files=self.files,
+            )
+        if key is None:
+            return await self.__perform()
+        return await flight.do_async(key, self.__perform)
+
+    async def __perform(self) -> Union[T, None]:
+        async with await self.make_request(url=f"{self.base_url}{self.path}") as resp:
             # For binary responses
             if resp.status == 200:
                 content_type = resp.headers.get("content-type", "")
@@ -107,9 +128,7 @@ class AsyncRequest(Generic[T]):
                 return cast(T, content)
 
     async def perform_file(self) -> Union[T, None]:
-        async with self.__get_session() as session:
-            resp = await self.make_request(session, url=f"{self.base_url}{self.path}")
-
+        async with await self.make_request(url=f"{self.base_url}{self.path}") as resp:
             if resp.status != 200:
                 try:
                     error = await resp.json()
@@ -133,6 +152,36 @@ class AsyncRequest(Generic[T]):
 
             return cast(T, await resp.json())
 
+    async def perform_download(
+        self, start: int = 0, end: Union[int, None] = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncDownloadResponse:
+        """
+        Make the request and return the binary body as a stream of chunks.
+        Only the status line and headers are read here.
+
+        Args:
+            start (int): Offset of the first byte requested, sent in the Range header by the caller
+            end (Union[int, None]): Offset of the last byte requested, inclusive
+            chunk_size (int): Bytes read from the socket at a time
+
+        Returns:
+            AsyncDownloadResponse: The body, read as it is iterated
+
+        Raises:
+            JigsawStackError: If the API answers with an error
+        """
+        self.stream = True
+        resp = await self.make_request(url=f"{self.base_url}{self.path}")
+        if resp.status not in (200, 206):
+            async with resp:
+                body = await resp.read()
+            raise_for_download(resp.status, resp.headers.get("content-type", ""), body)
+        try:
+            return AsyncDownloadResponse(resp, start=start, end=end, chunk_size=chunk_size)
+        except BaseException:
+            resp.release()
+            raise
+
     async def perform_with_content(self) -> T:
         """
         Perform an async HTTP request and return the response content.
@@ -189,40 +238,41 @@ class AsyncRequest(Generic[T]):
 
         return _headers
 
-    async def perform_streaming(self) -> AsyncGenerator[Union[T, str], None]:
+    async def perform_streaming(self) -> Union["AsyncStreamResponse[T]", None]:
         """
-        Async method to stream response from JigsawStack API.
+        Async method to stream response from JigsawStack API. Only the status
+        line and headers are read here, the body is yielded by the returned
+        stream as it arrives on the wire.
 
         Returns:
-            AsyncGenerator[Union[T, str], None]: A generator of response chunks
+            Union[AsyncStreamResponse[T], None]: An async iterator of response chunks
         """
-        async with self.__get_session() as session:
-            resp = await self.make_request(session, url=f"{self.base_url}{self.path}")
+        self.stream = True
+        started_at = time.perf_counter()
+        resp = await self.make_request(url=f"{self.base_url}{self.path}")
 
-            # delete calls do not return a body
-            if await resp.text() == "":
-                return
+        # delete calls do not return a body
+        if resp.content_length == 0:
+            resp.release()
+            return None
 
-            if resp.status != 200:
+        if resp.status != 200:
+            async with resp:
                 error = await resp.json()
-                raise_for_code_and_type(
-                    code=resp.status,
-                    message=error.get("message"),
-                    err=error.get("error"),
-                )
+            raise_for_code_and_type(
+                code=resp.status,
+                message=error.get("message"),
+                err=error.get("error"),
+            )
 
-            async for chunk in resp.content.iter_chunked(1024):  # 1KB chunks
-                if chunk:
-                    yield await self.__try_parse_data(chunk)
+        return AsyncStreamResponse(resp, started_at=started_at)
 
-    async def perform_with_content_streaming(
-        self,
-    ) -> AsyncGenerator[Union[T, str], None]:
+    async def perform_with_content_streaming(self) -> "AsyncStreamResponse[T]":
         """
         Perform an async HTTP request and return the response content as a streaming response.
 
         Returns:
-            AsyncGenerator[Union[T, str], None]: Streaming response content
+            AsyncStreamResponse[T]: Streaming response content
 
         Raises:
             NoContentError: If the response content is `None`.
@@ -232,9 +282,7 @@ class AsyncRequest(Generic[T]):
             raise NoContentError()
         return resp
 
-    async def make_request(
-        self, session: aiohttp.ClientSession, url: str
-    ) -> aiohttp.ClientResponse:
+    async def make_request(self, url: str) -> aiohttp.ClientResponse:
         headers = self.__get_headers()
         params = self.params
         verb = self.verb
@@ -244,60 +292,90 @@ class AsyncRequest(Generic[T]):
         _params = None
         _json = None
         _data = None
-        _form_data = None
+        _multipart = None
 
         if verb.lower() in ["get", "delete"]:
             _params = self.__convert_params(params)
         elif files:
-            _form_data = aiohttp.FormData()
-            _form_data.add_field("file", BytesIO(files["file"]), filename="upload")
-            if params and isinstance(params, dict):
-                _form_data.add_field("body", json.dumps(params), content_type="application/json")
-
+            # streamed from the file, aiohttp.FormData would hold it in memory and not rewind on retries
+            body = json.dumps(params) if params and isinstance(params, dict) else None
+            _multipart = MultipartBody(files["file"], body)
+            _data = UploadPayload(_multipart, content_type=_multipart.content_type)
             headers.pop("Content-Type", None)
         elif data:  # raw data request
             _data = data
         else:  # pure JSON request
             _json = params
 
-        return await session.request(
-            verb,
-            url,
-            params=_params,
-            json=_json,
-            data=_form_data or _data,
-            headers=headers,
-        )
-
-    def __get_session(self) -> aiohttp.ClientSession:
-        """
-        Create and return an async client session.
-
-        Returns:
-            aiohttp.ClientSession: An async client session
-        """
-        return aiohttp.ClientSession()
-
-    @staticmethod
-    async def __try_parse_data(chunk: bytes) -> Union[T, str]:
-        """
-        Attempt to parse a chunk of data as JSON or return as text.
-
-        Args:
-            chunk (bytes): The data chunk to parse
-
-        Returns:
-            Union[T, str]: Parsed JSON or raw text
-        """
-        if not chunk:
-            return chunk
-
-        # Decode bytes to text
-        text = chunk.decode("utf-8")
-
         try:
-            # Try to parse as JSON
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # Return as text if not valid JSON
-            return text
+            return await self.transport.request(
+                verb,
+                url,
+                path=self.path,
+                params=_params,
+                json=_json,
+                data=_data,
+                headers=headers,
+                stream=self.stream,
+            )
+        finally:
+            if _multipart is not None:
+                _multipart.close()
+
+
+class AsyncStreamResponse(Generic[T]):
+    """Async iterator over a streaming HTTP response.
+
+    Items are yielded as soon as the bytes that complete them are read from the
+    socket, nothing is buffered ahead of the consumer. SSE events and NDJSON
+    records are reassembled across chunk boundaries by a `StreamDecoder` picked
+    from the response content type. Timings are measured from the moment the
+    request was sent.
+
+    Attributes:
+        response (aiohttp.ClientResponse): The underlying streaming response
+        time_to_headers (float): Seconds until the status line and headers arrived
+        time_to_first_byte (Union[float, None]): Seconds until the first body chunk
+            arrived, None until it has been read
+        decoder (StreamDecoder): The incremental decoder framing the body
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, started_at: float):
+        self.response = response
+        self.started_at = started_at
+        self.time_to_headers = time.perf_counter() - started_at
+        self.time_to_first_byte: Union[float, None] = None
+        self.decoder = StreamDecoder(detect_stream_format(response.headers.get("content-type")))
+        self._chunks = self.__iter_chunks()
+
+    async def __iter_chunks(self) -> AsyncIterator[Union[T, str]]:
+        try:
+            # iter_any yields whatever has arrived instead of waiting for a full block
+            async for chunk in self.response.content.iter_any():
+                if not chunk:
+                    continue
+                if self.time_to_first_byte is None:
+                    self.time_to_first_byte = time.perf_counter() - self.started_at
+                for item in self.decoder.feed(chunk):
+                    yield item
+            for item in self.decoder.flush():
+                yield item
+        finally:
+            self.response.release()
+
+    def __aiter__(self) -> "AsyncStreamResponse[T]":
+        return self
+
+    async def __anext__(self) -> Union[T, str]:
+        return await self._chunks.__anext__()
+
+    async def aclose(self) -> None:
+        """Stop reading and release the connection back to the pool."""
+        await self._chunks.aclose()
+        self.response.release()
+
+    async def __aenter__(self) -> "AsyncStreamResponse[T]":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
@@ -2,10 +2,14 @@ from typing import Any, Dict, List, Optional, Union, cast, overload
 
 from typing_extensions import Literal, NotRequired, TypedDict
 
+from ._blobs import BlobCache, blob_request, blob_request_async
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
+from ._upload import BlobInput
 from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
+from .store import AsyncStore, Store
 
 
 class SpeechToTextParams(TypedDict):
@@ -98,9 +102,16 @@ class Audio(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[Store, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
-        self.config = RequestConfig(base_url=base_url, api_key=api_key, headers=headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
+        self.config = RequestConfig(
+            base_url=base_url, api_key=api_key, headers=headers, transport=transport
+        )
 
     @overload
     def speech_to_text(
@@ -108,12 +119,12 @@ class Audio(ClientConfig):
     ) -> Union[SpeechToTextResponse, SpeechToTextWebhookResponse]: ...
     @overload
     def speech_to_text(
-        self, blob: bytes, options: Optional[SpeechToTextParams] = None
+        self, blob: BlobInput, options: Optional[SpeechToTextParams] = None
     ) -> Union[SpeechToTextResponse, SpeechToTextWebhookResponse]: ...
 
     def speech_to_text(
         self,
-        blob: Union[SpeechToTextParams, bytes],
+        blob: Union[SpeechToTextParams, BlobInput],
         options: Optional[SpeechToTextParams] = None,
     ) -> Union[SpeechToTextResponse, SpeechToTextWebhookResponse]:
         options = options or {}
@@ -128,11 +139,11 @@ class Audio(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = blob_request(self, blob, options)
         resp = Request(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             verb="post",
             files=files,
         ).perform_with_content()
@@ -147,12 +158,18 @@ class AsyncAudio(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[AsyncStore, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
@@ -161,12 +178,12 @@ class AsyncAudio(ClientConfig):
     ) -> Union[SpeechToTextResponse, SpeechToTextWebhookResponse]: ...
     @overload
     async def speech_to_text(
-        self, blob: bytes, options: Optional[SpeechToTextParams] = None
+        self, blob: BlobInput, options: Optional[SpeechToTextParams] = None
     ) -> Union[SpeechToTextResponse, SpeechToTextWebhookResponse]: ...
 
     async def speech_to_text(
         self,
-        blob: Union[SpeechToTextParams, bytes],
+        blob: Union[SpeechToTextParams, BlobInput],
         options: Optional[SpeechToTextParams] = None,
     ) -> Union[SpeechToTextResponse, SpeechToTextWebhookResponse]:
         options = options or {}
@@ -180,11 +197,11 @@ class AsyncAudio(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = await blob_request_async(self, blob, options)
         resp = await AsyncRequest(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             verb="post",
             files=files,
         ).perform_with_content()
@@ -3,6 +3,7 @@ from typing import Any, Dict, List, Union, cast
 from typing_extensions import Literal, NotRequired, TypedDict
 
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
 from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
@@ -69,12 +70,14 @@ class Classification(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def classify(self, params: ClassificationParams) -> ClassificationResponse:
@@ -96,12 +99,14 @@ class AsyncClassification(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def classify(self, params: ClassificationParams) -> ClassificationResponse:
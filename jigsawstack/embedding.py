@@ -2,10 +2,14 @@ from typing import Any, Dict, List, Literal, Union, cast, overload
 
 from typing_extensions import NotRequired, TypedDict
 
+from ._blobs import BlobCache, blob_request, blob_request_async
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
-from .async_request import AsyncRequest
+from ._upload import BlobInput
+from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
+from .store import AsyncStore, Store
 
 
 class EmbeddingParams(TypedDict):
@@ -35,22 +39,28 @@ class Embedding(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[Store, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     def execute(self, params: EmbeddingParams) -> EmbeddingResponse: ...
     @overload
-    def execute(self, blob: bytes, options: EmbeddingParams = None) -> EmbeddingResponse: ...
+    def execute(self, blob: BlobInput, options: EmbeddingParams = None) -> EmbeddingResponse: ...
 
     def execute(
         self,
-        blob: Union[EmbeddingParams, bytes],
+        blob: Union[EmbeddingParams, BlobInput],
         options: EmbeddingParams = None,
     ) -> EmbeddingResponse:
         path = "/embedding"
@@ -64,11 +74,11 @@ class Embedding(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = blob_request(self, blob, options)
         resp = Request(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -76,29 +86,37 @@ class Embedding(ClientConfig):
 
 
 class AsyncEmbedding(ClientConfig):
-    config: RequestConfig
+    config: AsyncRequestConfig
 
     def __init__(
         self,
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[AsyncStore, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
-        self.config = RequestConfig(
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
+        self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     async def execute(self, params: EmbeddingParams) -> EmbeddingResponse: ...
     @overload
-    async def execute(self, blob: bytes, options: EmbeddingParams = None) -> EmbeddingResponse: ...
+    async def execute(
+        self, blob: BlobInput, options: EmbeddingParams = None
+    ) -> EmbeddingResponse: ...
 
     async def execute(
         self,
-        blob: Union[EmbeddingParams, bytes],
+        blob: Union[EmbeddingParams, BlobInput],
         options: EmbeddingParams = None,
     ) -> EmbeddingResponse:
         path = "/embedding"
@@ -112,11 +130,11 @@ class AsyncEmbedding(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = await blob_request_async(self, blob, options)
         resp = await AsyncRequest(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
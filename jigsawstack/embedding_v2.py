@@ -2,10 +2,14 @@ from typing import Any, Dict, List, Literal, Union, cast, overload
 
 from typing_extensions import NotRequired, TypedDict
 
+from ._blobs import BlobCache, blob_request, blob_request_async
 from ._config import ClientConfig
-from .async_request import AsyncRequest
+from ._transport import AsyncTransport, Transport
+from ._upload import BlobInput
+from .async_request import AsyncRequest, AsyncRequestConfig
 from .embedding import Chunk
 from .request import Request, RequestConfig
+from .store import AsyncStore, Store
 
 
 class EmbeddingV2Params(TypedDict):
@@ -36,22 +40,30 @@ class EmbeddingV2(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[Store, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     def execute(self, params: EmbeddingV2Params) -> EmbeddingV2Response: ...
     @overload
-    def execute(self, blob: bytes, options: EmbeddingV2Params = None) -> EmbeddingV2Response: ...
+    def execute(
+        self, blob: BlobInput, options: EmbeddingV2Params = None
+    ) -> EmbeddingV2Response: ...
 
     def execute(
         self,
-        blob: Union[EmbeddingV2Params, bytes],
+        blob: Union[EmbeddingV2Params, BlobInput],
         options: EmbeddingV2Params = None,
     ) -> EmbeddingV2Response:
         path = "/embedding"
@@ -65,11 +77,11 @@ class EmbeddingV2(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = blob_request(self, blob, options)
         resp = Request(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -77,31 +89,37 @@ class EmbeddingV2(ClientConfig):
 
 
 class AsyncEmbeddingV2(ClientConfig):
-    config: RequestConfig
+    config: AsyncRequestConfig
 
     def __init__(
         self,
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[AsyncStore, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
-        self.config = RequestConfig(
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
+        self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     async def execute(self, params: EmbeddingV2Params) -> EmbeddingV2Response: ...
     @overload
     async def execute(
-        self, blob: bytes, options: EmbeddingV2Params = None
+        self, blob: BlobInput, options: EmbeddingV2Params = None
     ) -> EmbeddingV2Response: ...
 
     async def execute(
         self,
-        blob: Union[EmbeddingV2Params, bytes],
+        blob: Union[EmbeddingV2Params, BlobInput],
         options: EmbeddingV2Params = None,
     ) -> EmbeddingV2Response:
         path = "/embedding"
@@ -115,11 +133,11 @@ class AsyncEmbeddingV2(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = await blob_request_async(self, blob, options)
         resp = await AsyncRequest(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -206,3 +206,42 @@ class NoContentError(Exception):
         self.message = """No content was returned from the API.
             Please contact Jigsawstack support."""
         Exception.__init__(self, self.message)
+
+
+class BulkheadFullError(JigsawStackError):
+    """Raised, without calling the API, when a bulkhead has no free slot and its
+    queue is full or the wait for a slot timed out.
+
+    Args:
+        name (str): The bulkhead, usually the service it guards
+        reason (str): Why no slot was granted
+    """
+
+    def __init__(self, name: str, reason: str):
+        JigsawStackError.__init__(
+            self,
+            code="bulkhead_full",
+            message=f"Bulkhead '{name}' rejected the call: {reason}",
+            suggested_action="Lower the number of concurrent calls to this service or raise its bulkhead limits.",
+        )
+        self.name = name
+
+
+class IncompleteDownloadError(JigsawStackError):
+    """Raised when a download ends before all the bytes announced by the API
+    were received.
+
+    Args:
+        expected (int): Bytes announced by the response
+        received (int): Bytes actually received
+    """
+
+    def __init__(self, expected: int, received: int):
+        JigsawStackError.__init__(
+            self,
+            code="incomplete_download",
+            message=f"Download ended after {received} of {expected} bytes",
+            suggested_action="Retry the download, or resume it from the bytes already received.",
+        )
+        self.expected = expected
+        self.received = received
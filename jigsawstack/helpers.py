@@ -1,4 +1,7 @@
-from typing import Dict, Optional, Union
+import hashlib
+import json
+import re
+from typing import Any, Dict, Optional, Union
 from urllib.parse import urlencode
 
 
@@ -23,3 +26,57 @@ def build_path(base_path: str, params: Optional[Dict[str, Union[str, int, bool]]
 
     # encode the parameters
     return f"{base_path}?{urlencode(filtered_params)}" if filtered_params else base_path
+
+
+# paths that embed a resource id, mapped to the endpoint they target
+_RESOURCE_PATHS = [
+    (re.compile(r"^/store/file/read/.+"), "/store/file/read/:key"),
+    (re.compile(r"^/prompt_engine/(?!run$)[^/]+$"), "/prompt_engine/:id"),
+]
+
+
+def endpoint_of(path: Union[str, None]) -> str:
+    """
+    Normalize a request path to the endpoint it targets, so per-endpoint state
+    is not split by query strings or resource ids.
+
+    Args:
+        path (Union[str, None]): The request path (e.g. '/store/file/read/my-key')
+
+    Returns:
+        str: The endpoint (e.g. '/store/file/read/:key')
+    """
+    if not path:
+        return ""
+    path = path.split("?", 1)[0]
+    for pattern, endpoint in _RESOURCE_PATHS:
+        if pattern.match(path):
+            return endpoint
+    return path
+
+
+def request_fingerprint(
+    verb: str, url: str, api_key: str, params: Any = None, body: Any = None
+) -> str:
+    """
+    Hash a call so that calls with the same inputs get the same fingerprint,
+    whatever order the keys of their params and body were written in.
+
+    Args:
+        verb (str): The HTTP method
+        url (str): The URL of the call
+        api_key (str): The API key the call is made with
+        params (Any): The query params
+        body (Any): The JSON body
+
+    Returns:
+        str: A hex digest identifying the call
+    """
+    canonical = json.dumps(
+        [verb.upper(), url, api_key, params, body],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
@@ -3,6 +3,7 @@ from typing import Any, Dict, Union, cast
 from typing_extensions import Literal, NotRequired, Required, TypedDict
 
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
 
@@ -91,12 +92,14 @@ class ImageGeneration(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def image_generation(
@@ -121,12 +124,14 @@ class AsyncImageGeneration(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def image_generation(
@@ -1,11 +1,12 @@
-from typing import Any, Dict, Generator, List, Literal, Union, cast
+from typing import Any, Dict, List, Literal, Union, cast
 
 from typing_extensions import NotRequired, TypedDict
 
 from ._config import ClientConfig
-from .async_request import AsyncRequest
+from ._transport import AsyncTransport, Transport
+from .async_request import AsyncRequest, AsyncRequestConfig, AsyncStreamResponse
 from .helpers import build_path
-from .request import Request, RequestConfig
+from .request import Request, RequestConfig, StreamResponse
 
 
 class PromptEngineResult(TypedDict):
@@ -100,12 +101,14 @@ class PromptEngine(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def create(self, params: PromptEngineCreateParams) -> PromptEngineCreateResponse:
@@ -153,7 +156,7 @@ class PromptEngine(ClientConfig):
 
     def run_prompt_direct(
         self, params: PromptEngineRunParams
-    ) -> Union[PromptEngineRunResponse, Generator[Any, None, None]]:
+    ) -> Union[PromptEngineRunResponse, StreamResponse[Any]]:
         path = "/prompt_engine/run"
         stream = params.get("stream")
         if stream:
@@ -175,7 +178,7 @@ class PromptEngine(ClientConfig):
 
     def run(
         self, params: PromptEngineExecuteParams
-    ) -> Union[PromptEngineRunResponse, Generator[Any, None, None]]:
+    ) -> Union[PromptEngineRunResponse, StreamResponse[Any]]:
         id = params.get("id")
         path = f"/prompt_engine/{id}"
         stream = params.get("stream")
@@ -199,19 +202,21 @@ class PromptEngine(ClientConfig):
 
 
 class AsyncPromptEngine(ClientConfig):
-    config: RequestConfig
+    config: AsyncRequestConfig
 
     def __init__(
         self,
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
-        self.config = RequestConfig(
+        super().__init__(api_key, base_url, headers, transport)
+        self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def create(self, params: PromptEngineCreateParams) -> PromptEngineCreateResponse:
@@ -265,7 +270,7 @@ class AsyncPromptEngine(ClientConfig):
 
     async def run_prompt_direct(
         self, params: PromptEngineRunParams
-    ) -> Union[PromptEngineRunResponse, Generator[Any, None, None]]:
+    ) -> Union[PromptEngineRunResponse, AsyncStreamResponse[Any]]:
         path = "/prompt_engine/run"
         stream = params.get("stream")
         if stream:
@@ -286,7 +291,7 @@ class AsyncPromptEngine(ClientConfig):
 
     async def run(
         self, params: PromptEngineExecuteParams
-    ) -> Union[PromptEngineRunResponse, Generator[Any, None, None]]:
+    ) -> Union[PromptEngineRunResponse, AsyncStreamResponse[Any]]:
         id = params.get("id")
         path = f"/prompt_engine/{id}"
         stream = params.get("stream")
@@ -1,9 +1,14 @@
 import json
-from typing import Any, Dict, Generator, Generic, List, TypedDict, Union, cast
+import time
+from typing import Any, Dict, Generic, Iterator, List, Union, cast
 
 import requests
-from typing_extensions import Literal, TypeVar
+from typing_extensions import Literal, NotRequired, TypedDict, TypeVar
 
+from ._download import DownloadResponse, raise_for_download
+from ._streaming import StreamDecoder, detect_stream_format
+from ._transport import Transport, get_default_transport
+from ._upload import CHUNK_SIZE, MultipartBody
 from .exceptions import NoContentError, raise_for_code_and_type
 
 RequestVerb = Literal["get", "post", "put", "patch", "delete"]
@@ -15,6 +20,7 @@ class RequestConfig(TypedDict):
     base_url: str
     api_key: str
     headers: Union[Dict[str, str], None]
+    transport: NotRequired[Union[Transport, None]]
 
 
 # This class wraps the HTTP request creation logic
@@ -25,7 +31,7 @@ class Request(Generic[T]):
         path: str,
         params: Union[Dict[Any, Any], List[Dict[Any, Any]]],
         verb: RequestVerb,
-        data: Union[bytes, None] = None,
+        data: Any = None,
         stream: Union[bool, None] = False,
         files: Union[Dict[str, Any], None] = None,
     ):
@@ -38,6 +44,7 @@ class Request(Generic[T]):
         self.headers = config.get("headers", None) or {"Content-Type": "application/json"}
         self.stream = stream
         self.files = files
+        self.transport = config.get("transport") or get_default_transport()
 
     def perform(self) -> Union[T, None]:
         """Is the main function that makes the HTTP request
@@ -50,6 +57,23 @@ class Request(Generic[T]):
         Raises:
             requests.HTTPError: If the request fails
         """
+        flight = self.transport.singleflight
+        key = None
+        if flight is not None:
+            key = flight.key_for(
+                self.verb,
+                f"{self.base_url}{self.path}",
+                self.path,
+                self.api_key,
+                self.params,
+                data=self.data,
+                files=self.files,
+            )
+        if key is None:
+            return self.__perform()
+        return flight.do(key, self.__perform)
+
+    def __perform(self) -> Union[T, None]:
         resp = self.make_request(url=f"{self.base_url}{self.path}")
 
         # for binary responses
@@ -85,8 +109,8 @@ class Request(Generic[T]):
     def perform_file(self) -> Union[T, None]:
         resp = self.make_request(url=f"{self.base_url}{self.path}")
 
-        # delete calls do not return a body
-        if resp.text == "" and resp.status_code == 200:
+        # delete calls do not return a body, compare bytes rather than decoding a binary file as text
+        if not resp.content and resp.status_code == 200:
             return None
         # handle error in case there is a statusCode attr present
         # and status != 200 and response is a json.
@@ -113,6 +137,37 @@ class Request(Generic[T]):
                 resp = cast(T, resp.content)
         return resp
 
+    def perform_download(
+        self, start: int = 0, end: Union[int, None] = None, chunk_size: int = CHUNK_SIZE
+    ) -> DownloadResponse:
+        """Make the request and return the binary body as a stream of chunks.
+        Only the status line and headers are read here.
+
+        Args:
+            start (int): Offset of the first byte requested, sent in the Range header by the caller
+            end (Union[int, None]): Offset of the last byte requested, inclusive
+            chunk_size (int): Bytes read from the socket at a time
+
+        Returns:
+            DownloadResponse: The body, read as it is iterated
+
+        Raises:
+            JigsawStackError: If the API answers with an error
+        """
+        self.stream = True
+        resp = self.make_request(url=f"{self.base_url}{self.path}")
+        if resp.status_code not in (200, 206):
+            try:
+                body = resp.content
+            finally:
+                resp.close()
+            raise_for_download(resp.status_code, resp.headers.get("content-type", ""), body)
+        try:
+            return DownloadResponse(resp, start=start, end=end, chunk_size=chunk_size)
+        except BaseException:
+            resp.close()
+            raise
+
     def perform_with_content(self) -> T:
         """
         Perform an HTTP request and return the response content.
@@ -170,58 +225,46 @@ class Request(Generic[T]):
 
         return _headers
 
-    def perform_streaming(self) -> Generator[Union[T, str], None, None]:
+    def perform_streaming(self) -> Union["StreamResponse[T]", None]:
         """Is the main function that makes the HTTP request
         to the JigsawStack API. It uses the path, params, and verb attributes
-        to make the request.
+        to make the request. Only the status line and headers are read here,
+        the body is yielded by the returned stream as it arrives on the wire.
 
         Returns:
-            Generator[bytes, None, None]: A generator of bytes
+            Union[StreamResponse[T], None]: An iterator of response chunks
 
         Raises:
             requests.HTTPError: If the request fails
         """
+        self.stream = True
+        started_at = time.perf_counter()
         resp = self.make_request(url=f"{self.base_url}{self.path}")
 
         # delete calls do not return a body
-        if resp.text == "":
+        if resp.headers.get("content-length") == "0":
+            resp.close()
             return None
 
         if resp.status_code != 200:
-            error = resp.json()
+            try:
+                error = resp.json()
+            finally:
+                resp.close()
             raise_for_code_and_type(
                 code=resp.status_code,
                 message=error.get("message"),
                 err=error.get("error"),
             )
 
-        def try_parse_data(chunk: bytes) -> Union[T, str]:
-            if not chunk:
-                return chunk
-            # Decode bytes to text
-            text = chunk.decode("utf-8")
-
-            try:
-                # Try to parse as JSON
-                return json.loads(text)
-            except json.JSONDecodeError:
-                # Return as text if not valid JSON
-                return text
-
-        # Yield content in chunks
-        def chunk_generator():
-            for chunk in resp.iter_content(chunk_size=1024):  # 1KB chunks
-                if chunk:  # Filter out keep-alive new chunks
-                    yield try_parse_data(chunk)
+        return StreamResponse(resp, started_at=started_at)
 
-        return chunk_generator()
-
-    def perform_with_content_streaming(self) -> Generator[Union[T, str], None, None]:
+    def perform_with_content_streaming(self) -> "StreamResponse[T]":
         """
         Perform an HTTP request and return the response content as a streaming response.
 
         Returns:
-            T: The content of the response
+            StreamResponse[T]: The content of the response
 
         Raises:
             NoContentError: If the response content is `None`.
@@ -257,19 +300,19 @@ class Request(Generic[T]):
 
         if verb.lower() in ["get", "delete"]:
             _requestParams = params
-        elif files:  # multipart request
-            _files = files
-            if params and isinstance(params, dict):
-                _data = {"body": json.dumps(params)}
-            headers.pop("Content-Type", None)  # let requests set it for multipart
+        elif files:  # multipart request, streamed from the file rather than encoded by requests
+            body = json.dumps(params) if params and isinstance(params, dict) else None
+            _data = MultipartBody(files["file"], body)
+            headers["Content-Type"] = _data.content_type
         elif data:  # raw data request
             _data = data
         else:  # pure JSON request
             _json = params
         try:
-            return requests.request(
+            return self.transport.request(
                 verb,
                 url,
+                path=self.path,
                 params=_requestParams,
                 json=_json,
                 headers=headers,
@@ -279,3 +322,62 @@ class Request(Generic[T]):
             )
         except requests.HTTPError as e:
             raise e
+        finally:
+            if isinstance(_data, MultipartBody):
+                _data.close()
+
+
+class StreamResponse(Generic[T]):
+    """Iterator over a streaming HTTP response.
+
+    Items are yielded as soon as the bytes that complete them are read from the
+    socket, nothing is buffered ahead of the consumer. SSE events and NDJSON
+    records are reassembled across chunk boundaries by a `StreamDecoder` picked
+    from the response content type. Timings are measured from the moment the
+    request was sent.
+
+    Attributes:
+        response (requests.Response): The underlying streaming response
+        time_to_headers (float): Seconds until the status line and headers arrived
+        time_to_first_byte (Union[float, None]): Seconds until the first body chunk
+            arrived, None until it has been read
+        decoder (StreamDecoder): The incremental decoder framing the body
+    """
+
+    def __init__(self, response: requests.Response, started_at: float):
+        self.response = response
+        self.started_at = started_at
+        self.time_to_headers = time.perf_counter() - started_at
+        self.time_to_first_byte: Union[float, None] = None
+        self.decoder = StreamDecoder(detect_stream_format(response.headers.get("content-type")))
+        self._chunks = self.__iter_chunks()
+
+    def __iter_chunks(self) -> Iterator[Union[T, str]]:
+        try:
+            # chunk_size=None yields whatever has arrived instead of waiting for a full block
+            for chunk in self.response.iter_content(chunk_size=None):
+                if not chunk:  # Filter out keep-alive new chunks
+                    continue
+                if self.time_to_first_byte is None:
+                    self.time_to_first_byte = time.perf_counter() - self.started_at
+                yield from self.decoder.feed(chunk)
+            yield from self.decoder.flush()
+        finally:
+            self.response.close()
+
+    def __iter__(self) -> "StreamResponse[T]":
+        return self
+
+    def __next__(self) -> Union[T, str]:
+        return next(self._chunks)
+
+    def close(self) -> None:
+        """Stop reading and release the connection back to the pool."""
+        self._chunks.close()
+        self.response.close()
+
+    def __enter__(self) -> "StreamResponse[T]":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
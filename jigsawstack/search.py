@@ -3,6 +3,7 @@ from typing import Any, Dict, List, Literal, Optional, Union, cast
 from typing_extensions import NotRequired, TypedDict
 
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
 from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
@@ -232,12 +233,14 @@ class Search(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def search(self, params: SearchParams) -> SearchResponse:
@@ -303,12 +306,14 @@ class AsyncSearch(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def search(self, params: SearchParams) -> SearchResponse:
@@ -3,8 +3,9 @@ from typing import Any, Dict, List, Union, cast
 from typing_extensions import TypedDict
 
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
-from .async_request import AsyncRequest
+from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
 
 
@@ -50,12 +51,14 @@ class Sentiment(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def analyze(self, params: SentimentParams) -> SentimentResponse:
@@ -70,19 +73,21 @@ class Sentiment(ClientConfig):
 
 
 class AsyncSentiment(ClientConfig):
-    config: RequestConfig
+    config: AsyncRequestConfig
 
     def __init__(
         self,
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
-        self.config = RequestConfig(
+        super().__init__(api_key, base_url, headers, transport)
+        self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def analyze(self, params: SentimentParams) -> SentimentResponse:
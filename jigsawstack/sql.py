@@ -3,8 +3,9 @@ from typing import Any, Dict, Literal, Union, cast
 from typing_extensions import NotRequired, TypedDict
 
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
-from .async_request import AsyncRequest
+from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
 
 
@@ -45,12 +46,14 @@ class SQL(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def text_to_sql(self, params: SQLParams) -> SQLResponse:
@@ -65,19 +68,21 @@ class SQL(ClientConfig):
 
 
 class AsyncSQL(ClientConfig):
-    config: RequestConfig
+    config: AsyncRequestConfig
 
     def __init__(
         self,
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
-        self.config = RequestConfig(
+        super().__init__(api_key, base_url, headers, transport)
+        self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def text_to_sql(self, params: SQLParams) -> SQLResponse:
@@ -1,9 +1,31 @@
-from typing import Any, Dict, Union
+import os
+from typing import Any, Dict, Iterable, Tuple, Union, cast
 
 from typing_extensions import NotRequired, TypedDict
 
+from ._bulk import DEFAULT_BULK_CONCURRENCY, BulkResponse, run_bulk, run_bulk_async
 from ._config import ClientConfig
+from ._dedup import UploadDedup
+from ._download import (
+    DEFAULT_PARALLELISM,
+    DEFAULT_PART_SIZE,
+    AsyncDownloadResponse,
+    Destination,
+    DownloadResponse,
+    download_parts,
+    download_parts_async,
+    range_header,
+)
+from ._transport import AsyncTransport, Transport
+from ._upload import (
+    CHUNK_SIZE,
+    AsyncFileInput,
+    FileInput,
+    open_upload,
+    to_async_body,
+)
 from .async_request import AsyncRequest, AsyncRequestConfig
+from .exceptions import JigsawStackError
 from .helpers import build_path
 from .request import Request, RequestConfig
 
@@ -34,33 +56,61 @@ class Store(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
+        dedup: Union[UploadDedup, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.dedup = dedup
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def upload(
-        self, file: bytes, options: Union[FileUploadParams, None] = None
+        self, file: FileInput, options: Union[FileUploadParams, None] = None
     ) -> FileUploadResponse:
+        """
+        Upload a file to the store. The file is streamed in chunks, so memory
+        use does not grow with its size.
+
+        Args:
+            file (FileInput): Bytes, a buffer (bytearray, memoryview, mmap), a file path,
+                a binary file object, or an iterable of bytes chunks
+            options (Union[FileUploadParams, None]): Key, content type and overwrite options
+
+        Returns:
+            FileUploadResponse: The key, URL and size of the stored file. With
+            `dedup` set, that of the file already holding the same content if any.
+        """
         if options is None:
             options = {}
 
+        if self.dedup is None or not self.dedup.applies(options):
+            with open_upload(file) as body:
+                return self.__send(body, options)
+
+        with self.dedup.hashed(file) as (digest, size, body):
+            digest_key = self.dedup.digest_key(self.api_key, digest)
+            existing = self.dedup.lookup(digest_key, size)
+            if existing is not None:
+                return cast(FileUploadResponse, dict(existing))
+            resp = self.__send(body, options)
+        self.dedup.record(digest_key, resp)
+        return resp
+
+    def __send(self, body: Any, options: FileUploadParams) -> FileUploadResponse:
         path = build_path(base_path="/store/file", params=options)
         content_type = options.get("content_type", "application/octet-stream")
 
-        config_with_headers = self.config.copy()
-        if config_with_headers.get("headers") is None:
-            config_with_headers["headers"] = {}
-        config_with_headers["headers"]["Content-Type"] = content_type
+        config_with_headers = _with_content_type(self.config, content_type)
 
         resp = Request(
             config=config_with_headers,
             params={},
             path=path,
-            data=file,
+            data=body,
             verb="post",
         ).perform_with_content()
         return resp
@@ -75,6 +125,120 @@ class Store(ClientConfig):
         ).perform_with_content_file()
         return resp
 
+    def get_range(self, key: str, start: int, end: Union[int, None] = None) -> bytes:
+        """
+        Read part of a stored file with an HTTP Range request.
+
+        Args:
+            key (str): The key of the file
+            start (int): First byte to read. A negative value reads the last `-start` bytes.
+            end (Union[int, None]): Last byte to read, inclusive. None reads to the end.
+
+        Returns:
+            bytes: The bytes read
+        """
+        with self.stream(key, start, end) as body:
+            return body.read()
+
+    def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Union[int, None] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> DownloadResponse:
+        """
+        Read a stored file as an iterator of bytes chunks, without holding it in memory.
+
+        Args:
+            key (str): The key of the file
+            start (int): First byte to read. A negative value reads the last `-start` bytes.
+            end (Union[int, None]): Last byte to read, inclusive. None reads to the end.
+            chunk_size (int): Bytes read from the socket at a time
+
+        Returns:
+            DownloadResponse: The body, to iterate or use as a context manager
+        """
+        path = f"/store/file/read/{key}"
+        return Request(
+            config=_with_range(self.config, start, end),
+            path=path,
+            params=None,
+            verb="get",
+        ).perform_download(start, end, chunk_size)
+
+    def download(
+        self,
+        key: str,
+        destination: Destination,
+        start: int = 0,
+        end: Union[int, None] = None,
+    ) -> int:
+        """
+        Write a stored file to a path or a binary file, chunk by chunk.
+
+        Args:
+            key (str): The key of the file
+            destination (Destination): The path, or a binary file open for writing
+            start (int): First byte to read. A negative value reads the last `-start` bytes.
+            end (Union[int, None]): Last byte to read, inclusive. None reads to the end.
+
+        Returns:
+            int: Bytes written
+
+        Raises:
+            IncompleteDownloadError: If the connection closed before the whole file was received
+        """
+        with self.stream(key, start, end) as body:
+            return body.write_to(destination)
+
+    def download_parallel(
+        self,
+        key: str,
+        destination: Union[str, "os.PathLike[str]"],
+        part_size: int = DEFAULT_PART_SIZE,
+        parallelism: int = DEFAULT_PARALLELISM,
+    ) -> int:
+        """
+        Download a large stored file over several connections at once. The file is
+        split into ranges of `part_size` bytes, fetched `parallelism` at a time and
+        written in place into a file preallocated to the final size.
+
+        Falls back to a single `download` when the server does not serve ranges.
+        Keep `parallelism` within the connection pool size of the client.
+
+        Args:
+            key (str): The key of the file
+            destination (Union[str, os.PathLike]): The path to write, deleted if the download fails
+            part_size (int): Bytes per range
+            parallelism (int): Ranges fetched at once
+
+        Returns:
+            int: Bytes written
+
+        Raises:
+            IncompleteDownloadError: If the file written is smaller than the stored file
+        """
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+        try:
+            first = self.stream(key, 0, part_size - 1)
+        except JigsawStackError as e:
+            # an empty file has no byte to serve a range from
+            if str(e.code) != "416":
+                raise
+            return self.download(key, destination)
+        if not first.partial or first.total_size is None:
+            first.close()
+            return self.download(key, destination)
+        return download_parts(
+            lambda start, end: self.stream(key, start, end),
+            first,
+            destination,
+            part_size,
+            parallelism,
+        )
+
     def delete(self, key: str) -> FileDeleteResponse:
         path = f"/store/file/read/{key}"
         resp = Request(
@@ -83,8 +247,69 @@ class Store(ClientConfig):
             params=key,
             verb="delete",
         ).perform_with_content()
+        if self.dedup is not None:
+            self.dedup.forget(key)
         return resp
 
+    def upload_many(
+        self,
+        items: Iterable[Tuple[str, FileInput]],
+        options: Union[FileUploadParams, None] = None,
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResponse:
+        """
+        Upload many files, `concurrency` at a time over the shared connection pool.
+
+        Args:
+            items (Iterable[Tuple[str, FileInput]]): (key, file) pairs, the file
+                being anything `upload` accepts
+            options (Union[FileUploadParams, None]): Content type and overwrite options
+                applied to every file
+            concurrency (int): Uploads in flight at once
+
+        Returns:
+            BulkResponse: The `FileUploadResponse` or exception of each file, in input
+            order, and the throughput
+        """
+        return run_bulk(
+            items,
+            lambda item: item[0],
+            lambda item: self.upload(item[1], {**(options or {}), "key": item[0]}),
+            concurrency,
+        )
+
+    def get_many(
+        self, keys: Iterable[str], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResponse:
+        """
+        Read many files, `concurrency` at a time over the shared connection pool.
+
+        Args:
+            keys (Iterable[str]): The keys of the files
+            concurrency (int): Reads in flight at once
+
+        Returns:
+            BulkResponse: The content or exception of each file, in input order,
+            and the throughput
+        """
+        return run_bulk(keys, str, self.get, concurrency)
+
+    def delete_many(
+        self, keys: Iterable[str], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResponse:
+        """
+        Delete many files, `concurrency` at a time over the shared connection pool.
+
+        Args:
+            keys (Iterable[str]): The keys of the files
+            concurrency (int): Deletes in flight at once
+
+        Returns:
+            BulkResponse: The `FileDeleteResponse` or exception of each file, in input
+            order, and the throughput
+        """
+        return run_bulk(keys, str, self.delete, concurrency)
+
 
 class AsyncStore(ClientConfig):
     config: AsyncRequestConfig
@@ -94,33 +319,61 @@ class AsyncStore(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        dedup: Union[UploadDedup, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.dedup = dedup
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def upload(
-        self, file: bytes, options: Union[FileUploadParams, None] = None
+        self, file: AsyncFileInput, options: Union[FileUploadParams, None] = None
     ) -> FileUploadResponse:
+        """
+        Upload a file to the store. The file is streamed in chunks, so memory
+        use does not grow with its size.
+
+        Args:
+            file (AsyncFileInput): Bytes, a buffer (bytearray, memoryview, mmap), a file
+                path, a binary file object, or a sync or async iterable of bytes chunks
+            options (Union[FileUploadParams, None]): Key, content type and overwrite options
+
+        Returns:
+            FileUploadResponse: The key, URL and size of the stored file. With
+            `dedup` set, that of the file already holding the same content if any.
+        """
         if options is None:
             options = {}
 
+        if self.dedup is None or not self.dedup.applies(options):
+            with open_upload(file) as body:
+                return await self.__send(body, options)
+
+        async with self.dedup.hashed_async(file) as (digest, size, body):
+            digest_key = self.dedup.digest_key(self.api_key, digest)
+            existing = await self.dedup.lookup_async(digest_key, size)
+            if existing is not None:
+                return cast(FileUploadResponse, dict(existing))
+            resp = await self.__send(body, options)
+        await self.dedup.record_async(digest_key, resp)
+        return resp
+
+    async def __send(self, body: Any, options: FileUploadParams) -> FileUploadResponse:
         path = build_path(base_path="/store/file", params=options)
         content_type = options.get("content_type", "application/octet-stream")
 
-        config_with_headers = self.config.copy()
-        if config_with_headers.get("headers") is None:
-            config_with_headers["headers"] = {}
-        config_with_headers["headers"]["Content-Type"] = content_type
+        config_with_headers = _with_content_type(self.config, content_type)
 
         resp = await AsyncRequest(
             config=config_with_headers,
             params={},
             path=path,
-            data=file,
+            data=to_async_body(body),
             verb="post",
         ).perform_with_content()
         return resp
@@ -135,6 +388,120 @@ class AsyncStore(ClientConfig):
         ).perform_with_content_file()
         return resp
 
+    async def get_range(self, key: str, start: int, end: Union[int, None] = None) -> bytes:
+        """
+        Read part of a stored file with an HTTP Range request.
+
+        Args:
+            key (str): The key of the file
+            start (int): First byte to read. A negative value reads the last `-start` bytes.
+            end (Union[int, None]): Last byte to read, inclusive. None reads to the end.
+
+        Returns:
+            bytes: The bytes read
+        """
+        async with await self.stream(key, start, end) as body:
+            return await body.read()
+
+    async def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Union[int, None] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> AsyncDownloadResponse:
+        """
+        Read a stored file as an async iterator of bytes chunks, without holding it in memory.
+
+        Args:
+            key (str): The key of the file
+            start (int): First byte to read. A negative value reads the last `-start` bytes.
+            end (Union[int, None]): Last byte to read, inclusive. None reads to the end.
+            chunk_size (int): Bytes read from the socket at a time
+
+        Returns:
+            AsyncDownloadResponse: The body, to iterate or use as a context manager
+        """
+        path = f"/store/file/read/{key}"
+        return await AsyncRequest(
+            config=_with_range(self.config, start, end),
+            path=path,
+            params=None,
+            verb="get",
+        ).perform_download(start, end, chunk_size)
+
+    async def download(
+        self,
+        key: str,
+        destination: Destination,
+        start: int = 0,
+        end: Union[int, None] = None,
+    ) -> int:
+        """
+        Write a stored file to a path or a binary file, chunk by chunk.
+
+        Args:
+            key (str): The key of the file
+            destination (Destination): The path, or a binary file open for writing
+            start (int): First byte to read. A negative value reads the last `-start` bytes.
+            end (Union[int, None]): Last byte to read, inclusive. None reads to the end.
+
+        Returns:
+            int: Bytes written
+
+        Raises:
+            IncompleteDownloadError: If the connection closed before the whole file was received
+        """
+        async with await self.stream(key, start, end) as body:
+            return await body.write_to(destination)
+
+    async def download_parallel(
+        self,
+        key: str,
+        destination: Union[str, "os.PathLike[str]"],
+        part_size: int = DEFAULT_PART_SIZE,
+        parallelism: int = DEFAULT_PARALLELISM,
+    ) -> int:
+        """
+        Download a large stored file over several connections at once. The file is
+        split into ranges of `part_size` bytes, fetched `parallelism` at a time and
+        written in place into a file preallocated to the final size.
+
+        Falls back to a single `download` when the server does not serve ranges.
+        Keep `parallelism` within the connection pool size of the client.
+
+        Args:
+            key (str): The key of the file
+            destination (Union[str, os.PathLike]): The path to write, deleted if the download fails
+            part_size (int): Bytes per range
+            parallelism (int): Ranges fetched at once
+
+        Returns:
+            int: Bytes written
+
+        Raises:
+            IncompleteDownloadError: If the file written is smaller than the stored file
+        """
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+        try:
+            first = await self.stream(key, 0, part_size - 1)
+        except JigsawStackError as e:
+            # an empty file has no byte to serve a range from
+            if str(e.code) != "416":
+                raise
+            return await self.download(key, destination)
+        if not first.partial or first.total_size is None:
+            await first.aclose()
+            return await self.download(key, destination)
+        return await download_parts_async(
+            lambda start, end: self.stream(key, start, end),
+            first,
+            destination,
+            part_size,
+            parallelism,
+        )
+
     async def delete(self, key: str) -> FileDeleteResponse:
         path = f"/store/file/read/{key}"
         resp = await AsyncRequest(
@@ -143,4 +510,81 @@ class AsyncStore(ClientConfig):
             params=key,
             verb="delete",
         ).perform_with_content()
+        if self.dedup is not None:
+            await self.dedup.forget_async(key)
         return resp
+
+    async def upload_many(
+        self,
+        items: Iterable[Tuple[str, AsyncFileInput]],
+        options: Union[FileUploadParams, None] = None,
+        concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResponse:
+        """
+        Upload many files, `concurrency` at a time over the shared connection pool.
+
+        Args:
+            items (Iterable[Tuple[str, AsyncFileInput]]): (key, file) pairs, the file
+                being anything `upload` accepts
+            options (Union[FileUploadParams, None]): Content type and overwrite options
+                applied to every file
+            concurrency (int): Uploads in flight at once
+
+        Returns:
+            BulkResponse: The `FileUploadResponse` or exception of each file, in input
+            order, and the throughput
+        """
+        return await run_bulk_async(
+            items,
+            lambda item: item[0],
+            lambda item: self.upload(item[1], {**(options or {}), "key": item[0]}),
+            concurrency,
+        )
+
+    async def get_many(
+        self, keys: Iterable[str], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResponse:
+        """
+        Read many files, `concurrency` at a time over the shared connection pool.
+
+        Args:
+            keys (Iterable[str]): The keys of the files
+            concurrency (int): Reads in flight at once
+
+        Returns:
+            BulkResponse: The content or exception of each file, in input order,
+            and the throughput
+        """
+        return await run_bulk_async(keys, str, self.get, concurrency)
+
+    async def delete_many(
+        self, keys: Iterable[str], concurrency: int = DEFAULT_BULK_CONCURRENCY
+    ) -> BulkResponse:
+        """
+        Delete many files, `concurrency` at a time over the shared connection pool.
+
+        Args:
+            keys (Iterable[str]): The keys of the files
+            concurrency (int): Deletes in flight at once
+
+        Returns:
+            BulkResponse: The `FileDeleteResponse` or exception of each file, in input
+            order, and the throughput
+        """
+        return await run_bulk_async(keys, str, self.delete, concurrency)
+
+
+def _with_header(config: Any, name: str, value: str) -> Any:
+    # copy the headers too, they are shared with every other call on the client
+    config = config.copy()
+    config["headers"] = {**(config.get("headers") or {}), name: value}
+    return config
+
+
+def _with_content_type(config: Any, content_type: str) -> Any:
+    return _with_header(config, "Content-Type", content_type)
+
+
+def _with_range(config: Any, start: int, end: Union[int, None]) -> Any:
+    value = range_header(start, end)
+    return config if value is None else _with_header(config, "Range", value)
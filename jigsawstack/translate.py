@@ -2,10 +2,14 @@ from typing import Any, Dict, List, Union, cast, overload
 
 from typing_extensions import Literal, NotRequired, TypedDict
 
+from ._blobs import BlobCache, blob_request, blob_request_async
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
-from .async_request import AsyncRequest
+from ._upload import BlobInput
+from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
+from .store import AsyncStore, Store
 
 
 class TranslateImageParams(TypedDict):
@@ -65,12 +69,18 @@ class Translate(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[Store, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def text(self, params: TranslateParams) -> TranslateResponse:
@@ -86,12 +96,12 @@ class Translate(ClientConfig):
     def image(self, params: TranslateImageParams) -> Union[TranslateImageResponse, bytes]: ...
     @overload
     def image(
-        self, blob: bytes, options: TranslateImageParams = None
+        self, blob: BlobInput, options: TranslateImageParams = None
     ) -> Union[TranslateImageResponse, bytes]: ...
 
     def image(
         self,
-        blob: Union[TranslateImageParams, bytes],
+        blob: Union[TranslateImageParams, BlobInput],
         options: TranslateImageParams = None,
     ) -> Union[TranslateImageResponse, bytes]:
         path = "/ai/translate/image"
@@ -107,11 +117,11 @@ class Translate(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = blob_request(self, blob, options)
         resp = Request(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -119,19 +129,25 @@ class Translate(ClientConfig):
 
 
 class AsyncTranslate(ClientConfig):
-    config: RequestConfig
+    config: AsyncRequestConfig
 
     def __init__(
         self,
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[AsyncStore, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
-        self.config = RequestConfig(
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
+        self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def text(self, params: TranslateParams) -> TranslateResponse:
@@ -147,12 +163,12 @@ class AsyncTranslate(ClientConfig):
     async def image(self, params: TranslateImageParams) -> Union[TranslateImageResponse, bytes]: ...
     @overload
     async def image(
-        self, blob: bytes, options: TranslateImageParams = None
+        self, blob: BlobInput, options: TranslateImageParams = None
     ) -> Union[TranslateImageResponse, bytes]: ...
 
     async def image(
         self,
-        blob: Union[TranslateImageParams, bytes],
+        blob: Union[TranslateImageParams, BlobInput],
         options: TranslateImageParams = None,
     ) -> Union[TranslateImageResponse, bytes]:
         path = "/ai/translate/image"
@@ -166,11 +182,11 @@ class AsyncTranslate(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = await blob_request_async(self, blob, options)
         resp = await AsyncRequest(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -2,11 +2,15 @@ from typing import Any, Dict, List, Union, cast, overload
 
 from typing_extensions import NotRequired, TypedDict
 
+from ._blobs import BlobCache, blob_request, blob_request_async
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
+from ._upload import BlobInput
 from .async_request import AsyncRequest, AsyncRequestConfig
 from .helpers import build_path
 from .request import Request, RequestConfig
+from .store import AsyncStore, Store
 
 
 class Spam(TypedDict):
@@ -81,22 +85,28 @@ class Validate(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[Store, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     def nsfw(self, params: NSFWParams) -> NSFWResponse: ...
     @overload
-    def nsfw(self, blob: bytes, options: NSFWParams = None) -> NSFWResponse: ...
+    def nsfw(self, blob: BlobInput, options: NSFWParams = None) -> NSFWResponse: ...
 
     def nsfw(
         self,
-        blob: Union[NSFWParams, bytes],
+        blob: Union[NSFWParams, BlobInput],
         options: NSFWParams = None,
     ) -> NSFWResponse:
         path = "/validate/nsfw"
@@ -112,11 +122,11 @@ class Validate(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = blob_request(self, blob, options)
         resp = Request(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -167,22 +177,28 @@ class AsyncValidate(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[AsyncStore, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     async def nsfw(self, params: NSFWParams) -> NSFWResponse: ...
     @overload
-    async def nsfw(self, blob: bytes, options: NSFWParams = None) -> NSFWResponse: ...
+    async def nsfw(self, blob: BlobInput, options: NSFWParams = None) -> NSFWResponse: ...
 
     async def nsfw(
         self,
-        blob: Union[NSFWParams, bytes],
+        blob: Union[NSFWParams, BlobInput],
         options: NSFWParams = None,
     ) -> NSFWResponse:
         path = "/validate/nsfw"
@@ -198,11 +214,11 @@ class AsyncValidate(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = await blob_request_async(self, blob, options)
         resp = await AsyncRequest(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -2,10 +2,14 @@ from typing import Any, Dict, List, Optional, Union, cast, overload
 
 from typing_extensions import Literal, NotRequired, TypedDict
 
+from ._blobs import BlobCache, blob_request, blob_request_async
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
+from ._upload import BlobInput
 from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
+from .store import AsyncStore, Store
 
 
 class Point(TypedDict):
@@ -209,22 +213,28 @@ class Vision(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[Store, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     def vocr(self, params: VOCRParams) -> OCRResponse: ...
     @overload
-    def vocr(self, blob: bytes, options: VOCRParams = None) -> OCRResponse: ...
+    def vocr(self, blob: BlobInput, options: VOCRParams = None) -> OCRResponse: ...
 
     def vocr(
         self,
-        blob: Union[VOCRParams, bytes],
+        blob: Union[VOCRParams, BlobInput],
         options: VOCRParams = None,
     ) -> OCRResponse:
         path = "/vocr"
@@ -240,11 +250,11 @@ class Vision(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = blob_request(self, blob, options)
         resp = Request(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -254,12 +264,12 @@ class Vision(ClientConfig):
     def object_detection(self, params: ObjectDetectionParams) -> ObjectDetectionResponse: ...
     @overload
     def object_detection(
-        self, blob: bytes, options: ObjectDetectionParams = None
+        self, blob: BlobInput, options: ObjectDetectionParams = None
     ) -> ObjectDetectionResponse: ...
 
     def object_detection(
         self,
-        blob: Union[ObjectDetectionParams, bytes],
+        blob: Union[ObjectDetectionParams, BlobInput],
         options: ObjectDetectionParams = None,
     ) -> ObjectDetectionResponse:
         path = "/object_detection"
@@ -272,11 +282,11 @@ class Vision(ClientConfig):
                 verb="post",
             ).perform_with_content()
             return resp
-        files = {"file": blob}
+        params, files = blob_request(self, blob, options)
         resp = Request(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -291,22 +301,28 @@ class AsyncVision(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
+        blobs: Union[BlobCache, None] = None,
+        blob_store: Union[AsyncStore, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
+        self.blobs = blobs
+        self.blob_store = blob_store
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     @overload
     async def vocr(self, params: VOCRParams) -> OCRResponse: ...
     @overload
-    async def vocr(self, blob: bytes, options: VOCRParams = None) -> OCRResponse: ...
+    async def vocr(self, blob: BlobInput, options: VOCRParams = None) -> OCRResponse: ...
 
     async def vocr(
         self,
-        blob: Union[VOCRParams, bytes],
+        blob: Union[VOCRParams, BlobInput],
         options: VOCRParams = None,
     ) -> OCRResponse:
         path = "/vocr"
@@ -320,11 +336,11 @@ class AsyncVision(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = await blob_request_async(self, blob, options)
         resp = await AsyncRequest(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -334,12 +350,12 @@ class AsyncVision(ClientConfig):
     async def object_detection(self, params: ObjectDetectionParams) -> ObjectDetectionResponse: ...
     @overload
     async def object_detection(
-        self, blob: bytes, options: ObjectDetectionParams = None
+        self, blob: BlobInput, options: ObjectDetectionParams = None
     ) -> ObjectDetectionResponse: ...
 
     async def object_detection(
         self,
-        blob: Union[ObjectDetectionParams, bytes],
+        blob: Union[ObjectDetectionParams, BlobInput],
         options: ObjectDetectionParams = None,
     ) -> ObjectDetectionResponse:
         path = "/object_detection"
@@ -355,11 +371,11 @@ class AsyncVision(ClientConfig):
             ).perform_with_content()
             return resp
 
-        files = {"file": blob}
+        params, files = await blob_request_async(self, blob, options)
         resp = await AsyncRequest(
             config=self.config,
             path=path,
-            params=options,
+            params=params,
             files=files,
             verb="post",
         ).perform_with_content()
@@ -3,6 +3,7 @@ from typing import Any, Dict, List, Literal, Optional, Union, cast, overload
 from typing_extensions import NotRequired, TypedDict
 
 from ._config import ClientConfig
+from ._transport import AsyncTransport, Transport
 from ._types import BaseResponse
 from .async_request import AsyncRequest, AsyncRequestConfig
 from .request import Request, RequestConfig
@@ -205,12 +206,14 @@ class Web(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[Transport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = RequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     def ai_scrape(self, params: AIScrapeParams) -> AIScrapeResponse:
@@ -253,15 +256,15 @@ class Web(ClientConfig):
             return cast(HTMLToAnyURLResponse, resp)
 
     def search(self, params: SearchParams) -> SearchResponse:
-        s = Search(self.api_key, self.base_url, self.headers)
+        s = Search(self.api_key, self.base_url, self.headers, self.transport)
         return s.search(params)
 
     def search_suggestions(self, params: SearchSuggestionsParams) -> SearchSuggestionsResponse:
-        s = Search(self.api_key, self.base_url, self.headers)
+        s = Search(self.api_key, self.base_url, self.headers, self.transport)
         return s.suggestions(params)
 
     def deep_research(self, params: DeepResearchParams) -> DeepResearchResponse:
-        s = Search(self.api_key, self.base_url, self.headers)
+        s = Search(self.api_key, self.base_url, self.headers, self.transport)
         return s.deep_research(params)
 
 
@@ -276,12 +279,14 @@ class AsyncWeb(ClientConfig):
         api_key: str,
         base_url: str,
         headers: Union[Dict[str, str], None] = None,
+        transport: Union[AsyncTransport, None] = None,
     ):
-        super().__init__(api_key, base_url, headers)
+        super().__init__(api_key, base_url, headers, transport)
         self.config = AsyncRequestConfig(
             base_url=base_url,
             api_key=api_key,
             headers=headers,
+            transport=transport,
         )
 
     async def ai_scrape(self, params: AIScrapeParams) -> AIScrapeResponse:
@@ -324,15 +329,15 @@ class AsyncWeb(ClientConfig):
             return cast(HTMLToAnyURLResponse, resp)
 
     async def search(self, params: SearchParams) -> SearchResponse:
-        s = AsyncSearch(self.api_key, self.base_url, self.headers)
+        s = AsyncSearch(self.api_key, self.base_url, self.headers, self.transport)
         return await s.search(params)
 
     async def search_suggestions(
         self, params: SearchSuggestionsParams
     ) -> SearchSuggestionsResponse:
-        s = AsyncSearch(self.api_key, self.base_url, self.headers)
+        s = AsyncSearch(self.api_key, self.base_url, self.headers, self.transport)
         return await s.suggestions(params)
 
     async def deep_research(self, params: DeepResearchParams) -> DeepResearchResponse:
-        s = AsyncSearch(self.api_key, self.base_url, self.headers)
+        s = AsyncSearch(self.api_key, self.base_url, self.headers, self.transport)
         return await s.deep_research(params)
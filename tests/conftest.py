@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple, Union
+
+import pytest
+
+
+class LocalServer:
+    """HTTP server on localhost for the offline tests. It answers with the
+    replies queued with `reply`, then with `{"success": true}`, and records
+    every request it receives."""
+
+    def __init__(self) -> None:
+        self.requests: List[Dict[str, Any]] = []
+        self._replies: List[Tuple[int, Dict[str, str], Any, float]] = []
+        self._lock = threading.Lock()
+        self._httpd = _Server(("127.0.0.1", 0), _Handler)
+        # clients hanging up mid-reply is expected, e.g. the losing hedged attempt
+        self._httpd.handle_error = lambda *args: None
+        self._httpd.local = self
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def reply(
+        self,
+        status: int = 200,
+        body: Any = None,
+        headers: Union[Dict[str, str], None] = None,
+        delay: float = 0.0,
+    ) -> None:
+        """
+        Queue a reply.
+
+        Args:
+            status (int): The status code
+            body (Any): bytes, an object sent as JSON, or a list of (delay, bytes)
+                chunks sent with chunked transfer encoding
+            headers (Union[Dict[str, str], None]): Headers of the reply
+            delay (float): Seconds to wait before replying
+        """
+        with self._lock:
+            self._replies.append((status, headers or {}, body, delay))
+
+    def next_reply(self) -> Tuple[int, Dict[str, str], Any, float]:
+        with self._lock:
+            if self._replies:
+                return self._replies.pop(0)
+        return 200, {}, {"success": True}, 0.0
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # room for the connections of many concurrent calls
+    request_queue_size = 256
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def handle_any(self) -> None:
+        local: LocalServer = self.server.local
+        body = self.read_body()
+        with local._lock:
+            local.requests.append(
+                {
+                    "method": self.command,
+                    "path": self.path,
+                    "headers": dict(self.headers),
+                    "body": body,
+                    "client": self.client_address,
+                    "at": time.monotonic(),
+                }
+            )
+        status, headers, reply, delay = local.next_reply()
+        time.sleep(delay)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if isinstance(reply, list):
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for wait, chunk in reply:
+                time.sleep(wait)
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if not isinstance(reply, bytes):
+            reply = json.dumps(reply).encode()
+            if "Content-Type" not in headers:
+                self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if not size:
+                    return b"".join(chunks)
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_any
+
+
+@pytest.fixture
+def server():
+    local = LocalServer()
+    yield local
+    local.close()
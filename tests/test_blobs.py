@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jigsawstack import AsyncJigsawStack, JigsawStack
+from jigsawstack._blobs import BlobCache, blob_request
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BLOB = b"image bytes" * 100
+
+
+class _Endpoint:
+    api_key = "api-key"
+    blobs = None
+
+
+class TestBlobCache:
+    """Test upload-once references for blob inputs"""
+
+    def test_blob_is_uploaded_once(self):
+        cache = BlobCache()
+        digest, size = cache.digest("api-key", BLOB)
+        assert size == len(BLOB)
+        uploads = []
+
+        def upload() -> str:
+            uploads.append(digest)
+            return cache.store_key(digest)
+
+        keys = {cache.key_for(digest, len(BLOB), upload) for _ in range(3)}
+        assert keys == {cache.store_key(digest)}
+        assert len(uploads) == 1
+        assert cache.stats() == {"hits": 2, "uploads": 1, "bytes_saved": 2 * len(BLOB)}
+
+    def test_keys_expire(self):
+        cache = BlobCache(ttl=0.05)
+        cache.set("d", "key")
+        assert cache.get("d") == "key"
+        time.sleep(0.1)
+        assert cache.get("d") is None
+
+    def test_least_recently_used_are_evicted(self):
+        cache = BlobCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+
+    def test_digest_is_scoped_to_the_api_key(self):
+        cache = BlobCache()
+        assert cache.digest("one", BLOB) != cache.digest("two", BLOB)
+        assert cache.digest("one", bytearray(BLOB)) == cache.digest("one", BLOB)
+
+    def test_files_are_hashed_in_place(self, tmp_path):
+        path = tmp_path / "image.png"
+        path.write_bytes(BLOB)
+        cache = BlobCache()
+        assert cache.digest("one", path) == cache.digest("one", BLOB)
+        with open(path, "rb") as f:
+            f.seek(5)
+            assert cache.digest("one", f) == cache.digest("one", BLOB[5:])
+            assert f.tell() == 5
+
+    def test_concurrent_calls_share_an_upload(self):
+        cache = BlobCache()
+        uploads = []
+
+        def upload() -> str:
+            uploads.append(1)
+            time.sleep(0.1)
+            return "key"
+
+        with ThreadPoolExecutor(4) as pool:
+            keys = list(pool.map(lambda _: cache.key_for("d", 1, upload), range(4)))
+        assert keys == ["key"] * 4
+        assert len(uploads) == 1
+
+    def test_failed_upload_is_not_cached(self):
+        cache = BlobCache()
+
+        def upload() -> str:
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            cache.key_for("d", 1, upload)
+        assert cache.key_for("d", 1, lambda: "key") == "key"
+
+    def test_concurrent_tasks_share_an_upload(self):
+        cache = BlobCache()
+        uploads = []
+
+        async def upload() -> str:
+            uploads.append(1)
+            await asyncio.sleep(0.05)
+            return "key"
+
+        async def main():
+            return await asyncio.gather(*(cache.key_for_async("d", 1, upload) for _ in range(4)))
+
+        assert asyncio.run(main()) == ["key"] * 4
+        assert len(uploads) == 1
+
+    def test_cancelled_upload_is_taken_over_by_a_waiting_task(self):
+        cache = BlobCache()
+        uploads = []
+
+        async def upload() -> str:
+            uploads.append(1)
+            await asyncio.sleep(0.1)
+            return "key"
+
+        async def main():
+            leader = asyncio.ensure_future(cache.key_for_async("d", 1, upload))
+            await asyncio.sleep(0.01)
+            followers = [
+                asyncio.ensure_future(cache.key_for_async("d", 1, upload)) for _ in range(3)
+            ]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*followers)
+
+        assert asyncio.run(main()) == ["key"] * 3
+        assert len(uploads) == 2
+
+    def test_interrupted_upload_is_taken_over_by_a_waiting_thread(self):
+        cache = BlobCache()
+        uploads = []
+
+        def upload() -> str:
+            uploads.append(1)
+            time.sleep(0.1)
+            if len(uploads) == 1:
+                raise KeyboardInterrupt
+            return "key"
+
+        def leader():
+            with pytest.raises(KeyboardInterrupt):
+                cache.key_for("d", 1, upload)
+
+        with ThreadPoolExecutor(4) as pool:
+            first = pool.submit(leader)
+            time.sleep(0.02)
+            followers = [pool.submit(cache.key_for, "d", 1, upload) for _ in range(3)]
+            first.result()
+            assert [f.result() for f in followers] == ["key"] * 3
+        assert len(uploads) == 2
+
+    def test_without_a_cache_the_blob_is_sent_as_multipart(self):
+        params, files = blob_request(_Endpoint(), BLOB, {"prompt": "text"})
+        assert params == {"prompt": "text"}
+        assert files == {"file": BLOB}
+
+    def test_embedding_v2_uploads_to_the_v1_store(self, server):
+        server.reply(body={"key": "stored", "url": "", "size": len(BLOB)})
+        jigsaw = JigsawStack(api_key="api-key", base_url=server.url, blob_cache=BlobCache())
+        jigsaw.embedding_v2(BLOB, {"type": "image"})
+        jigsaw.embedding_v2(BLOB, {"type": "image"})
+        paths = [r["path"].split("?")[0] for r in server.requests]
+        assert paths == ["/v1/store/file", "/v2/embedding", "/v2/embedding"]
+        assert json.loads(server.requests[2]["body"])["file_store_key"] == "stored"
+        jigsaw.close()
+
+    def test_async_embedding_v2_uploads_to_the_v1_store(self, server):
+        server.reply(body={"key": "stored", "url": "", "size": len(BLOB)})
+
+        async def main():
+            async with AsyncJigsawStack(
+                api_key="api-key", base_url=server.url, blob_cache=BlobCache()
+            ) as jigsaw:
+                await jigsaw.embedding_v2(BLOB, {"type": "image"})
+
+        asyncio.run(main())
+        paths = [r["path"].split("?")[0] for r in server.requests]
+        assert paths == ["/v1/store/file", "/v2/embedding"]
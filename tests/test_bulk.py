@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from jigsawstack._bulk import AsyncBatch, Batch, run_bulk, run_bulk_async
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def check(key):
+    if key == "bad":
+        raise ValueError("bad key")
+    return key.encode()
+
+
+class TestBulk:
+    """Test bulk operations with bounded concurrency"""
+
+    def test_results_in_input_order_with_errors(self):
+        keys = ["a", "bad", "c"]
+        response = run_bulk(keys, str, check, concurrency=2)
+        assert [r["key"] for r in response["results"]] == keys
+        assert [r["ok"] for r in response["results"]] == [True, False, True]
+        assert response["results"][0]["result"] == b"a"
+        assert isinstance(response["results"][1]["error"], ValueError)
+        stats = response["stats"]
+        assert (stats["items"], stats["succeeded"], stats["failed"], stats["bytes"]) == (3, 2, 1, 2)
+
+    def test_concurrency_is_bounded_and_input_read_lazily(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0, "drawn": 0, "done": 0}
+
+        def items():
+            for i in range(20):
+                with lock:
+                    state["drawn"] += 1
+                    # never more than the slots in flight plus the item being submitted
+                    assert state["drawn"] <= state["done"] + 3 + 1
+                yield str(i)
+
+        def slow(key):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.01)
+            with lock:
+                state["running"] -= 1
+                state["done"] += 1
+            return key
+
+        response = run_bulk(items(), str, slow, concurrency=3)
+        assert [r["result"] for r in response["results"]] == [str(i) for i in range(20)]
+        assert state["peak"] <= 3
+
+    def test_async_results_in_input_order(self):
+        running = {"now": 0, "peak": 0}
+
+        async def fetch(key):
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+            await asyncio.sleep(0.01 if key == "a" else 0)
+            running["now"] -= 1
+            return check(key)
+
+        response = asyncio.run(run_bulk_async(["a", "bad", "c", "d"], str, fetch, concurrency=2))
+        assert [r["key"] for r in response["results"]] == ["a", "bad", "c", "d"]
+        assert [r["ok"] for r in response["results"]] == [True, False, True, True]
+        assert running["peak"] <= 2
+
+    def test_concurrency_must_be_positive(self):
+        with pytest.raises(ValueError):
+            run_bulk(["a"], str, check, concurrency=0)
+
+
+class TestBatch:
+    """Test batches of client calls iterated as they complete"""
+
+    def test_results_in_input_order_or_as_completed(self):
+        delays = [0.05, 0.0, 0.03, 0.0]
+
+        def call(i):
+            time.sleep(delays[i])
+            if i == 3:
+                raise ValueError("bad params")
+            return i * 10
+
+        ordered = list(Batch(call, range(4), concurrency=4))
+        assert [r["index"] for r in ordered] == [0, 1, 2, 3]
+        assert [r["result"] for r in ordered[:3]] == [0, 10, 20]
+        assert isinstance(ordered[3]["error"], ValueError)
+
+        completed = [r["index"] for r in Batch(call, range(4), concurrency=4, ordered=False)]
+        assert sorted(completed) == [0, 1, 2, 3]
+        assert completed[-1] == 0
+
+    def test_stats_count_progress(self):
+        batch = Batch(check, ["a", "bad", "c"], concurrency=2)
+        assert batch.stats()["submitted"] == 0
+        list(batch)
+        stats = batch.stats()
+        assert stats["submitted"] == stats["completed"] == 3
+        assert (stats["succeeded"], stats["failed"]) == (2, 1)
+        assert stats["in_flight"] == 0
+        with pytest.raises(RuntimeError):
+            list(batch)
+
+    def test_leaving_early_cancels_queued_calls(self):
+        calls = []
+
+        def call(i):
+            calls.append(i)
+            time.sleep(0.01)
+            return i
+
+        drawn = []
+
+        def items():
+            for i in range(1000):
+                drawn.append(i)
+                yield i
+
+        for r in Batch(call, items(), concurrency=2):
+            if r["index"] == 3:
+                break
+        assert len(drawn) <= 4 + 2 * 2
+        assert len(calls) < 10
+
+
+class TestAsyncBatch:
+    """Test async fan-out with results streamed as they complete"""
+
+    def test_results_as_completed_from_an_async_source(self):
+        async def call(i):
+            await asyncio.sleep(0.03 if i == 0 else 0)
+            if i == 2:
+                raise ValueError("bad params")
+            return i
+
+        async def items():
+            for i in range(4):
+                yield i
+
+        async def main():
+            return [r async for r in AsyncBatch(call, items(), concurrency=4)]
+
+        results = asyncio.run(main())
+        assert results[-1]["index"] == 0
+        assert sorted(r["index"] for r in results) == [0, 1, 2, 3]
+        assert [isinstance(r["error"], ValueError) for r in results if not r["ok"]] == [True]
+
+    def test_cancelled_item_is_its_own_failure(self):
+        async def call(i):
+            if i == 1:
+                # e.g. a timeout inside the call cancelling it
+                asyncio.current_task().cancel()
+            await asyncio.sleep(0.01)
+            return i
+
+        async def main():
+            batch = AsyncBatch(call, range(4), concurrency=4, ordered=True)
+            return [r async for r in batch], batch.stats()
+
+        results, stats = asyncio.run(main())
+        assert [r["ok"] for r in results] == [True, False, True, True]
+        assert isinstance(results[1]["error"], asyncio.CancelledError)
+        assert (stats["succeeded"], stats["failed"], stats["in_flight"]) == (3, 1, 0)
+
+    def test_slow_consumer_holds_back_calls(self):
+        started = []
+
+        async def call(i):
+            started.append(i)
+            return i
+
+        async def main():
+            async with AsyncBatch(call, range(1000), concurrency=3) as batch:
+                async for _ in batch:
+                    await asyncio.sleep(0.05)
+                    return batch.stats()
+
+        stats = asyncio.run(main())
+        assert len(started) <= 3
+        assert stats["submitted"] <= 3
+
+    def test_cancelling_the_consumer_cancels_calls(self):
+        cancelled = []
+
+        async def call(i):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(i)
+                raise
+
+        async def main():
+            async def consume():
+                async for _ in AsyncBatch(call, range(100), concurrency=5):
+                    pass
+
+            task = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert sorted(cancelled) == [0, 1, 2, 3, 4]
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from jigsawstack import Bulkhead, BulkheadFullError, JigsawStack
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestBulkhead:
+    """Test per-service bulkheads"""
+
+    def test_full_queue_rejects(self):
+        bulkhead = Bulkhead(1, max_queue=0, name="web")
+        bulkhead.acquire()
+        with pytest.raises(BulkheadFullError):
+            bulkhead.acquire()
+        assert bulkhead.stats()["rejected"] == 1
+
+    def test_release_hands_slot_to_waiting_thread(self):
+        bulkhead = Bulkhead(1)
+        bulkhead.acquire()
+        thread = threading.Thread(target=bulkhead.acquire)
+        thread.start()
+        bulkhead.release()
+        thread.join(timeout=1)
+        assert not thread.is_alive()
+        assert bulkhead.stats()["in_flight"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_wait_times_out(self):
+        bulkhead = Bulkhead(1, queue_timeout=0.05)
+        await bulkhead.acquire_async()
+        with pytest.raises(BulkheadFullError):
+            await bulkhead.acquire_async()
+        stats = bulkhead.stats()
+        assert stats["waiting"] == 0
+        assert stats["in_flight"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        bulkhead = Bulkhead(1)
+        await bulkhead.acquire_async()
+        waiter = asyncio.ensure_future(bulkhead.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        bulkhead.release()
+        assert bulkhead.stats() == {
+            "max_concurrent": 1,
+            "in_flight": 0,
+            "waiting": 0,
+            "rejected": 0,
+        }
+
+    def test_client_gives_each_service_its_bulkhead(self):
+        web = Bulkhead(2)
+        client = JigsawStack(api_key="test", bulkheads={"web": web})
+        assert client.web.config["transport"].bulkhead is web
+        assert client.validate.config["transport"].bulkhead is None
+        assert web.name == "web"
+        with pytest.raises(ValueError):
+            JigsawStack(api_key="test", bulkheads={"webs": Bulkhead(1)})
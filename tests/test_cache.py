@@ -0,0 +1,134 @@
+import json
+import logging
+import sqlite3
+import time
+
+import pytest
+
+from jigsawstack import ResponseCache, SQLiteCacheBackend
+from jigsawstack._cache import CacheBackend, CachedResponse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+URL = "https://api.jigsawstack.com/v1/ai/translate"
+
+
+def _kwargs(body, **headers):
+    return {"json": body, "headers": {"x-api-key": "key", **headers}}
+
+
+class TestResponseCache:
+    """Test the in-memory response cache"""
+
+    def test_key_ignores_param_order(self):
+        cache = ResponseCache()
+        a = cache.key_for(
+            "post", URL, "/ai/translate", _kwargs({"text": "hi", "target_language": "fr"})
+        )
+        b = cache.key_for(
+            "post", URL, "/ai/translate", _kwargs({"target_language": "fr", "text": "hi"})
+        )
+        assert a is not None
+        assert a == b
+        assert a != cache.key_for(
+            "post", URL, "/ai/translate", _kwargs({"text": "hi", "target_language": "de"})
+        )
+
+    def test_only_enabled_endpoints_are_cached(self):
+        cache = ResponseCache(endpoints=["/ai/translate"])
+        assert cache.key_for("post", URL, "/ai/summary", _kwargs({"text": "hi"})) is None
+        assert cache.key_for("post", URL, "/ai/translate", {"files": {"file": b""}}) is None
+        cache.disable("/ai/translate")
+        assert cache.key_for("post", URL, "/ai/translate", _kwargs({"text": "hi"})) is None
+
+    def test_skip_cache_header_bypasses(self):
+        cache = ResponseCache()
+        kwargs = _kwargs({"text": "hi"}, **{"x-jigsaw-skip-cache": "true"})
+        assert cache.key_for("post", URL, "/ai/translate", kwargs) is None
+        assert cache.stats()["bypassed"] == 1
+
+    def test_lru_eviction_and_ttl(self):
+        cache = ResponseCache(max_entries=2, ttl=0.05)
+        for key in ["a", "b"]:
+            cache.set(key, CachedResponse(200, {}, key.encode()))
+        assert cache.get("a").body == b"a"
+        cache.set("c", CachedResponse(200, {}, b"c"))
+        # "b" was the least recently used
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+        time.sleep(0.06)
+        assert cache.get("c") is None
+        stats = cache.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["evictions"] == 1
+
+
+class TestSQLiteCacheBackend:
+    """Test the persistent SQLite cache backend"""
+
+    def test_round_trips_embeddings_through_packed_vectors(self, tmp_path):
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"))
+        body = json.dumps(
+            {"success": True, "embeddings": [[0.1, 0.2], [0.3, 0.4]], "chunks": ["a", "b"]}
+        )
+        backend.set(
+            "k", CachedResponse(200, {"content-type": "application/json"}, body.encode()), ttl=None
+        )
+
+        # a second backend on the same file sees the entry, as another process would
+        cached = SQLiteCacheBackend(str(tmp_path / "cache.db")).get("k")
+        assert cached.status == 200
+        assert cached.headers == {"content-type": "application/json"}
+        assert json.loads(cached.body) == json.loads(body)
+
+    def test_ttl_and_size_eviction(self, tmp_path):
+        backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), max_bytes=300)
+        backend.set("expired", CachedResponse(200, {}, b"x"), ttl=-1)
+        assert backend.get("expired") is None
+
+        for key in ["a", "b", "c"]:
+            backend.set(key, CachedResponse(200, {}, b"x" * 100), ttl=None)
+        assert backend.get("a") is None
+        assert backend.get("c") is not None
+        assert backend.evictions >= 1
+
+    def test_stored_bytes_are_counted_without_a_scan(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        backend = SQLiteCacheBackend(path, max_bytes=None)
+        backend.set("a", CachedResponse(200, {}, b"x" * 100), ttl=None)
+        backend.set("b", CachedResponse(200, {}, b"x" * 50), ttl=None)
+        backend.set("a", CachedResponse(200, {}, b"x" * 10), ttl=None)
+        with sqlite3.connect(path) as conn:
+            total = conn.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+        assert backend.stored_bytes() == total
+        # a second backend on the same file shares the count
+        assert SQLiteCacheBackend(path).stored_bytes() == total
+        backend.clear()
+        assert backend.stored_bytes() == 0
+
+    def test_recent_hits_do_not_write(self, tmp_path):
+        path = str(tmp_path / "cache.db")
+        backend = SQLiteCacheBackend(path)
+        backend.set("k", CachedResponse(200, {}, b"x"), ttl=None)
+        query = "SELECT accessed_at FROM responses WHERE key = 'k'"
+        with sqlite3.connect(path) as conn:
+            accessed_at = conn.execute(query).fetchone()[0]
+        for _ in range(3):
+            assert backend.get("k") is not None
+        with sqlite3.connect(path) as conn:
+            assert conn.execute(query).fetchone()[0] == accessed_at
+
+
+class TestCacheBackend:
+    """Test the cache backend interface"""
+
+    def test_incomplete_backend_fails_when_constructed(self):
+        class GetOnly(CacheBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnly()
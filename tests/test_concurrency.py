@@ -0,0 +1,103 @@
+import asyncio
+import logging
+
+import pytest
+
+from jigsawstack import AdaptiveConcurrencyLimiter, AsyncJigsawStack
+from jigsawstack.helpers import endpoint_of
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test AIMD per-endpoint concurrency limiting"""
+
+    def test_endpoint_of_drops_query_and_ids(self):
+        assert endpoint_of("/ai/translate?x=1") == "/ai/translate"
+        assert endpoint_of("/store/file/read/my-key") == "/store/file/read/:key"
+        assert endpoint_of("/prompt_engine/abc123") == "/prompt_engine/:id"
+        assert endpoint_of("/prompt_engine/run") == "/prompt_engine/run"
+
+    @pytest.mark.asyncio
+    async def test_healthy_calls_raise_limit_and_overload_halves_it(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4)
+        for _ in range(8):
+            await limiter.acquire("/vocr")
+            limiter.release("/vocr", latency=0.1)
+        assert limiter.limit("/vocr") == 5
+
+        await limiter.acquire("/vocr")
+        limiter.release("/vocr", latency=0.1, overloaded=True)
+        assert limiter.limit("/vocr") == 2
+        # other endpoints keep their own limit
+        assert limiter.limit("/ai/translate") == 4
+
+    @pytest.mark.asyncio
+    async def test_limit_recovers_after_a_lasting_latency_shift(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=16)
+        for _ in range(20):
+            await limiter.acquire("/vocr")
+            limiter.release("/vocr", latency=0.1)
+        grown = limiter.limit("/vocr")
+
+        await limiter.acquire("/vocr")
+        limiter.release("/vocr", latency=0.25)
+        assert limiter.limit("/vocr") < grown
+
+        # the slower latency becomes the baseline and the limit grows again
+        for _ in range(50):
+            await limiter.acquire("/vocr")
+            limiter.release("/vocr", latency=0.25)
+        assert limiter.stats()["/vocr"]["latency"] > 0.125
+        assert limiter.limit("/vocr") >= grown
+
+    @pytest.mark.asyncio
+    async def test_calls_over_the_limit_wait_for_a_slot(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire("/embedding")
+        waiter = asyncio.ensure_future(limiter.acquire("/embedding"))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        assert limiter.stats()["/embedding"]["waiting"] == 1
+
+        limiter.release("/embedding", latency=0.1)
+        await waiter
+        assert limiter.stats()["/embedding"]["in_flight"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        await limiter.acquire("/embedding")
+        waiter = asyncio.ensure_future(limiter.acquire("/embedding"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        limiter.release("/embedding", latency=0.1)
+        stats = limiter.stats()["/embedding"]
+        assert stats["in_flight"] == 0
+        assert stats["waiting"] == 0
+
+    def test_limited_client_is_reused_across_event_loops(self, server):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+        jigsaw = AsyncJigsawStack(api_key="test", base_url=server.url, concurrency_limiter=limiter)
+
+        async def call():
+            return await asyncio.wait_for(jigsaw.sentiment({"text": "hi"}), 5)
+
+        assert asyncio.run(call())["success"]
+
+        # a loop closed with a call holding the slot and another one waiting for it
+        server.reply(body={"success": True}, delay=0.5)
+        loop = asyncio.new_event_loop()
+        pending = [loop.create_task(call()), loop.create_task(call())]
+        loop.run_until_complete(asyncio.sleep(0.1))
+        assert not any(task.done() for task in pending)
+        assert limiter.stats()["/ai/sentiment"]["waiting"] == 1
+        loop.close()
+
+        assert asyncio.run(call())["success"]
+        assert asyncio.run(call())["success"]
+        assert limiter.stats()["/ai/sentiment"]["in_flight"] == 0
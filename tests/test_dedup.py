@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import logging
+
+import pytest
+
+from jigsawstack import AsyncJigsawStack, JigsawStack
+from jigsawstack._dedup import (
+    MemoryUploadManifest,
+    SQLiteUploadManifest,
+    UploadDedup,
+    UploadManifest,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA = b"the same bytes" * 1000
+DIGEST = hashlib.sha256(DATA).hexdigest()
+
+
+class TestUploadDedup:
+    """Test content addressing of uploads"""
+
+    def test_sources_hash_alike(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(DATA)
+        dedup = UploadDedup()
+        for source in (DATA, str(path), iter([DATA[:10], DATA[10:]])):
+            with dedup.hashed(source) as (digest, size, body):
+                assert digest == DIGEST
+                assert size == len(DATA)
+                # the body is left ready to upload from the start
+                assert (body if isinstance(body, bytes) else b"".join(body)) == DATA
+
+    def test_lookup_counts_hits(self):
+        dedup = UploadDedup()
+        key = dedup.digest_key("api-key", DIGEST)
+        assert dedup.lookup(key, len(DATA)) is None
+        dedup.record(key, {"key": "a.bin"})
+        assert dedup.lookup(key, len(DATA)) == {"key": "a.bin"}
+        assert dedup.stats() == {"hits": 1, "misses": 1, "bytes_saved": len(DATA)}
+
+    def test_digest_key_is_scoped_to_the_api_key(self):
+        dedup = UploadDedup()
+        assert dedup.digest_key("one", DIGEST) != dedup.digest_key("two", DIGEST)
+        assert not dedup.applies({"temp_public_url": True})
+
+    def test_manifests_forget_deleted_keys(self, tmp_path):
+        for manifest in (MemoryUploadManifest(), SQLiteUploadManifest(str(tmp_path / "m.db"))):
+            manifest.set("d1", {"key": "a.bin"})
+            manifest.set("d2", {"key": "b.bin"})
+            manifest.discard_key("a.bin")
+            assert manifest.get("d1") is None
+            assert manifest.get("d2") == {"key": "b.bin"}
+
+    def test_sqlite_manifest_is_shared(self, tmp_path):
+        path = str(tmp_path / "m.db")
+        SQLiteUploadManifest(path).set("d1", {"key": "a.bin", "size": 3})
+        assert SQLiteUploadManifest(path).get("d1") == {"key": "a.bin", "size": 3}
+
+    def test_incomplete_manifest_fails_when_constructed(self):
+        class GetOnly(UploadManifest):
+            def get(self, digest):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnly()
+
+
+def _stored(key: str) -> dict:
+    return {"key": key, "url": f"https://store/{key}", "size": len(DATA)}
+
+
+class TestStoreUploadDedup:
+    """Test deduplicated uploads through the store against a local server"""
+
+    def test_same_content_is_uploaded_once(self, server):
+        server.reply(body=_stored("a"))
+        jigsaw = JigsawStack(api_key="test", base_url=server.url, upload_dedup=UploadDedup())
+        assert jigsaw.store.upload(DATA, {"key": "a"})["key"] == "a"
+        assert jigsaw.store.upload(DATA, {"key": "b"})["key"] == "a"
+        assert len(server.requests) == 1
+        jigsaw.close()
+
+    def test_overwritten_key_is_not_reused(self, server):
+        server.reply(body=_stored("a"))
+        server.reply(body=_stored("a"))
+        server.reply(body=_stored("b"))
+        jigsaw = JigsawStack(api_key="test", base_url=server.url, upload_dedup=UploadDedup())
+        jigsaw.store.upload(DATA, {"key": "a"})
+        jigsaw.store.upload(b"other bytes", {"key": "a", "overwrite": True})
+        # "a" holds the other bytes now, the content is uploaded again
+        assert jigsaw.store.upload(DATA, {"key": "b"})["key"] == "b"
+        assert len(server.requests) == 3
+        jigsaw.close()
+
+    def test_async_overwritten_key_is_not_reused(self, server):
+        server.reply(body=_stored("a"))
+        server.reply(body=_stored("a"))
+        server.reply(body=_stored("b"))
+
+        async def main():
+            jigsaw = AsyncJigsawStack(
+                api_key="test", base_url=server.url, upload_dedup=UploadDedup()
+            )
+            await jigsaw.store.upload(DATA, {"key": "a"})
+            assert (await jigsaw.store.upload(DATA, {"key": "c"}))["key"] == "a"
+            await jigsaw.store.upload(b"other bytes", {"key": "a", "overwrite": True})
+            return await jigsaw.store.upload(DATA, {"key": "b"})
+
+        assert asyncio.run(main())["key"] == "b"
+        assert len(server.requests) == 3
@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+
+from jigsawstack import IncompleteDownloadError
+from jigsawstack._download import PositionedFile, _Window, part_ranges, range_header
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestDownload:
+    """Test ranged reads of stored files"""
+
+    def test_range_header(self):
+        assert range_header() is None
+        assert range_header(10) == "bytes=10-"
+        assert range_header(10, 19) == "bytes=10-19"
+        assert range_header(-5) == "bytes=-5"
+        with pytest.raises(ValueError):
+            range_header(10, 5)
+        with pytest.raises(ValueError):
+            range_header(-5, 10)
+
+    def test_partial_content(self):
+        headers = {"content-length": "10", "content-range": "bytes 10-19/100"}
+        window = _Window(206, headers, 10, 19)
+        assert (window.start, window.size, window.total_size) == (10, 10, 100)
+        assert window.cut(b"0123456789") == b"0123456789"
+
+    def test_range_ignored_by_server(self):
+        window = _Window(200, {"content-length": "10"}, 2, 5)
+        assert (window.start, window.size, window.total_size) == (2, 4, 10)
+        assert window.cut(b"012") == b"2"
+        assert window.cut(b"3456789") == b"345"
+        assert window.done
+
+    def test_suffix_range_ignored_by_server(self):
+        window = _Window(200, {"content-length": "10"}, -3, None)
+        assert window.cut(b"0123456789") == b"789"
+
+    def test_compressed_body_has_no_known_size(self):
+        window = _Window(200, {"content-length": "10", "content-encoding": "gzip"}, 0, None)
+        assert window.size is None
+
+    def test_part_ranges(self):
+        assert part_ranges(0, 9, 4) == [(0, 3), (4, 7), (8, 9)]
+        assert part_ranges(4, 7, 4) == [(4, 7)]
+        assert part_ranges(8, 7, 4) == []
+        with pytest.raises(ValueError):
+            part_ranges(0, 9, 0)
+
+    def test_positioned_writes_out_of_order(self, tmp_path):
+        path = tmp_path / "out.bin"
+        target = PositionedFile(path, 10)
+        assert path.stat().st_size == 10
+        target.write_at(b"6789", 6)
+        target.write_at(b"012345", 0)
+        target.verify(10)
+        target.close()
+        assert path.read_bytes() == b"0123456789"
+
+    def test_positioned_file_missing_bytes(self, tmp_path):
+        path = tmp_path / "out.bin"
+        target = PositionedFile(path, 10)
+        target.write_at(b"0123", 0)
+        with pytest.raises(IncompleteDownloadError):
+            target.verify(4)
+        target.discard()
+        assert not path.exists()
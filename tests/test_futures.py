@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from jigsawstack._config import ClientConfig
+from jigsawstack._futures import ClientExecutor, FuturesNamespace
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Echo(ClientConfig):
+    def __init__(self):
+        super().__init__(api_key="test", base_url="http://localhost", headers={})
+        self.release = threading.Event()
+
+    def call(self, value):
+        return value
+
+    def wait(self, value):
+        self.release.wait(5)
+        return value
+
+    def fail(self):
+        raise ValueError("failed")
+
+
+class Client:
+    def __init__(self):
+        self.echo = Echo()
+
+    def close(self):
+        pass
+
+
+class TestFutures:
+    """Test the futures API of the sync client"""
+
+    def test_calls_run_in_the_background(self):
+        client = Client()
+        executor = ClientExecutor(max_workers=2)
+        futures = FuturesNamespace(client, executor)
+        assert futures.echo.call(1).result(timeout=5) == 1
+        assert isinstance(futures.echo.fail().exception(timeout=5), ValueError)
+        assert futures.echo.call.__name__ == "call"
+        assert "echo" in dir(futures) and "close" not in dir(futures)
+        with pytest.raises(AttributeError):
+            futures.close()
+        executor.shutdown()
+
+    def test_queued_calls_can_be_cancelled(self):
+        client = Client()
+        executor = ClientExecutor(max_workers=1)
+        futures = FuturesNamespace(client, executor)
+        running = futures.echo.wait(1)
+        queued = [futures.echo.call(i) for i in range(3)]
+        time.sleep(0.05)
+        assert executor.stats()["running"] == 1 and executor.stats()["queued"] == 3
+        assert all(f.cancel() for f in queued)
+        assert executor.stats()["queued"] == 0
+        client.echo.release.set()
+        assert running.result(timeout=5) == 1
+        executor.shutdown()
+        assert executor.stats()["running"] == 0
+
+    def test_calls_expire_in_the_queue(self):
+        client = Client()
+        executor = ClientExecutor(max_workers=1, queue_timeout=0.05)
+        futures = FuturesNamespace(client, executor)
+        running = futures.echo.wait(1)
+        queued = futures.echo.call(2)
+        time.sleep(0.1)
+        client.echo.release.set()
+        assert running.result(timeout=5) == 1
+        assert isinstance(queued.exception(timeout=5), FutureTimeoutError)
+        assert executor.stats()["expired"] == 1
+        executor.shutdown()
+
+    def test_shutdown_cancels_pending_calls(self):
+        client = Client()
+        executor = ClientExecutor(max_workers=1)
+        futures = FuturesNamespace(client, executor)
+        running = futures.echo.wait(1)
+        queued = futures.echo.call(2)
+        threading.Timer(0.05, client.echo.release.set).start()
+        executor.shutdown(wait=True, cancel_pending=True)
+        assert running.result() == 1
+        assert queued.cancelled()
+        # the executor starts new threads when used again
+        assert futures.echo.call(3).result(timeout=5) == 3
+        executor.shutdown()
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jigsawstack import AsyncTransport, HedgePolicy, Transport, _transport
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestHedgePolicy:
+    """Test hedged request policy"""
+
+    def test_only_gets_and_listed_paths_are_hedged(self):
+        hedge = HedgePolicy(idempotent_paths=["/web/search"])
+        assert hedge.applies("get", "/store/file/read/key")
+        assert hedge.applies("post", "/web/search?x=1")
+        assert not hedge.applies("post", "/ai/scrape")
+
+    def test_delay_follows_latency_percentile(self):
+        hedge = HedgePolicy(percentile=90, initial_delay=2.0, min_samples=10)
+        assert hedge.delay("/vocr") == 2.0
+        for i in range(1, 11):
+            hedge.record("/vocr", i / 10)
+        assert hedge.delay("/vocr") == 1.0
+        assert hedge.delay("/object_detection") == 2.0
+
+    def test_hedge_rate_is_capped(self):
+        hedge = HedgePolicy(max_hedge_ratio=0.1)
+        for _ in range(20):
+            hedge.delay("/vocr")
+        allowed = sum(hedge.try_hedge() for _ in range(10))
+        assert allowed == 2
+        assert hedge.stats()["hedged"] == 2
+
+
+def _hedge():
+    # hedges after 50ms, every call may be hedged
+    return HedgePolicy(initial_delay=0.05, max_hedge_ratio=1.0)
+
+
+def _url(server):
+    return server.url + "/v1/store/file/read/key"
+
+
+class TestHedgedSend:
+    """Test hedged calls of the transports against a local server"""
+
+    def test_primary_wins_and_the_hedge_is_closed(self, server, monkeypatch):
+        closed = []
+        close = _transport._close_response
+        monkeypatch.setattr(_transport, "_close_response", lambda f: closed.append(close(f)))
+        server.reply(body={"attempt": 1}, delay=0.15)
+        server.reply(body={"attempt": 2}, delay=0.5)
+        hedge = _hedge()
+        with Transport(hedge=hedge) as transport:
+            resp = transport.request("get", _url(server), "/store/file/read/key")
+            assert resp.json() == {"attempt": 1}
+            time.sleep(0.6)
+        assert hedge.stats() == {"requests": 1, "hedged": 1, "hedge_wins": 0}
+        assert len(closed) == 1
+
+    def test_hedge_wins(self, server):
+        server.reply(body={"attempt": 1}, delay=1.0)
+        server.reply(body={"attempt": 2})
+        hedge = _hedge()
+        with Transport(hedge=hedge) as transport:
+            started = time.monotonic()
+            resp = transport.request("get", _url(server), "/store/file/read/key")
+            assert resp.json() == {"attempt": 2}
+            assert time.monotonic() - started < 0.5
+        assert hedge.stats()["hedge_wins"] == 1
+
+    def test_hedged_calls_are_not_queued_behind_a_small_pool(self, server):
+        for _ in range(20):
+            server.reply(delay=0.2)
+        hedge = HedgePolicy(initial_delay=5)
+        with Transport(hedge=hedge, pool_maxsize=20) as transport:
+            started = time.monotonic()
+            with ThreadPoolExecutor(20) as callers:
+                calls = [
+                    callers.submit(transport.request, "get", _url(server), "/store/file/read/key")
+                    for _ in range(20)
+                ]
+                assert all(c.result().status_code == 200 for c in calls)
+            assert time.monotonic() - started < 0.6
+
+    def test_async_primary_wins_and_the_hedge_is_cancelled(self, server, monkeypatch):
+        losers = []
+        release = _transport._release_response
+        monkeypatch.setattr(
+            _transport, "_release_response", lambda t: losers.append(t) or release(t)
+        )
+        server.reply(body={"attempt": 1}, delay=0.15)
+        server.reply(body={"attempt": 2}, delay=1.0)
+        hedge = _hedge()
+
+        async def main():
+            async with AsyncTransport(hedge=hedge) as transport:
+                resp = await transport.request("get", _url(server), "/store/file/read/key")
+                body = await resp.json()
+                await asyncio.sleep(0)
+                return body
+
+        started = time.monotonic()
+        assert asyncio.run(main()) == {"attempt": 1}
+        assert time.monotonic() - started < 0.5
+        assert hedge.stats() == {"requests": 1, "hedged": 1, "hedge_wins": 0}
+        assert len(losers) == 1 and losers[0].cancelled()
+
+    def test_async_hedge_wins_and_the_primary_is_cancelled(self, server, monkeypatch):
+        losers = []
+        release = _transport._release_response
+        monkeypatch.setattr(
+            _transport, "_release_response", lambda t: losers.append(t) or release(t)
+        )
+        server.reply(body={"attempt": 1}, delay=1.0)
+        server.reply(body={"attempt": 2})
+        hedge = _hedge()
+
+        async def main():
+            async with AsyncTransport(hedge=hedge) as transport:
+                resp = await transport.request("get", _url(server), "/store/file/read/key")
+                body = await resp.json()
+                await asyncio.sleep(0)
+                return body
+
+        started = time.monotonic()
+        assert asyncio.run(main()) == {"attempt": 2}
+        assert time.monotonic() - started < 0.5
+        assert hedge.stats()["hedge_wins"] == 1
+        assert len(losers) == 1 and losers[0].cancelled()
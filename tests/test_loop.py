@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from jigsawstack import JigsawStack
+from jigsawstack._config import ClientConfig
+from jigsawstack._loop import EventLoopThread, LoopNamespace
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AsyncEcho(ClientConfig):
+    def __init__(self):
+        super().__init__(api_key="test", base_url="http://localhost", headers={})
+        self.cancelled = threading.Event()
+
+    async def call(self, value):
+        await asyncio.sleep(0)
+        return value, threading.current_thread().name
+
+    async def hang(self):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+    async def fail(self):
+        raise ValueError("failed")
+
+
+class Client:
+    def __init__(self):
+        self.echo = AsyncEcho()
+
+
+class TestEventLoopThread:
+    """Test the sync client running on a background event loop"""
+
+    def test_calls_block_on_the_loop_thread(self):
+        loop = EventLoopThread()
+        echo = LoopNamespace(Client(), loop).echo
+        assert echo.call(1) == (1, "jigsawstack-event-loop")
+        with pytest.raises(ValueError):
+            echo.fail()
+        with pytest.raises(AttributeError):
+            LoopNamespace(Client(), loop).close()
+        loop.close()
+
+    def test_calls_in_flight_share_one_thread(self):
+        loop = EventLoopThread()
+        client = Client()
+        futures = [loop.submit(client.echo.call, i) for i in range(100)]
+        assert [f.result(timeout=5)[0] for f in futures] == list(range(100))
+        assert {f.result()[1] for f in futures} == {"jigsawstack-event-loop"}
+        loop.close()
+
+    def test_running_calls_can_be_cancelled(self):
+        loop = EventLoopThread()
+        client = Client()
+        future = loop.submit(client.echo.hang)
+        loop.submit(client.echo.call, 1).result(timeout=5)
+        assert future.cancel()
+        assert client.echo.cancelled.wait(5)
+        loop.close()
+
+    def test_close_cancels_calls_and_restarts_on_use(self):
+        loop = EventLoopThread()
+        client = Client()
+        future = loop.submit(client.echo.hang)
+        loop.submit(client.echo.call, 1).result(timeout=5)
+        loop.close()
+        assert future.cancelled() and client.echo.cancelled.is_set()
+        assert loop.run(client.echo.call, 2)[0] == 2
+        loop.close()
+
+    def test_calls_from_the_loop_thread_are_refused(self):
+        loop = EventLoopThread()
+        client = Client()
+
+        async def nested():
+            return loop.run(client.echo.call, 1)
+
+        with pytest.raises(RuntimeError):
+            loop.run(nested)
+        loop.close()
+
+    def test_streamed_responses_are_read_through_the_loop(self, server):
+        server.reply(
+            body=[(0, b'{"a": 1}\n'), (0.05, b'{"b": 2}\n')],
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        jigsaw = JigsawStack(api_key="test", base_url=server.url, event_loop=True)
+        params = {"prompt": "p", "inputs": [], "return_prompt": "r", "stream": True}
+        with jigsaw.prompt_engine.run_prompt_direct(params) as stream:
+            assert list(stream) == [{"a": 1}, {"b": 2}]
+            assert stream.time_to_first_byte is not None
+        jigsaw.close()
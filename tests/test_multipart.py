@@ -0,0 +1,140 @@
+import asyncio
+import logging
+
+import pytest
+
+from jigsawstack import JigsawStackError
+from jigsawstack._multipart import (
+    AsyncMultipartProtocol,
+    MultipartProtocol,
+    UploadJournal,
+    part_count,
+    upload_parts,
+    upload_parts_async,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FakeServer(MultipartProtocol):
+    def __init__(self, fail_part=None):
+        self.fail_part = fail_part
+        self.uploads = {}
+        self.sent = []
+
+    def create(self, size, part_size):
+        upload_id = f"u{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return upload_id
+
+    def put_part(self, upload_id, number, body):
+        if number == self.fail_part:
+            raise JigsawStackError(code=500, message="boom", suggested_action="")
+        if upload_id not in self.uploads:
+            raise JigsawStackError(code=404, message="Upload not found", suggested_action="")
+        self.sent.append(number)
+        self.uploads[upload_id][number] = body.read()
+        return f"etag-{number}"
+
+    def complete(self, upload_id, parts):
+        assert [p["etag"] for p in parts] == [f"etag-{p['part_number']}" for p in parts]
+        return b"".join(self.uploads[upload_id][p["part_number"]] for p in parts)
+
+
+class TestMultipartUpload:
+    """Test resumable uploads in parts"""
+
+    def upload(self, server, path, journal, concurrency=2):
+        return upload_parts(path, "key", journal, server, part_size=4, concurrency=concurrency)
+
+    def test_part_count(self):
+        assert part_count(0, 4) == 1
+        assert part_count(8, 4) == 2
+        assert part_count(9, 4) == 3
+
+    def test_uploads_every_part_and_forgets_the_journal(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+        journal = UploadJournal(tmp_path / "file.jsupload")
+        server = FakeServer()
+        assert self.upload(server, path, journal) == b"0123456789"
+        assert sorted(server.sent) == [1, 2, 3]
+        assert journal.load() is None
+
+    def test_resumes_from_the_journal(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+        journal = UploadJournal(tmp_path / "file.jsupload")
+        server = FakeServer(fail_part=2)
+        with pytest.raises(JigsawStackError):
+            self.upload(server, path, journal, concurrency=1)
+        assert journal.load()["parts"] == {"1": "etag-1"}
+
+        server.fail_part = None
+        server.sent.clear()
+        assert self.upload(server, path, journal) == b"0123456789"
+        assert sorted(server.sent) == [2, 3]
+        assert len(server.uploads) == 1
+
+    def test_changed_file_starts_over(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+        journal = UploadJournal(tmp_path / "file.jsupload")
+        server = FakeServer(fail_part=2)
+        with pytest.raises(JigsawStackError):
+            self.upload(server, path, journal, concurrency=1)
+
+        path.write_bytes(b"abcdefghijkl")
+        server.fail_part = None
+        server.sent.clear()
+        assert self.upload(server, path, journal) == b"abcdefghijkl"
+        assert sorted(server.sent) == [1, 2, 3]
+
+    def test_expired_upload_starts_over(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+        journal = UploadJournal(tmp_path / "file.jsupload")
+        server = FakeServer(fail_part=2)
+        with pytest.raises(JigsawStackError):
+            self.upload(server, path, journal, concurrency=1)
+
+        server.uploads.clear()
+        server.fail_part = None
+        assert self.upload(server, path, journal) == b"0123456789"
+
+    def test_async_upload_resumes_from_the_journal(self, tmp_path):
+        class AsyncFakeServer(AsyncMultipartProtocol):
+            def __init__(self, server):
+                self.server = server
+
+            async def create(self, size, part_size):
+                return self.server.create(size, part_size)
+
+            async def put_part(self, upload_id, number, body):
+                return self.server.put_part(upload_id, number, body)
+
+            async def complete(self, upload_id, parts):
+                return self.server.complete(upload_id, parts)
+
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+        journal = UploadJournal(tmp_path / "file.jsupload")
+        server = FakeServer(fail_part=3)
+        protocol = AsyncFakeServer(server)
+        with pytest.raises(JigsawStackError):
+            asyncio.run(upload_parts_async(path, "key", journal, protocol, 4, 1))
+        assert journal.load()["parts"] == {"1": "etag-1", "2": "etag-2"}
+
+        server.fail_part = None
+        server.sent.clear()
+        assert asyncio.run(upload_parts_async(path, "key", journal, protocol, 4)) == b"0123456789"
+        assert server.sent == [3]
+
+    def test_incomplete_protocol_fails_when_constructed(self):
+        class CreateOnly(MultipartProtocol):
+            def create(self, size, part_size):
+                return "u"
+
+        with pytest.raises(TypeError):
+            CreateOnly()
@@ -0,0 +1,44 @@
+import logging
+
+import pytest
+
+from jigsawstack import RateLimiter
+from jigsawstack._rate_limit import TokenBucket
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestRateLimiter:
+    """Test client-side token bucket rate limiting"""
+
+    def test_bucket_allows_burst_then_spaces_calls(self):
+        bucket = TokenBucket(rate=10, burst=3)
+        waits = [bucket.reserve() for _ in range(5)]
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == pytest.approx(0.1, abs=0.01)
+        assert waits[4] == pytest.approx(0.2, abs=0.01)
+
+    def test_longest_path_prefix_wins(self):
+        limiter = RateLimiter(per_path={"/ai": 1000, "/ai/translate": (1, 1)})
+        assert limiter.acquire("/ai/translate?x=1") == 0
+        assert limiter.acquire("/ai/sentiment") == 0
+        assert limiter.acquire("/ai/sentiment") == 0
+        # the second translate call has to wait for the 1 req/s bucket
+        assert limiter.acquire("/ai/translate") == pytest.approx(1.0, abs=0.05)
+
+    def test_buckets_are_per_api_key(self):
+        limiter = RateLimiter(rate=(1, 1))
+        assert limiter.acquire("/vocr", api_key="a") == 0
+        assert limiter.acquire("/vocr", api_key="b") == 0
+
+    @pytest.mark.asyncio
+    async def test_async_acquire_records_metrics(self):
+        limiter = RateLimiter(rate=(100, 1))
+        for _ in range(3):
+            await limiter.acquire_async("/embedding")
+        stats = limiter.stats()
+        assert stats["requests"] == 3
+        assert stats["delayed"] == 2
+        assert stats["queue_depth"] == 0
+        assert stats["max_wait"] > 0
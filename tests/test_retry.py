@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from jigsawstack import (
+    AsyncTransport,
+    RateLimiter,
+    RetryBudget,
+    RetryPolicy,
+    Timeout,
+    Transport,
+)
+from jigsawstack._retry import parse_retry_after
+from jigsawstack._upload import UploadBody, UploadPayload
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TEST_CASES_STATUS = [
+    {
+        "name": "get_500_retried",
+        "verb": "get",
+        "path": "/prompt_engine/1",
+        "status": 500,
+        "retry": True,
+    },
+    {
+        "name": "post_500_not_retried",
+        "verb": "post",
+        "path": "/ai/sentiment",
+        "status": 500,
+        "retry": False,
+    },
+    {
+        "name": "post_429_retried",
+        "verb": "post",
+        "path": "/ai/sentiment",
+        "status": 429,
+        "retry": True,
+    },
+    {
+        "name": "post_503_not_retried",
+        "verb": "post",
+        "path": "/ai/translate",
+        "status": 503,
+        "retry": False,
+    },
+    {
+        "name": "safe_path_503_retried",
+        "verb": "post",
+        "path": "/validate/spam_check",
+        "status": 503,
+        "retry": True,
+    },
+    {
+        "name": "get_400_not_retried",
+        "verb": "get",
+        "path": "/store/file/read/a",
+        "status": 400,
+        "retry": False,
+    },
+    {
+        "name": "safe_path_500_retried",
+        "verb": "post",
+        "path": "/validate/spam_check?x=1",
+        "status": 500,
+        "retry": True,
+    },
+]
+
+
+class TestRetryPolicy:
+    """Test retry decisions, backoff and budgets"""
+
+    @pytest.mark.parametrize(
+        "test_case", TEST_CASES_STATUS, ids=[tc["name"] for tc in TEST_CASES_STATUS]
+    )
+    def test_should_retry_status(self, test_case):
+        policy = RetryPolicy(safe_paths=["/validate/spam_check"])
+        retry = policy.should_retry_status(
+            1, test_case["verb"], test_case["path"], test_case["status"]
+        )
+        assert retry == test_case["retry"]
+
+    def test_max_attempts(self):
+        policy = RetryPolicy(max_attempts=2)
+        assert policy.should_retry_error(1, "get", "/x")
+        assert not policy.should_retry_error(2, "get", "/x")
+
+    def test_full_jitter_backoff_is_capped(self):
+        policy = RetryPolicy(backoff_base=1.0, backoff_cap=4.0)
+        for attempt in range(1, 10):
+            assert 0 <= policy.backoff(attempt) <= min(4.0, 2 ** (attempt - 1))
+
+    def test_retry_after_is_honored(self):
+        policy = RetryPolicy()
+        assert policy.backoff(1, "7") == 7.0
+        assert RetryPolicy(respect_retry_after=False, backoff_cap=1).backoff(1, "7") <= 1
+
+    def test_retry_after_is_capped(self):
+        assert RetryPolicy().backoff(1, "86400") == 60.0
+        assert RetryPolicy(max_retry_after=5).backoff(1, "86400") == 5.0
+        far = formatdate(time.time() + 86400, usegmt=True)
+        assert RetryPolicy(max_retry_after=5).backoff(1, far) == 5.0
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        assert 0 <= parse_retry_after(formatdate(usegmt=True)) <= 1
+
+    def test_budget_limits_retries(self):
+        budget = RetryBudget(ratio=0.5, min_retries_per_second=0)
+        policy = RetryPolicy(budget=budget)
+        for _ in range(4):
+            policy.record_request()
+        granted = [policy.should_retry_error(1, "get", "/x") for _ in range(4)]
+        assert granted == [True, True, False, False]
+
+
+FAST_RETRY = RetryPolicy(backoff_base=0.01)
+
+
+class TestTransportRetry:
+    """Test the retry loop of the transports against a local server"""
+
+    def test_body_is_rewound_for_every_attempt(self, server):
+        server.reply(429)
+        server.reply(429)
+        with Transport(retry=FAST_RETRY) as transport:
+            body = UploadBody(b"payload")
+            resp = transport.request("post", server.url + "/v1/x", "/x", data=body)
+        assert resp.status_code == 200
+        assert [r["body"] for r in server.requests] == [b"payload"] * 3
+
+    def test_stream_that_cannot_rewind_is_not_retried(self, server):
+        server.reply(429)
+        with Transport(retry=FAST_RETRY) as transport:
+            chunks = iter([b"pay", b"load"])
+            resp = transport.request("post", server.url + "/v1/x", "/x", data=chunks)
+        assert resp.status_code == 429
+        assert [r["body"] for r in server.requests] == [b"payload"]
+
+    def test_retry_after_is_waited_and_capped(self, server):
+        server.reply(429, headers={"Retry-After": "0.2"})
+        server.reply(429, headers={"Retry-After": "86400"})
+        retry = RetryPolicy(max_attempts=3, max_retry_after=0.3)
+        with Transport(retry=retry) as transport:
+            resp = transport.request("post", server.url + "/v1/x", "/x", json={})
+        assert resp.status_code == 200
+        first, second, third = (r["at"] for r in server.requests)
+        assert 0.2 <= second - first < 0.3
+        assert 0.3 <= third - second < 1
+
+    def test_retry_after_past_the_deadline_returns_the_response(self, server):
+        server.reply(429, headers={"Retry-After": "5"})
+        with Transport(timeout=Timeout(total=1)) as transport:
+            started = time.monotonic()
+            resp = transport.request("post", server.url + "/v1/x", "/x", json={})
+        assert resp.status_code == 429
+        assert time.monotonic() - started < 0.5
+        assert len(server.requests) == 1
+
+    def test_post_503_is_not_retried(self, server):
+        server.reply(503)
+        with Transport(retry=FAST_RETRY) as transport:
+            resp = transport.request("post", server.url + "/v1/vocr", "/vocr", json={})
+        assert resp.status_code == 503
+        assert len(server.requests) == 1
+
+    def test_rate_limit_wait_past_the_deadline_fails_fast(self, server):
+        limiter = RateLimiter(rate=1, per_path={})
+        with Transport(rate_limiter=limiter, timeout=Timeout(total=0.5)) as transport:
+            assert transport.request("get", server.url + "/v1/x", "/x").status_code == 200
+            started = time.monotonic()
+            with pytest.raises(requests.Timeout):
+                transport.request("get", server.url + "/v1/x", "/x")
+            assert time.monotonic() - started < 0.1
+        assert len(server.requests) == 1
+        # the token of the call not sent is given back
+        assert limiter.stats()["requests"] == 1
+
+    def test_async_rate_limit_wait_past_the_deadline_fails_fast(self, server):
+        limiter = RateLimiter(rate=1)
+
+        async def main():
+            timeout = Timeout(total=0.5)
+            async with AsyncTransport(rate_limiter=limiter, timeout=timeout) as transport:
+                await transport.request("get", server.url + "/v1/x", "/x")
+                await transport.request("get", server.url + "/v1/x", "/x")
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(main())
+        assert len(server.requests) == 1
+
+    def test_deadline_stops_the_attempts(self, server):
+        for _ in range(10):
+            server.reply(200, delay=0.3)
+        retry = RetryPolicy(max_attempts=10, backoff_base=0.01)
+        with Transport(retry=retry, timeout=Timeout(read=0.2, total=0.5)) as transport:
+            started = time.monotonic()
+            with pytest.raises(requests.Timeout):
+                transport.request("get", server.url + "/v1/x", "/x")
+        # each attempt timed out on read, the last one cut short by the deadline
+        assert time.monotonic() - started < 0.8
+        assert 2 <= len(server.requests) <= 3
+
+    def test_async_body_is_rewound_for_every_attempt(self, server):
+        server.reply(429)
+
+        async def main():
+            async with AsyncTransport(retry=FAST_RETRY) as transport:
+                body = UploadPayload(UploadBody(b"payload"))
+                resp = await transport.request("post", server.url + "/v1/x", "/x", data=body)
+                return resp.status
+
+        assert asyncio.run(main()) == 200
+        assert [r["body"] for r in server.requests] == [b"payload"] * 2
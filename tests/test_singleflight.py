@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from jigsawstack import SingleFlight
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestSingleFlight:
+    """Test coalescing of identical in-flight calls"""
+
+    def test_key_only_for_enabled_endpoints(self):
+        flight = SingleFlight(["/web/search"])
+        url = "https://api.jigsawstack.com/v1/web/search"
+        a = flight.key_for("post", url, "/web/search", "key", {"query": "a", "max": 1})
+        b = flight.key_for("post", url, "/web/search", "key", {"max": 1, "query": "a"})
+        assert a == b
+        assert flight.key_for("post", url, "/ai/scrape", "key", {"query": "a"}) is None
+        assert flight.key_for("post", url, "/web/search", "key", {}, files={"file": b""}) is None
+
+    def test_concurrent_threads_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+        lock = threading.Lock()
+
+        def fn():
+            with lock:
+                calls.append(1)
+            time.sleep(0.1)
+            return {"results": [1]}
+
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: flight.do("k", fn), range(8)))
+
+        assert len(calls) == 1
+        assert all(r == {"results": [1]} for r in results)
+        assert flight.stats() == {"calls": 1, "coalesced": 7, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_tasks_share_result_and_exception(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fail():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *[flight.do_async("k", fail) for _ in range(5)], return_exceptions=True
+        )
+        assert len(calls) == 1
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.stats()["coalesced"] == 4
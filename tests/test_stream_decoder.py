@@ -0,0 +1,80 @@
+import json
+import logging
+
+import pytest
+
+from jigsawstack._streaming import StreamDecoder, detect_stream_format
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RECORDS = [{"text": "héllo wörld 👋"}, {"text": "日本語のテキスト"}, {"done": True}]
+NDJSON_BODY = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in RECORDS).encode("utf-8")
+SSE_BODY = (
+    ": keep-alive\n\n"
+    + "".join(
+        f"id: {i}\ndata: {json.dumps(r, ensure_ascii=False)}\r\n\r\n" for i, r in enumerate(RECORDS)
+    )
+).encode("utf-8")
+
+
+def feed_in_pieces(decoder, body, size):
+    items = []
+    for i in range(0, len(body), size):
+        items.extend(decoder.feed(body[i : i + size]))
+    items.extend(decoder.flush())
+    return items
+
+
+TEST_CASES = [
+    {"name": "ndjson", "format": "ndjson", "body": NDJSON_BODY, "expected": RECORDS},
+    {"name": "sse", "format": "sse", "body": SSE_BODY, "expected": RECORDS},
+    {
+        "name": "json_document",
+        "format": "json",
+        "body": json.dumps(RECORDS).encode(),
+        "expected": [RECORDS],
+    },
+    {
+        "name": "text",
+        "format": "text",
+        "body": "plain 👋 text".encode(),
+        "expected": ["plain 👋 text"],
+    },
+]
+
+
+class TestStreamDecoder:
+    """Test incremental stream decoding across arbitrary chunk boundaries"""
+
+    @pytest.mark.parametrize("test_case", TEST_CASES, ids=[tc["name"] for tc in TEST_CASES])
+    @pytest.mark.parametrize("size", [1, 3, 7, 1024])
+    def test_decode_split_chunks(self, test_case, size):
+        decoder = StreamDecoder(test_case["format"])
+        items = feed_in_pieces(decoder, test_case["body"], size)
+        if test_case["format"] == "text":
+            items = ["".join(items)]
+        assert items == test_case["expected"]
+
+    def test_ndjson_without_trailing_newline(self):
+        decoder = StreamDecoder("ndjson")
+        assert feed_in_pieces(decoder, b'{"a": 1}\n{"b": 2}', 4) == [{"a": 1}, {"b": 2}]
+
+    def test_sse_multiline_data_and_event_id(self):
+        decoder = StreamDecoder("sse")
+        items = feed_in_pieces(decoder, b"id: 7\ndata: line one\ndata: line two\n\n", 5)
+        assert items == ["line one\nline two"]
+        assert decoder.last_event_id == "7"
+
+    @pytest.mark.parametrize(
+        "content_type,expected",
+        [
+            ("text/event-stream; charset=utf-8", "sse"),
+            ("application/x-ndjson", "ndjson"),
+            ("application/json", "json"),
+            ("text/plain", "text"),
+            (None, "text"),
+        ],
+    )
+    def test_detect_stream_format(self, content_type, expected):
+        assert detect_stream_format(content_type) == expected
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+
+import aiohttp
+import pytest
+import requests
+
+from jigsawstack import AsyncTransport, JigsawStack, RetryPolicy, Timeout, Transport
+from jigsawstack._timeout import MIN_ATTEMPT_TIMEOUT, Deadline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestDeadline:
+    """Test call deadlines"""
+
+    def test_clamp_shortens_timeouts(self):
+        deadline = Deadline(0.5)
+        assert deadline.clamp(10) <= 0.5
+        assert deadline.clamp(0.1) == 0.1
+        assert 0.4 < deadline.clamp(None) <= 0.5
+
+    def test_without_a_deadline_timeouts_are_kept(self):
+        deadline = Timeout(connect=3, read=7).deadline()
+        assert deadline.remaining() is None
+        assert deadline.clamp(7) == 7
+        assert deadline.clamp(None) is None
+        assert deadline.allows(1000)
+
+    def test_expired_deadline_fails_fast(self):
+        deadline = Deadline(0)
+        assert deadline.remaining() == 0
+        assert deadline.clamp(10) == MIN_ATTEMPT_TIMEOUT
+        assert not deadline.allows(0)
+
+
+class TestTransportTimeout:
+    """Test timeouts applied by the transports against a local server"""
+
+    def test_read_timeout_is_clamped_to_the_deadline(self, server):
+        server.reply(delay=1.0)
+        retry = RetryPolicy(max_attempts=1)
+        with Transport(retry=retry, timeout=Timeout(read=10, total=0.3)) as transport:
+            started = time.monotonic()
+            with pytest.raises(requests.Timeout):
+                transport.request("get", server.url + "/v1/x", "/x")
+        assert time.monotonic() - started < 0.6
+
+    def test_deadline_bounds_a_trickling_body(self, server):
+        # every read is well within the read timeout, the whole body is not
+        server.reply(body=[(0.0, b'{"success": ')] + [(0.5, b" ")] * 6 + [(0.0, b"true}")])
+        retry = RetryPolicy(max_attempts=1)
+        with Transport(retry=retry, timeout=Timeout(read=10, total=1.0)) as transport:
+            started = time.monotonic()
+            with pytest.raises(requests.RequestException):
+                transport.request("get", server.url + "/v1/x", "/x")
+            elapsed = time.monotonic() - started
+        assert elapsed < 1.6
+
+    def test_body_read_within_the_deadline_is_kept(self, server):
+        server.reply(body=[(0.0, b'{"success": '), (0.1, b"true}")])
+        with Transport(timeout=Timeout(total=5)) as transport:
+            resp = transport.request("get", server.url + "/v1/x", "/x")
+            assert resp.json() == {"success": True}
+            # the connection went back to the pool
+            assert transport.request("get", server.url + "/v1/x", "/x").status_code == 200
+        assert server.requests[0]["client"] == server.requests[1]["client"]
+
+    def test_deadline_spans_retries(self, server):
+        # a fixed delay rather than the jittered backoff, so the second wait is
+        # the one ending past the deadline
+        for _ in range(10):
+            server.reply(503, headers={"Retry-After": "0.2"})
+        retry = RetryPolicy(max_attempts=10)
+        with Transport(retry=retry, timeout=Timeout(total=0.35)) as transport:
+            started = time.monotonic()
+            resp = transport.request("get", server.url + "/v1/x", "/x")
+            elapsed = time.monotonic() - started
+        # the backoff that would end past the deadline is not waited, the last response is kept
+        assert resp.status_code == 503
+        assert elapsed < 0.35
+        assert len(server.requests) == 2
+
+    def test_with_options_overrides_the_client_timeout(self, server):
+        server.reply(body={"success": True}, delay=0.4)
+        server.reply(body={"success": True}, delay=0.4)
+        jigsaw = JigsawStack(api_key="test", base_url=server.url, timeout=Timeout(total=5))
+        fast = jigsaw.with_options(timeout=Timeout(total=0.2))
+        with pytest.raises(requests.Timeout):
+            fast.sentiment({"text": "slow"})
+        assert jigsaw.sentiment({"text": "slow"})["success"]
+        assert jigsaw.transport.timeout.total == 5
+        jigsaw.close()
+
+    def test_async_client_timeout_is_derived_from_the_deadline(self, server, monkeypatch):
+        timeouts = []
+        request = aiohttp.ClientSession._request
+
+        def record(session, *args, **kwargs):
+            timeouts.append(kwargs["timeout"])
+            return request(session, *args, **kwargs)
+
+        monkeypatch.setattr(aiohttp.ClientSession, "_request", record)
+        server.reply(delay=1.0)
+        retry = RetryPolicy(max_attempts=1)
+
+        async def main():
+            timeout = Timeout(connect=5, read=10, total=0.3)
+            async with AsyncTransport(retry=retry, timeout=timeout) as transport:
+                await transport.request("get", server.url + "/v1/x", "/x")
+
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(main())
+        assert time.monotonic() - started < 0.6
+        timeout = timeouts[0]
+        assert 0 < timeout.total <= 0.3
+        assert timeout.sock_connect <= 0.3 and timeout.sock_read <= 0.3
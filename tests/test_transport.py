@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import threading
+import time
+
+import requests
+
+from jigsawstack import AsyncJigsawStack, AsyncTransport, JigsawStack, Transport
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestTransport:
+    """Test the pooled session of the sync transport against a local server"""
+
+    def test_connection_is_reused(self, server):
+        with Transport() as transport:
+            for _ in range(3):
+                transport.request("get", server.url + "/v1/x", "/x").close()
+        assert len({r["client"] for r in server.requests}) == 1
+
+    def test_derived_transports_share_the_session(self, server):
+        transport = Transport()
+        derived = transport.with_options(retry=None)
+        assert derived.session is transport.session
+        transport.request("get", server.url + "/v1/x", "/x").close()
+        derived.request("get", server.url + "/v1/x", "/x").close()
+        assert len({r["client"] for r in server.requests}) == 1
+        # the pool belongs to the root transport
+        derived.close()
+        assert not transport.closed
+        transport.close()
+        assert transport.closed
+
+    def test_context_manager_closes_the_pool(self, server):
+        with Transport(keep_alive=False) as transport:
+            resp = transport.request("get", server.url + "/v1/x", "/x")
+            assert resp.status_code == 200
+            assert transport.session.headers["Connection"] == "close"
+        assert transport.closed
+        adapter = transport.session.get_adapter(server.url)
+        assert isinstance(adapter, requests.adapters.HTTPAdapter)
+        assert len(adapter.poolmanager.pools) == 0
+
+    def test_pool_is_sized(self):
+        with Transport(pool_connections=3, pool_maxsize=7) as transport:
+            adapter = transport.session.get_adapter("https://api.jigsawstack.com")
+            assert adapter._pool_connections == 3
+            assert adapter._pool_maxsize == 7
+
+
+class TestAsyncTransport:
+    """Test the aiohttp session of the async transport against a local server"""
+
+    def test_session_is_reused_within_a_loop(self, server):
+        async def main():
+            async with AsyncTransport() as transport:
+                session = await transport.get_session()
+                for _ in range(3):
+                    resp = await transport.request("get", server.url + "/v1/x", "/x")
+                    await resp.read()
+                assert await transport.get_session() is session
+                assert await transport.with_options(retry=None).get_session() is session
+
+        asyncio.run(main())
+        assert len({r["client"] for r in server.requests}) == 1
+
+    def test_session_is_rebound_on_a_new_loop(self, server):
+        transport = AsyncTransport()
+
+        async def call():
+            resp = await transport.request("get", server.url + "/v1/x", "/x")
+            await resp.read()
+            return await transport.get_session()
+
+        first = asyncio.run(call())
+        second = asyncio.run(call())
+        assert second is not first
+        assert first.closed
+        asyncio.run(transport.aclose())
+        assert second.closed
+        assert len(server.requests) == 2
+
+    def test_session_of_an_idle_loop_is_closed_on_it(self, server):
+        transport = AsyncTransport()
+
+        async def call():
+            resp = await transport.request("get", server.url + "/v1/x", "/x")
+            await resp.read()
+            return await transport.get_session()
+
+        loop = asyncio.new_event_loop()
+        first = loop.run_until_complete(call())
+        # the first loop is left open, not running
+        second = asyncio.run(call())
+        assert first.closed
+        assert not loop.is_running()
+        loop.close()
+        asyncio.run(transport.aclose())
+        assert second.closed
+
+    def test_session_of_a_running_loop_is_closed_on_it(self, server):
+        transport = AsyncTransport()
+
+        async def call():
+            resp = await transport.request("get", server.url + "/v1/x", "/x")
+            await resp.read()
+            return await transport.get_session()
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever)
+        thread.start()
+        try:
+            first = asyncio.run_coroutine_threadsafe(call(), loop).result()
+            asyncio.run(call())
+            # closed on its own loop, without waiting
+            deadline = time.monotonic() + 2
+            while not first.closed and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert first.closed
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def test_aclose_closes_the_session(self, server):
+        async def main():
+            transport = AsyncTransport()
+            session = await transport.get_session()
+            # the session belongs to the root transport
+            await transport.with_options(retry=None).aclose()
+            assert not session.closed
+            await transport.aclose()
+            assert session.closed
+            # a closed transport opens a new session when used again
+            resp = await transport.request("get", server.url + "/v1/x", "/x")
+            assert resp.status == 200
+            await transport.aclose()
+
+        asyncio.run(main())
+
+
+STREAM_PARAMS = {"prompt": "p", "inputs": [], "return_prompt": "r", "stream": True}
+
+
+def _reply_slow_stream(server):
+    server.reply(
+        body=[(0, b'{"a": 1}\n'), (0.3, b'{"b": 2}\n')],
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+
+class TestStreamResponse:
+    """Test streaming responses against a local server"""
+
+    def test_items_are_yielded_as_they_arrive(self, server):
+        _reply_slow_stream(server)
+        with JigsawStack(api_key="test", base_url=server.url) as jigsaw:
+            started = time.monotonic()
+            with jigsaw.prompt_engine.run_prompt_direct(STREAM_PARAMS) as stream:
+                assert next(stream) == {"a": 1}
+                first_at = time.monotonic() - started
+                assert stream.time_to_first_byte is not None
+                assert stream.time_to_headers <= stream.time_to_first_byte < 0.2
+                assert list(stream) == [{"b": 2}]
+                last_at = time.monotonic() - started
+        assert first_at < 0.2 and last_at >= 0.3
+
+    def test_async_items_are_yielded_as_they_arrive(self, server):
+        _reply_slow_stream(server)
+
+        async def main():
+            async with AsyncJigsawStack(api_key="test", base_url=server.url) as jigsaw:
+                started = time.monotonic()
+                stream = await jigsaw.prompt_engine.run_prompt_direct(STREAM_PARAMS)
+                async with stream:
+                    assert await stream.__anext__() == {"a": 1}
+                    first_at = time.monotonic() - started
+                    assert stream.time_to_first_byte is not None
+                    assert stream.time_to_first_byte < 0.2
+                    assert [item async for item in stream] == [{"b": 2}]
+                    return first_at, time.monotonic() - started
+
+        first_at, last_at = asyncio.run(main())
+        assert first_at < 0.2 and last_at >= 0.3
+
+
+class TestWithOptions:
+    """Test clients derived with with_options"""
+
+    def test_derived_clients_copy_the_headers(self):
+        jigsaw = JigsawStack(api_key="test", headers={"x-team": "a"})
+        derived = jigsaw.with_options(timeout=None)
+        derived.headers["x-team"] = "b"
+        assert jigsaw.headers == {"x-team": "a"}
+        assert derived.transport.session is jigsaw.transport.session
+        jigsaw.close()
+
+    def test_async_derived_clients_copy_the_headers(self):
+        jigsaw = AsyncJigsawStack(api_key="test", headers={"x-team": "a"})
+        derived = jigsaw.with_options(timeout=None)
+        derived.headers["x-team"] = "b"
+        assert jigsaw.headers == {"x-team": "a"}
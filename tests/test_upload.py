@@ -0,0 +1,89 @@
+import io
+import logging
+
+import pytest
+
+from jigsawstack._upload import (
+    CHUNK_SIZE,
+    MultipartBody,
+    UploadBody,
+    blob_source,
+    open_upload,
+    rewind_body,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TestUpload:
+    """Test streaming of upload bodies"""
+
+    def test_buffer_is_read_in_chunks_and_rewound(self):
+        data = bytearray(b"x" * (CHUNK_SIZE + 10))
+        body = UploadBody(data)
+        assert len(body) == len(data)
+        chunks = list(body)
+        assert [len(c) for c in chunks] == [CHUNK_SIZE, 10]
+        assert body.read() == b""
+        assert body.rewind()
+        assert b"".join(body) == bytes(data)
+        body.close()
+
+    def test_path_is_opened_and_closed(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"hello world")
+        with open_upload(str(path)) as body:
+            assert isinstance(body, UploadBody)
+            assert len(body) == 11
+            assert body.read() == b"hello world"
+        assert body._file.closed
+
+    def test_file_is_sent_from_its_position(self):
+        f = io.BytesIO(b"headerpayload")
+        f.seek(6)
+        with open_upload(f) as body:
+            assert len(body) == 7
+            assert body.read() == b"payload"
+            body.rewind()
+            assert body.read() == b"payload"
+        assert not f.closed
+
+    def test_iterators_cannot_be_rewound(self):
+        with open_upload(c for c in [b"a", b"b"]) as body:
+            assert not rewind_body(body)
+        assert rewind_body(b"bytes")
+        assert rewind_body(None)
+
+    def test_slice_of_a_file(self, tmp_path):
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+        body = UploadBody(str(path), offset=4, length=4)
+        assert len(body) == 4
+        assert body.read() == b"4567"
+        body.rewind()
+        assert b"".join(body) == b"4567"
+        body.close()
+        assert len(UploadBody(b"0123456789", offset=8, length=4)) == 2
+
+    def test_multipart_body_is_streamed_from_the_file(self, tmp_path):
+        path = tmp_path / "scan.png"
+        path.write_bytes(b"x" * (CHUNK_SIZE + 10))
+        body = MultipartBody(path, '{"prompt": "total"}')
+        boundary = body.content_type.split("boundary=")[1]
+        data = b"".join(body)
+        assert len(data) == len(body)
+        assert data.startswith(f"--{boundary}\r\n".encode())
+        assert b'name="body"' in data and b'{"prompt": "total"}' in data
+        assert b'name="file"; filename="scan.png"' in data
+        assert data.endswith(b"x" * 10 + f"\r\n--{boundary}--\r\n".encode())
+        body.rewind()
+        assert body.read() == data
+        body.close()
+
+    def test_blob_sources_are_not_copied(self):
+        data = bytearray(b"image")
+        assert blob_source(data) is data
+        assert blob_source("text") == b"text"
+        with pytest.raises(TypeError):
+            blob_source(42)